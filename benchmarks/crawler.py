@@ -0,0 +1,62 @@
+# pyre-strict
+# Compares backfilling many group histories one group at a time (group.messages.all()) with
+# HistoryCrawler, against the fake store in test/fake_server.py with injected latency
+#
+#   python benchmarks/crawler.py --groups 100 --messages 300 --latency 0.02 --concurrency 16
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.crawler import CrawlProgress, HistoryCrawler  # noqa: E402
+from lowerpines.endpoints.group import Group, GroupsShowRequest  # noqa: E402
+from lowerpines.endpoints.message import Message  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+from lowerpines.transport import LatencyTransport  # noqa: E402
+from test.fake_server import FakeGroupMe, FakeTransport  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[4, 16, 64])
+    args = parser.parse_args()
+
+    store = FakeGroupMe()
+    gmi = GMI("benchmark")
+    gmi.client = LatencyTransport(FakeTransport(store), args.latency)
+    # Group sizes from 0 to twice --messages, like a real account
+    groups: List[Group] = []
+    for i in range(args.groups):
+        size = args.messages * 2 * i // max(1, args.groups - 1)
+        group_id = store.seed(groups=1, messages_per_group=size)[0]
+        groups.append(GroupsShowRequest(gmi, group_id).result)
+    total = sum(len(store.message_ids[g.group_id]) for g in groups)
+
+    print("%d groups, %d messages" % (len(groups), total))
+    print("%-20s %8s %12s" % ("run", "time", "messages/s"))
+    start = time.perf_counter()
+    for group in groups:
+        group.messages.all()
+    elapsed = time.perf_counter() - start
+    print("%-20s %7.2fs %12.0f" % ("one at a time", elapsed, total / elapsed))
+
+    def handle(group: Group, messages: List[Message]) -> None:
+        pass
+
+    for concurrency in args.concurrency:
+        progress: CrawlProgress = HistoryCrawler(gmi, concurrency).crawl(groups, handle)
+        elapsed = progress.elapsed
+        print(
+            "%-20s %7.2fs %12.0f"
+            % ("concurrency=%d" % concurrency, elapsed, progress.messages / elapsed)
+        )
+
+
+if __name__ == "__main__":
+    main()
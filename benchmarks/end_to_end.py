@@ -0,0 +1,106 @@
+# pyre-strict
+# Measures end-to-end throughput and tail latency against the fake GroupMe server in
+# test/fake_server.py, over real HTTP with injected latency, errors and rate limiting
+#
+#   python benchmarks/end_to_end.py --requests 2000 --threads 32 --latency 0.02
+import argparse
+import os
+import sys
+import time
+from typing import Any, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.endpoints.group import GroupsShowRequest  # noqa: E402
+from lowerpines.endpoints.message import (  # noqa: E402
+    MessagesCreateRequest,
+    MessagesIndexRequest,
+)
+from lowerpines.endpoints.request import Request  # noqa: E402
+from lowerpines.endpoints.user import UserMeRequest  # noqa: E402
+from lowerpines.executor import ThreadedExecutor  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+from lowerpines.metrics import RequestEvent  # noqa: E402
+from lowerpines.retry import RetryPolicy  # noqa: E402
+from test.fake_server import FakeGroupMe, FakeGroupMeServer  # noqa: E402
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def workload(gmi: GMI, group_ids: List[str], count: int) -> List[Request[Any]]:
+    # Mostly reads, like a bot that polls its groups and occasionally posts
+    plans: List[Request[Any]] = []
+    for i in range(count):
+        group_id = group_ids[i % len(group_ids)]
+        kind = i % 10
+        if kind < 5:
+            plans.append(MessagesIndexRequest.plan(gmi, group_id, limit=100))
+        elif kind < 8:
+            plans.append(GroupsShowRequest.plan(gmi, group_id))
+        elif kind < 9:
+            plans.append(UserMeRequest.plan(gmi))
+        else:
+            plans.append(
+                MessagesCreateRequest.plan(gmi, group_id, "bench-" + str(i), "hi")
+            )
+    return plans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    store = FakeGroupMe()
+    group_ids = store.seed(args.groups, args.messages)
+    server = FakeGroupMeServer(
+        store,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=0.05,
+        seed=0,
+    )
+    events: List[RequestEvent] = []
+    with server:
+        gmi = GMI("benchmark")
+        gmi.base_url = server.base_url
+        gmi.retry_policy = RetryPolicy(backoff_base=0.05)
+        gmi.hooks.append(events.append)
+
+        plans = workload(gmi, group_ids, args.requests)
+        start = time.perf_counter()
+        results = ThreadedExecutor(args.threads).bulk(plans)
+        elapsed = time.perf_counter() - start
+
+    latencies = [event.elapsed for event in events]
+    failed = sum(1 for result in results if not result.ok)
+    print("requests        %10d" % len(results))
+    print("failed          %10d" % failed)
+    print("retries         %10d" % sum(event.retries for event in events))
+    print(
+        "injected        %10d errors, %d rate limits"
+        % (server.injected_errors, server.injected_rate_limits)
+    )
+    print("throughput      %10.0f requests/s" % (len(results) / elapsed))
+    for name, fraction in [("p50", 0.5), ("p95", 0.95), ("p99", 0.99)]:
+        print(
+            "%-15s %10.1f ms"
+            % (name + " latency", percentile(latencies, fraction) * 1000)
+        )
+    print("%-15s %10.1f ms" % ("max latency", max(latencies) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# pyre-strict
+# Measures how much of a history crawl's network wait MessageIterator's prefetching hides.
+# A group history is served in-process by the fake store in test/fake_server.py, with
+# injected latency per request, and every message is parsed and then "processed" by
+# --work-us of CPU time. Without prefetching the crawl takes about network + consume time,
+# with it about max(network, consume).
+#
+#   python benchmarks/history_prefetch.py --messages 5000 --latency 0.02 --work-us 200
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.endpoints.group import GroupsShowRequest  # noqa: E402
+from lowerpines.endpoints.message import Message, MessagesIndexJsonRequest  # noqa: E402
+from lowerpines.endpoints.request import JsonType  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+from lowerpines.transport import LatencyTransport  # noqa: E402
+from test.fake_server import FakeGroupMe, FakeTransport  # noqa: E402
+
+
+def busy_wait(seconds: float) -> None:
+    # Holds the GIL like real processing would, unlike time.sleep
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def timed(func: Callable[[], Any]) -> float:  # pyre-ignore
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def fetch_pages(gmi: GMI, group_id: str) -> List[List[JsonType]]:
+    pages: List[List[JsonType]] = []
+    before_id: Optional[str] = None
+    while True:
+        page = MessagesIndexJsonRequest.plan(
+            gmi, group_id, before_id=before_id, limit=100
+        ).run()
+        if not page:
+            return pages
+        pages.append(page)
+        before_id = page[-1]["id"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--work-us", type=float, default=200.0)
+    parser.add_argument("--prefetch", type=int, nargs="*", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    store = FakeGroupMe()
+    group_id = store.seed(groups=1, messages_per_group=args.messages)[0]
+    gmi = GMI("benchmark")
+    gmi.client = LatencyTransport(FakeTransport(store), args.latency)
+    messages = GroupsShowRequest(gmi, group_id).result.messages
+    work = args.work_us / 1e6
+
+    def consume(message: Message) -> None:
+        message.complex_text
+        busy_wait(work)
+
+    def consume_all() -> None:
+        for page in pages:
+            for message_json in page:
+                consume(Message.from_json(gmi, message_json))
+
+    pages: List[List[JsonType]] = []
+    network = timed(lambda: pages.extend(fetch_pages(gmi, group_id)))
+    consume_time = timed(consume_all)
+    print("%d messages in %d pages" % (args.messages, len(pages)))
+    print("%-20s %8.2fs" % ("network only", network))
+    print("%-20s %8.2fs" % ("parse + work only", consume_time))
+    print("%-20s %8.2fs" % ("sum", network + consume_time))
+    print("%-20s %8.2fs" % ("max", max(network, consume_time)))
+    print()
+    print("%-20s %8s %12s %12s" % ("crawl", "time", "messages/s", "vs max"))
+    for prefetch in args.prefetch:
+
+        def crawl() -> None:
+            with messages.iter_all(prefetch=prefetch) as iterator:
+                for message in iterator:
+                    consume(message)
+
+        elapsed = timed(crawl)
+        print(
+            "%-20s %7.2fs %12.0f %11.2fx"
+            % (
+                "prefetch=%d" % prefetch,
+                elapsed,
+                args.messages / elapsed,
+                elapsed / max(network, consume_time),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
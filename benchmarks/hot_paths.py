@@ -0,0 +1,262 @@
+# pyre-strict
+# Micro-benchmarks for the code that runs for every object lowerpines ingests or posts:
+# AbstractObject.from_json, Group/Message.on_fields_loaded, Message.complex_text and
+# ComplexMessage.get_attachments/MessageBuilder. Payloads come from test_data/ and from synthetic
+# generators (10k messages, 5k members, 50 mentions).
+#
+#   python benchmarks/hot_paths.py            compare against the stored baselines
+#   python benchmarks/hot_paths.py --save     store the results as the new baselines
+#   python benchmarks/hot_paths.py --check    exit 1 if a case is slower than the baseline
+#                                             by more than --tolerance
+import argparse
+import copy
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.endpoints.group import Group  # noqa: E402
+from lowerpines.endpoints.message import Message  # noqa: E402
+from lowerpines.endpoints.request import JsonType  # noqa: E402
+from lowerpines.frame import MessageFrame  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+from lowerpines.message import (  # noqa: E402
+    ComplexMessage,
+    EmojiAttach,
+    ImageAttach,
+    MessageBuilder,
+    RefAttach,
+    smart_split_complex_message,
+)
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "test_data")
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines", "hot_paths.json")
+
+Case = Tuple[str, Callable[[], Any]]  # pyre-ignore
+
+
+def recorded(endpoint: str) -> List[Any]:  # pyre-ignore
+    responses = []
+    for file_name in sorted(os.listdir(TEST_DATA)):
+        if file_name.split("_")[0].endswith("." + endpoint):
+            with open(os.path.join(TEST_DATA, file_name)) as f:
+                responses.append(json.load(f)["response"])
+    return responses
+
+
+def synthetic_messages(template: JsonType, count: int) -> List[JsonType]:
+    messages = []
+    for i in range(count):
+        message = copy.deepcopy(template)
+        message["id"] = str(156859308710073974 + i)
+        message["created_at"] = 1568593088 + i
+        message["text"] = "Message number " + str(i)
+        messages.append(message)
+    return messages
+
+
+def synthetic_group(template: JsonType, members: int) -> JsonType:
+    group = copy.deepcopy(template)
+    member = group["members"][0]
+    group["members"] = []
+    for i in range(members):
+        new_member = dict(member)
+        new_member["id"] = str(482251665 + i)
+        new_member["user_id"] = str(30038058 + i)
+        new_member["nickname"] = "Member " + str(i)
+        group["members"].append(new_member)
+    return group
+
+
+def mention_message(template: JsonType, mentions: int) -> JsonType:
+    message = copy.deepcopy(template)
+    text = ""
+    loci = []
+    user_ids = []
+    for i in range(mentions):
+        text += "hey "
+        name = "@Member" + str(i)
+        loci.append([len(text), len(name)])
+        user_ids.append(str(30038058 + i))
+        text += name + " "
+    message["text"] = text
+    message["attachments"] = [{"type": "mentions", "loci": loci, "user_ids": user_ids}]
+    return message
+
+
+def mention_complex_message(mentions: int) -> ComplexMessage:
+    message = ComplexMessage("")
+    for i in range(mentions):
+        message += "hey "
+        message += RefAttach(str(30038058 + i), "@Member" + str(i))
+        message += " "
+    return message
+
+
+def mention_builder(mentions: int) -> MessageBuilder:
+    builder = MessageBuilder()
+    for i in range(mentions):
+        builder.text("hey ").mention(str(30038058 + i), "@Member" + str(i)).text(" ")
+    return builder
+
+
+def mixed_complex_message(parts: int) -> ComplexMessage:
+    message = ComplexMessage("")
+    for i in range(parts):
+        kind = i % 4
+        if kind == 0:
+            message += "text " + str(i) + " "
+        elif kind == 1:
+            message += RefAttach(str(i), "@" + str(i))
+        elif kind == 2:
+            message += EmojiAttach(1, i)
+        else:
+            message += ImageAttach("https://i.groupme.com/" + str(i))
+    return message
+
+
+def make_cases() -> List[Case]:
+    gmi = GMI("benchmark")
+    interning_gmi = GMI("benchmark")
+    interning_gmi.intern_strings = True
+    group = recorded("GroupsShowRequest")[0]
+    groups = recorded("GroupsIndexRequest")[0]
+    messages = [
+        message
+        for response in recorded("MessagesIndexRequest")
+        for message in response["messages"]
+    ]
+    message = messages[0]
+    many_messages = synthetic_messages(message, 10000)
+    big_group = synthetic_group(group, 5000)
+    mentions = mention_message(message, 50)
+    # The (text, attachments) of a ComplexMessage is cached, so each run wraps the same
+    # parts in a new one
+    mention_parts = mention_complex_message(50).contents
+    mixed_parts = mixed_complex_message(1000).contents
+    images_then_mentions = [ImageAttach(str(i)) for i in range(1000)] + [
+        RefAttach(str(i), "@" + str(i)) for i in range(1000)
+    ]
+
+    return [
+        ("from_json Group", lambda: Group.from_json(gmi, group)),
+        (
+            "from_json Group x%d (index)" % len(groups),
+            lambda: [Group.from_json(gmi, g) for g in groups],
+        ),
+        ("from_json Message", lambda: Message.from_json(gmi, message)),
+        (
+            "from_json Message x10k",
+            lambda: [Message.from_json(gmi, m) for m in many_messages],
+        ),
+        (
+            "from_json Message x10k, interned",
+            lambda: [Message.from_json(interning_gmi, m) for m in many_messages],
+        ),
+        ("MessageFrame x10k", lambda: MessageFrame().extend(many_messages)),
+        ("from_json Group 5k members", lambda: Group.from_json(gmi, big_group)),
+        (
+            "Group 5k members, all built",
+            lambda: list(Group.from_json(gmi, big_group).members),
+        ),
+        ("from_json Message 50 mentions", lambda: Message.from_json(gmi, mentions)),
+        (
+            "complex_text 50 mentions",
+            lambda: Message.from_json(gmi, mentions).complex_text,
+        ),
+        (
+            "get_attachments 50 mentions",
+            lambda: ComplexMessage(mention_parts).get_attachments(),
+        ),
+        (
+            "get_attachments 1k parts",
+            lambda: ComplexMessage(mixed_parts).get_attachments(),
+        ),
+        (
+            "get_attachments images+mentions",
+            lambda: ComplexMessage(images_then_mentions).get_attachments(),
+        ),
+        (
+            "smart_split 50 mentions",
+            lambda: smart_split_complex_message(ComplexMessage(mention_parts)),
+        ),
+        ("MessageBuilder 50 mentions", lambda: mention_builder(50).smart_split()),
+    ]
+
+
+def ops_per_sec(func: Callable[[], Any]) -> float:  # pyre-ignore
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    # Best of three runs of at least 0.2s each, the minimum is the least noisy estimate
+    return number / min(timer.repeat(repeat=3, number=number))
+
+
+def peak_kib(func: Callable[[], Any]) -> float:  # pyre-ignore
+    # Peak memory allocated while the case runs once, including memory freed before it returned
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(BASELINES):
+        return {}
+    with open(BASELINES) as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--save", action="store_true", help="store new baselines")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--filter", default="", help="only run matching cases")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = []
+    print("%-32s %12s %9s %12s" % ("case", "ops/s", "vs base", "peak KiB"))
+    for name, func in make_cases():
+        if args.filter not in name:
+            continue
+        result = {
+            "ops_per_sec": round(ops_per_sec(func), 1),
+            "peak_kib": round(peak_kib(func), 1),
+        }
+        results[name] = result
+        change = ""
+        baseline = baselines.get(name)
+        if baseline is not None:
+            ratio = result["ops_per_sec"] / baseline["ops_per_sec"]
+            change = "%+.0f%%" % ((ratio - 1) * 100)
+            if ratio < 1 - args.tolerance:
+                regressions.append(name)
+        print(
+            "%-32s %12.1f %9s %12.1f"
+            % (name, result["ops_per_sec"], change, result["peak_kib"])
+        )
+
+    if args.save:
+        baselines.update(results)
+        os.makedirs(os.path.dirname(BASELINES), exist_ok=True)
+        with open(BASELINES, "w") as f:
+            json.dump(baselines, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print("Saved baselines to " + BASELINES)
+    if regressions:
+        print("Slower than baseline: " + ", ".join(regressions))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
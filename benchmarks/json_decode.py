@@ -0,0 +1,82 @@
+# pyre-strict
+# Compares the old response decoding path (decode to str, then Response.json())
+# with Request.handle_response on every installed JSON backend, using the
+# recorded payloads in test_data/
+#
+#   python benchmarks/json_decode.py
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+from requests import Response
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines import json_backend  # noqa: E402
+from lowerpines.endpoints.bot import BotIndexRequest  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "test_data")
+ROUNDS = 200
+
+
+def load_responses() -> List[Response]:
+    responses = []
+    for file_name in sorted(os.listdir(TEST_DATA)):
+        with open(os.path.join(TEST_DATA, file_name)) as f:
+            recorded = json.load(f)
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps({"response": recorded["response"]}).encode(
+            "utf-8"
+        )
+        responses.append(response)
+    return responses
+
+
+def old_path(responses: List[Response]) -> None:
+    for r in responses:
+        string_content = r.content.decode("utf-8")
+        if string_content and not string_content.isspace():
+            r.json()["response"]
+
+
+def main() -> None:
+    responses = load_responses()
+    size = sum(len(r.content) for r in responses)
+    request = BotIndexRequest.plan(GMI("benchmark"))
+
+    def new_path() -> None:
+        for r in responses:
+            request.handle_response(r)
+
+    print(
+        "%d payloads, %.1f KiB per round, %d rounds"
+        % (len(responses), size / 1024, ROUNDS)
+    )
+    baseline = timeit.timeit(lambda: old_path(responses), number=ROUNDS)
+    print(
+        "%-28s %8.1f MiB/s"
+        % ("decode + Response.json()", size * ROUNDS / baseline / 2**20)
+    )
+    for name in json_backend.PREFERRED_BACKENDS:
+        try:
+            json_backend.set_backend(name)
+        except ImportError:
+            print("%-28s not installed" % name)
+            continue
+        elapsed = timeit.timeit(new_path, number=ROUNDS)
+        print(
+            "%-28s %8.1f MiB/s  %.2fx"
+            % (
+                "handle_response (" + name + ")",
+                size * ROUNDS / elapsed / 2**20,
+                baseline / elapsed,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
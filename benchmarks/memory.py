@@ -0,0 +1,244 @@
+# pyre-strict
+# Measures how many bytes each parsed model instance keeps alive, not counting the JSON it
+# was parsed from (the objects share its strings)
+#
+#   python benchmarks/memory.py           compare against the stored baselines
+#   python benchmarks/memory.py --save    store the results as the new baselines
+#   python benchmarks/memory.py --history 1000000
+#                                         also measure a whole group history parsed page
+#                                         by page, with and without GMI.intern_strings
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.endpoints.chat import DirectMessage  # noqa: E402
+from lowerpines.endpoints.group import Group  # noqa: E402
+from lowerpines.endpoints.member import Member  # noqa: E402
+from lowerpines.endpoints.message import Message  # noqa: E402
+from lowerpines.endpoints.request import JsonType  # noqa: E402
+from lowerpines.frame import MessageFrame  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines", "memory.json")
+COUNT = 20000
+
+Case = Tuple[str, List[JsonType], Callable[[JsonType], Any]]  # pyre-ignore
+
+
+def messages(count: int, mentions: int = 0) -> List[JsonType]:
+    result = []
+    for i in range(count):
+        text = "Message number " + str(i)
+        attachments: List[JsonType] = []
+        if mentions:
+            loci = [[0, 7]] * mentions
+            attachments = [
+                {"type": "mentions", "loci": loci, "user_ids": ["1"] * mentions}
+            ]
+            text = "@Member " + text
+        result.append(
+            {
+                "id": str(156859308710073974 + i),
+                "source_guid": "guid-" + str(i),
+                "created_at": 1568593088 + i,
+                "user_id": "30038058",
+                "group_id": "53616101",
+                "name": "Member",
+                "avatar_url": None,
+                "text": text,
+                "system": False,
+                "favorited_by": [],
+                "attachments": attachments,
+                "sender_type": "user",
+                "sender_id": "30038058",
+            }
+        )
+    return result
+
+
+def members(count: int) -> List[JsonType]:
+    return [
+        {
+            "id": str(482251665 + i),
+            "user_id": str(30038058 + i),
+            "nickname": "Member " + str(i),
+            "muted": False,
+            "image_url": None,
+            "autokicked": False,
+            "roles": ["user"],
+        }
+        for i in range(count)
+    ]
+
+
+def groups(count: int) -> List[JsonType]:
+    return [
+        {
+            "id": str(53616101 + i),
+            "name": "Group " + str(i),
+            "type": "private",
+            "creator_user_id": "30038058",
+            "created_at": 1568593086,
+            "updated_at": 1568593087,
+            "members": [],
+            "messages": {"count": 0, "last_message_id": None},
+        }
+        for i in range(count)
+    ]
+
+
+def direct_messages(count: int) -> List[JsonType]:
+    return [
+        {
+            "id": str(156808540854343974 + i),
+            "conversation_id": "30038058+51547012",
+            "created_at": 1568085408 + i,
+            "recipient_id": "30038058",
+            "sender_id": "51547012",
+            "user_id": "51547012",
+            "sender_type": "user",
+            "name": "Other",
+            "avatar_url": None,
+            "source_guid": "guid-" + str(i),
+            "text": "Direct message " + str(i),
+            "attachments": [],
+            "favorited_by": [],
+        }
+        for i in range(count)
+    ]
+
+
+def make_cases() -> List[Case]:
+    gmi = GMI("benchmark")
+    frame = MessageFrame()
+    return [
+        ("Message", messages(COUNT), lambda j: Message.from_json(gmi, j)),
+        (
+            "Message with mention",
+            messages(COUNT, 1),
+            lambda j: Message.from_json(gmi, j),
+        ),
+        ("MessageFrame row", messages(COUNT), frame.append),
+        ("Member", members(COUNT), lambda j: Member.from_json(gmi, j, "53616101")),
+        ("Group", groups(COUNT), lambda j: Group.from_json(gmi, j)),
+        (
+            "DirectMessage",
+            direct_messages(COUNT),
+            lambda j: DirectMessage.from_json(gmi, j),
+        ),
+    ]
+
+
+def bytes_per_object(
+    payloads: List[JsonType], parse: Callable[[JsonType], Any]  # pyre-ignore
+) -> float:
+    objects = [None] * len(payloads)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for i, payload in enumerate(payloads):
+            objects[i] = parse(payload)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (after - before) / len(objects)
+
+
+def history_bytes(count: int, intern_strings: bool) -> int:
+    # Unlike bytes_per_object the JSON is decoded page by page and then dropped, like
+    # MessagesIndexRequest does, so the messages keep the only copy of their strings.
+    # 40 people sending messages in one group
+    gmi = GMI("benchmark")
+    gmi.intern_strings = intern_strings
+    senders = [str(30038058 + i) for i in range(40)]
+    history: List[Message] = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for page_start in range(0, count, 100):
+            page = []
+            for i in range(page_start, min(count, page_start + 100)):
+                sender = senders[i * 7 % len(senders)]
+                page.append(
+                    {
+                        "id": str(156859308710073974 + i),
+                        "source_guid": "guid-" + str(i),
+                        "created_at": 1568593088 + i,
+                        "user_id": sender,
+                        "group_id": "53616101",
+                        "name": "Member " + sender,
+                        "avatar_url": "https://i.groupme.com/" + sender,
+                        "text": "Message number " + str(i),
+                        "system": False,
+                        "favorited_by": [],
+                        "attachments": [],
+                        "sender_type": "user",
+                        "sender_id": sender,
+                    }
+                )
+            for message_json in json.loads(json.dumps(page)):
+                history.append(Message.from_json(gmi, message_json))
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before
+
+
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(BASELINES):
+        return {}
+    with open(BASELINES) as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--save", action="store_true", help="store new baselines")
+    parser.add_argument("--history", type=int, default=0, help="messages in history")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    results: Dict[str, Dict[str, float]] = {}
+    print("%-24s %14s %14s" % ("model", "bytes/object", "vs base"))
+    for name, payloads, parse in make_cases():
+        result = {"bytes_per_object": round(bytes_per_object(payloads, parse), 1)}
+        results[name] = result
+        change = ""
+        baseline = baselines.get(name)
+        if baseline is not None:
+            ratio = result["bytes_per_object"] / baseline["bytes_per_object"]
+            change = "%+.0f%%" % ((ratio - 1) * 100)
+        print("%-24s %14.1f %14s" % (name, result["bytes_per_object"], change))
+
+    if args.history:
+        plain = history_bytes(args.history, intern_strings=False)
+        interned = history_bytes(args.history, intern_strings=True)
+        print()
+        print("%d message history" % args.history)
+        print("%-24s %14.1f MiB" % ("plain", plain / 2**20))
+        print(
+            "%-24s %14.1f MiB %+.0f%%"
+            % ("intern_strings", interned / 2**20, (interned / plain - 1) * 100)
+        )
+
+    if args.save:
+        baselines.update(results)
+        os.makedirs(os.path.dirname(BASELINES), exist_ok=True)
+        with open(BASELINES, "w") as f:
+            json.dump(baselines, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print("Saved baselines to " + BASELINES)
+
+
+if __name__ == "__main__":
+    main()
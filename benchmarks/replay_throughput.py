@@ -0,0 +1,63 @@
+# pyre-strict
+# Measures client-side cost per request (preparing, decoding and parsing) with no
+# network, by replaying the recordings in test_data/ from memory
+#
+#   python benchmarks/replay_throughput.py
+import os
+import sys
+import time
+from typing import Any, Callable, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.endpoints.bot import BotIndexRequest  # noqa: E402
+from lowerpines.endpoints.group import GroupsShowRequest  # noqa: E402
+from lowerpines.endpoints.message import MessagesIndexRequest  # noqa: E402
+from lowerpines.endpoints.user import UserMeRequest  # noqa: E402
+from lowerpines.executor import ThreadedExecutor  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+from lowerpines.transport import LatencyTransport, ReplayTransport  # noqa: E402
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "test_data")
+DURATION = 1.0
+
+
+def throughput(func: Callable[[], Any]) -> float:  # pyre-ignore
+    count = 0
+    start = time.perf_counter()
+    deadline = start + DURATION
+    while time.perf_counter() < deadline:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    gmi = GMI("benchmark")
+    gmi.client = ReplayTransport.from_directory(TEST_DATA)
+
+    cases: List[Tuple[str, Callable[[], Any]]] = [  # pyre-ignore
+        ("UserMeRequest", lambda: UserMeRequest(gmi)),
+        ("BotIndexRequest", lambda: BotIndexRequest(gmi)),
+        ("GroupsShowRequest", lambda: GroupsShowRequest(gmi, "53616101")),
+        (
+            "MessagesIndexRequest (100)",
+            lambda: MessagesIndexRequest(gmi, "53616101", limit=100),
+        ),
+    ]
+    for name, func in cases:
+        print("%-28s %10.0f requests/s" % (name, throughput(func)))
+
+    # With 10ms of injected latency, the thread pool should hide most of the wait
+    gmi.client = LatencyTransport(ReplayTransport.from_directory(TEST_DATA), 0.01)
+    plans = [UserMeRequest.plan(gmi) for _ in range(400)]
+    start = time.perf_counter()
+    ThreadedExecutor(32).run_all(plans)
+    elapsed = time.perf_counter() - start
+    print(
+        "%-28s %10.0f requests/s" % ("UserMeRequest, 10ms, 32 threads", 400 / elapsed)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# pyre-strict
+# Compares keeping many groups up to date by re-downloading their histories with
+# SyncEngine, which only fetches groups whose last message changed since the last sync.
+# Runs in-process against the fake store in test/fake_server.py, with injected latency
+#
+#   python benchmarks/sync.py --groups 1000 --messages 200 --active 0.02 --latency 0.005
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lowerpines.crawler import HistoryCrawler  # noqa: E402
+from lowerpines.endpoints.group import Group, GroupsIndexRequest  # noqa: E402
+from lowerpines.endpoints.message import Message  # noqa: E402
+from lowerpines.gmi import GMI  # noqa: E402
+from lowerpines.sync import SyncEngine  # noqa: E402
+from lowerpines.transport import LatencyTransport  # noqa: E402
+from test.fake_server import FakeGroupMe, FakeTransport  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--active", type=float, default=0.02, help="share of groups")
+    parser.add_argument("--new", type=int, default=5, help="messages per active group")
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    store = FakeGroupMe()
+    group_ids = store.seed(args.groups, args.messages)
+    fake = FakeTransport(store)
+    gmi = GMI("benchmark")
+    gmi.client = LatencyTransport(fake, args.latency)
+    messages = 0
+
+    def handle(group: Group, page: List[Message]) -> None:
+        nonlocal messages
+        messages += len(page)
+
+    def report(name: str, start: float, requests: int) -> None:
+        elapsed = time.perf_counter() - start
+        print(
+            "%-24s %8.2fs %10d %10d"
+            % (name, elapsed, fake.requests - requests, messages)
+        )
+
+    print("%d groups, %d messages each" % (args.groups, args.messages))
+    print("%-24s %9s %10s %10s" % ("run", "time", "requests", "messages"))
+
+    start, requests = time.perf_counter(), fake.requests
+    groups: List[Group] = []
+    page = 1
+    while True:
+        groups_page = GroupsIndexRequest(gmi, page=page, per_page=100).result
+        groups.extend(groups_page)
+        if len(groups_page) < 100:
+            break
+        page += 1
+    HistoryCrawler(gmi, args.concurrency).crawl(groups, handle)
+    report("full download", start, requests)
+
+    engine = SyncEngine(gmi, concurrency=args.concurrency)
+    engine.sync(handle)
+    active = group_ids[:: max(1, int(1 / args.active))] if args.active else []
+    for group_id in active:
+        sender = store.groups[group_id]["members"][0]
+        for i in range(args.new):
+            store.add_message(store._new_message(group_id, sender, "New " + str(i)))
+    messages = 0
+    start, requests = time.perf_counter(), fake.requests
+    engine.sync(handle)
+    report("sync, %d groups active" % len(active), start, requests)
+
+    messages = 0
+    start, requests = time.perf_counter(), fake.requests
+    engine.sync(handle)
+    report("sync, no activity", start, requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# pyre-strict
+import asyncio
+import time
+from datetime import datetime
+from types import TracebackType
+from typing import Any, Generic, List, Optional, Type, TypeVar, Union, TYPE_CHECKING
+
+import requests
+from requests import Response
+
+from lowerpines.client import AsyncHttpClient, HttpClient
+from lowerpines.endpoints.bot import (
+    Bot,
+    BotCreateRequest,
+    BotDestroyRequest,
+    BotIndexRequest,
+    BotPostRequest,
+)
+from lowerpines.endpoints.chat import (
+    Chat,
+    DirectMessage,
+    DirectMessageChatsRequest,
+    DirectMessageCreateRequest,
+    DirectMessageIndexRequest,
+)
+from lowerpines.endpoints.group import (
+    Group,
+    GroupsFormerRequest,
+    GroupsIndexRequest,
+    GroupsJoinRequest,
+    GroupsRejoinRequest,
+    GroupsShowRequest,
+)
+from lowerpines.endpoints.message import (
+    Message,
+    MessagesCreateRequest,
+    MessagesIndexRequest,
+)
+from lowerpines.endpoints.request import JsonType, PreparedCall, Request
+from lowerpines.endpoints.user import User, UserMeRequest, UserUpdateRequest
+from lowerpines.gmi import GMI
+from lowerpines.manager import AbstractManager
+from lowerpines.message import smart_split_complex_message
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.message import ComplexMessage
+
+T = TypeVar("T")
+
+
+class AsyncGMI:
+    def __init__(self, access_token: str) -> None:
+        self.access_token = access_token
+        # Sends the requests while gmi.client is an HttpClient, see _send
+        self.client = AsyncHttpClient()
+        # Objects returned by the async managers are bound to this GMI, so their
+        # (blocking) methods keep working outside of the event loop
+        self.gmi = GMI(access_token)
+
+        self.groups = AsyncGroupManager(self)
+        self.bots = AsyncBotManager(self)
+        self.chats = AsyncChatManager(self)
+        self.user = AsyncUserManager(self)
+
+    async def request(
+        self, request_class: Type[Request[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        return await self.execute(request_class.plan(self.gmi, *args, **kwargs))
+
+    async def execute(self, request: Request[T]) -> T:
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            flight = self.gmi.singleflight
+            if flight is not None and request.coalescable():
+                leader, request.coalesced = await flight.do_async(
+                    request.flight_key(), lambda: self._run_once(request)
+                )
+                if request.coalesced:
+                    request.share_from(leader)
+            else:
+                await self._run_once(request)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            request.finish(start, error)
+        # Requests with an empty response body never set a result
+        return getattr(request, "result", None)  # type: ignore
+
+    async def _run_once(self, request: Request[T]) -> Request[T]:
+        request.complete(await self._execute(request))
+        return request
+
+    async def _execute(self, request: Request[T]) -> Optional[JsonType]:
+        # Drives the same steps as Request.execute, without blocking the event loop
+        steps = request.steps()
+        try:
+            step = next(steps)
+            while True:
+                if isinstance(step, PreparedCall):
+                    try:
+                        response = await self._send(request, step)
+                    except requests.RequestException as e:
+                        step = steps.throw(e)
+                    else:
+                        step = steps.send(response)
+                elif isinstance(step, Request):
+                    step = steps.send(await self.execute(step))
+                else:
+                    await asyncio.sleep(step)
+                    step = next(steps)
+        except StopIteration as done:
+            return done.value
+
+    async def _send(self, request: Request[T], call: PreparedCall) -> Response:
+        limiter = self.gmi.rate_limiter
+        if limiter is not None:
+            await limiter.acquire_async(request)
+        start = time.perf_counter()
+        try:
+            transport = self.gmi.client
+            if isinstance(transport, HttpClient):
+                return await self.client.request(
+                    call.method,
+                    url=call.url,
+                    params=call.params,
+                    headers=call.headers,
+                    data=call.data,
+                )
+            # Any other transport set on gmi.client (ReplayTransport, LatencyTransport...)
+            # blocks, so it is run on the event loop's default executor
+            return await asyncio.get_running_loop().run_in_executor(
+                None, transport.send, call
+            )
+        finally:
+            request.timings.network += time.perf_counter() - start
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def __aenter__(self) -> "AsyncGMI":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+
+class AsyncAbstractManager(Generic[T]):
+    def __init__(self, gmi: AsyncGMI) -> None:
+        self.gmi = gmi
+
+    async def _all(self) -> List[T]:
+        raise NotImplementedError  # pragma: no cover
+
+    async def all(self) -> AbstractManager[T]:
+        return AbstractManager(self.gmi.gmi, await self._all())
+
+    async def filter(self, **kwargs: Any) -> AbstractManager[T]:
+        return (await self.all()).filter(**kwargs)
+
+    async def get(self, **kwargs: Any) -> T:
+        return (await self.all()).get(**kwargs)
+
+
+class AsyncGroupManager(AsyncAbstractManager[Group]):
+    async def _all(self) -> List[Group]:
+        return await self.gmi.request(GroupsIndexRequest, per_page=100)
+
+    async def former(self) -> AbstractManager[Group]:
+        groups = await self.gmi.request(GroupsFormerRequest)
+        return AbstractManager(self.gmi.gmi, groups)
+
+    async def show(self, group_id: str) -> Group:
+        return await self.gmi.request(GroupsShowRequest, group_id)
+
+    async def refresh(self, group: Group) -> Group:
+        group._refresh_from_other(await self.show(group.group_id))
+        return group
+
+    async def join(self, group_id: str, share_token: str) -> Group:
+        return await self.gmi.request(GroupsJoinRequest, group_id, share_token)
+
+    async def rejoin(self, group_id: str) -> Group:
+        return await self.gmi.request(GroupsRejoinRequest, group_id)
+
+    async def messages(
+        self,
+        group: Group,
+        before_id: Optional[str] = None,
+        since_id: Optional[str] = None,
+        after_id: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Message]:
+        return await self.gmi.request(
+            MessagesIndexRequest,
+            group.group_id,
+            before_id=before_id,
+            since_id=since_id,
+            after_id=after_id,
+            limit=limit,
+        )
+
+    async def post(
+        self, group: Group, message: Union["ComplexMessage", str]
+    ) -> Message:
+        text, attachments = smart_split_complex_message(message)
+        return await self.gmi.request(
+            MessagesCreateRequest,
+            group.group_id,
+            str(datetime.now()),
+            text,
+            attachments,
+        )
+
+
+class AsyncBotManager(AsyncAbstractManager[Bot]):
+    async def _all(self) -> List[Bot]:
+        return await self.gmi.request(BotIndexRequest)
+
+    async def create(
+        self,
+        group: Group,
+        name: str,
+        callback_url: Optional[str] = None,
+        avatar_url: Optional[str] = None,
+    ) -> Bot:
+        return await self.gmi.request(
+            BotCreateRequest, group.group_id, name, callback_url, avatar_url
+        )
+
+    async def post(self, bot: Bot, message: Union["ComplexMessage", str]) -> None:
+        text, attachments = smart_split_complex_message(message)
+        await self.gmi.request(BotPostRequest, bot.bot_id, text, attachments)
+
+    async def delete(self, bot: Bot) -> None:
+        await self.gmi.request(BotDestroyRequest, bot.bot_id)
+
+
+class AsyncChatManager(AsyncAbstractManager[Chat]):
+    async def _all(self) -> List[Chat]:
+        return await self.gmi.request(DirectMessageChatsRequest)
+
+    async def messages(
+        self,
+        chat: Chat,
+        before_id: Optional[str] = None,
+        since_id: Optional[str] = None,
+    ) -> List[DirectMessage]:
+        return await self.gmi.request(
+            DirectMessageIndexRequest,
+            chat.other_user.user_id,
+            before_id=before_id,
+            since_id=since_id,
+        )
+
+    async def post(
+        self, chat: Chat, message: Union["ComplexMessage", str]
+    ) -> DirectMessage:
+        text, attachments = smart_split_complex_message(message)
+        me = await self.gmi.user.get()
+        return await self.gmi.request(
+            DirectMessageCreateRequest,
+            me.user_id,
+            chat.other_user.user_id,
+            text,
+            attachments,
+        )
+
+
+class AsyncUserManager(AsyncAbstractManager[User]):
+    async def _all(self) -> List[User]:
+        return [await self.gmi.request(UserMeRequest)]
+
+    async def save(self, user: User) -> User:
+        user._refresh_from_other(
+            await self.gmi.request(
+                UserUpdateRequest, user.image_url, user.name, user.email
+            )
+        )
+        return user
@@ -0,0 +1,123 @@
+# pyre-strict
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple, TYPE_CHECKING
+
+from requests import Response
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.endpoints.request import JsonType, PreparedCall, Request
+
+CacheKey = Tuple[str, str, str]
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class CacheEntry:
+    def __init__(self, response: Response, ttl: float) -> None:
+        self.response = response
+        self.expires = time.monotonic() + ttl
+        self.etag: Optional[str] = response.headers.get("ETag")
+        self.last_modified: Optional[str] = response.headers.get("Last-Modified")
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+    def renew(self, ttl: float) -> None:
+        self.expires = time.monotonic() + ttl
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def __repr__(self) -> str:
+        return (
+            "CacheStats(hits="
+            + str(self.hits)
+            + ", misses="
+            + str(self.misses)
+            + ", revalidated="
+            + str(self.revalidated)
+            + ", evictions="
+            + str(self.evictions)
+            + ")"
+        )
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least 1 entry")
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(
+        self, request: "Request[Any]", call: "PreparedCall"
+    ) -> Optional[CacheEntry]:
+        # Returns the cached entry, if the entry is stale the call is turned into a
+        # conditional request so an unchanged response does not have to be sent again
+        if request.cache_ttl is None or request.mode() != "GET":
+            return None
+        with self._lock:
+            entry = self._entries.get(request.key())
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(request.key())
+            if entry.fresh:
+                self.stats.hits += 1
+                return entry
+        if entry.etag is not None:
+            call.headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            call.headers["If-Modified-Since"] = entry.last_modified
+        return entry
+
+    def complete(
+        self,
+        request: "Request[Any]",
+        entry: Optional[CacheEntry],
+        response: Response,
+    ) -> Optional["JsonType"]:
+        ttl = request.cache_ttl
+        if entry is not None and ttl is not None and response.status_code == 304:
+            with self._lock:
+                self.stats.revalidated += 1
+            entry.renew(ttl)
+            return request.handle_response(entry.response)
+        result = request.handle_response(response)
+        if ttl is not None and request.mode() == "GET":
+            self.store(request.key(), CacheEntry(response, ttl))
+        self.invalidate(request.invalidates())
+        return result
+
+    def store(self, key: CacheKey, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, urls: Iterable[str]) -> None:
+        stale_urls = set(urls)
+        if not stale_urls:
+            return
+        with self._lock:
+            for key in [key for key in self._entries if key[1] in stale_urls]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
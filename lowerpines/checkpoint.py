@@ -0,0 +1,41 @@
+# pyre-strict
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+class Checkpoint:
+    # Where long-running jobs (HistoryCrawler...) stand, as one JSON object per key, e.g.
+    # {"group:123": {"before_id": "456", "done": false}}. Without a path it only lives in
+    # memory. save() writes a temporary file and renames it over path, so an interrupted
+    # run always leaves the last complete save behind.
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}  # pyre-ignore
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def get(self, key: str) -> Dict[str, Any]:  # pyre-ignore
+        with self._lock:
+            return dict(self.entries.get(key, {}))
+
+    def update(self, key: str, **values: Any) -> None:  # pyre-ignore
+        with self._lock:
+            self.entries.setdefault(key, {}).update(values)
+
+    def save(self) -> None:
+        path = self.path
+        if path is None:
+            return
+        with self._lock:
+            data = json.dumps(self.entries, sort_keys=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(data)
+        os.replace(temp_path, path)
@@ -0,0 +1,196 @@
+# pyre-strict
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Type, Union
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+from lowerpines.transport import Transport
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, reused: bool) -> None:
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def __repr__(self) -> str:
+        return "PoolStats(hits=" + str(self.hits) + ", misses=" + str(self.misses) + ")"
+
+
+def _counting_pool_class(
+    base: Type[HTTPConnectionPool], stats: PoolStats
+) -> Type[HTTPConnectionPool]:
+    class CountingConnectionPool(base):  # type: ignore
+        # A connection that already has a socket is reused as-is, anything else has to
+        # go through a fresh TCP (and TLS) handshake before the request can be sent
+        def _get_conn(self, timeout: Optional[float] = None) -> Any:  # pyre-ignore
+            conn = super()._get_conn(timeout)
+            stats.record(getattr(conn, "sock", None) is not None)
+            return conn
+
+    return CountingConnectionPool
+
+
+class PoolingAdapter(HTTPAdapter):
+    def __init__(self, stats: PoolStats, **kwargs: Any) -> None:
+        # HTTPAdapter.__init__ calls init_poolmanager, so stats has to be set first
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self.stats),
+            "https": _counting_pool_class(HTTPSConnectionPool, self.stats),
+        }
+
+
+class HttpClient(Transport):
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: Optional[float] = None,
+    ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_used = time.monotonic()
+
+        self.session = requests.Session()
+        adapter = PoolingAdapter(
+            self.stats, pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def pool_hits(self) -> int:
+        return self.stats.hits
+
+    @property
+    def pool_misses(self) -> int:
+        return self.stats.misses
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        self._acquire()
+        try:
+            return self.session.request(
+                method, url, params=params, headers=headers, data=data
+            )
+        finally:
+            self._release()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _acquire(self) -> None:
+        with self._lock:
+            idle_timeout = self.idle_timeout
+            if (
+                idle_timeout is not None
+                and self._in_flight == 0
+                and time.monotonic() - self._last_used > idle_timeout
+            ):
+                # Pools are rebuilt on demand, so this only drops the idle sockets
+                self.session.close()
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+
+class AsyncHttpClient:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = DEFAULT_POOL_MAXSIZE,
+        idle_timeout: float = 15.0,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.idle_timeout = idle_timeout
+        self._session: Any = None  # pyre-ignore
+
+    def _get_session(self) -> Any:  # pyre-ignore
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError:  # pragma: no cover
+                raise ImportError(
+                    "AsyncHttpClient requires aiohttp, install it with: pip install lowerpines[async]"
+                )
+
+            # The session binds to the running event loop, so it can only be created lazily
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.idle_timeout,
+                )
+            )
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        session = self._get_session()
+        import aiohttp
+
+        try:
+            async with session.request(
+                method, url, params=params, headers=headers, data=data
+            ) as r:
+                # Responses are converted so Request.error_check and extract_response are shared
+                response = Response()
+                response.status_code = r.status
+                response.headers = CaseInsensitiveDict(r.headers)
+                response.url = str(r.url)
+                response.encoding = r.charset
+                response._content = await r.read()
+                return response
+        except aiohttp.ClientConnectorError as e:
+            # Errors are converted too, so the retry policy sees the same exceptions
+            raise requests.ConnectTimeout(e)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise requests.ConnectionError(e)
+
+    async def close(self) -> None:
+        session = self._session
+        if session is not None:
+            self._session = None
+            await session.close()
@@ -0,0 +1,168 @@
+# pyre-strict
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from lowerpines.checkpoint import Checkpoint
+from lowerpines.endpoints.group import Group
+from lowerpines.endpoints.message import Message, MessagesIndexRequest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.gmi import GMI
+
+PageHandler = Callable[[Group, List[Message]], None]
+
+
+class CrawlProgress:
+    def __init__(self, groups: int) -> None:
+        self.groups = groups
+        self.groups_done = 0
+        self.pages = 0
+        self.messages = 0
+        self.in_flight = 0
+        # Groups whose pages could not be fetched, by group_id. They stay unfinished in
+        # the checkpoint, so the next run retries them
+        self.errors: Dict[str, Exception] = {}
+        self._start = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    @property
+    def messages_per_sec(self) -> float:
+        elapsed = self.elapsed
+        return self.messages / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            "CrawlProgress(groups="
+            + str(self.groups_done)
+            + "/"
+            + str(self.groups)
+            + ", pages="
+            + str(self.pages)
+            + ", messages="
+            + str(self.messages)
+            + ", errors="
+            + str(len(self.errors))
+            + ")"
+        )
+
+
+class _GroupCrawl:
+    def __init__(
+        self,
+        group: Group,
+        key: str,
+        before_id: Optional[str],
+        last_id: Optional[str],
+    ) -> None:
+        self.group = group
+        self.key = key
+        self.before_id = before_id
+        self.last_id = last_id
+
+
+class HistoryCrawler:
+    # Downloads the message histories of many groups at once, each newest to oldest.
+    #
+    # A group's pages form a chain (each before_id is the last id of the page before), so
+    # a group has at most one request in flight, and at most `concurrency` requests are in
+    # flight overall. When a group's page arrives the group goes to the back of the queue,
+    # so every waiting group gets a request before any gets its next one and a few huge
+    # groups can't hold up the small ones.
+    #
+    # handle(group, messages) and on_progress(progress) are called on the thread running
+    # crawl(), one page at a time. With a checkpoint a group's position is recorded once
+    # handle() has returned for a page and saved every checkpoint_interval seconds and when
+    # crawl() returns or raises; a later crawl() with the same checkpoint skips finished
+    # groups and resumes the others after the last recorded page. Pages handled after the
+    # last save are handed to handle() again.
+    def __init__(
+        self,
+        gmi: "GMI",
+        concurrency: int = 8,
+        checkpoint: Optional[Checkpoint] = None,
+        checkpoint_interval: float = 5.0,
+        on_progress: Optional[Callable[[CrawlProgress], None]] = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.gmi = gmi
+        self.concurrency = concurrency
+        self.checkpoint: Checkpoint = (
+            checkpoint if checkpoint is not None else Checkpoint()
+        )
+        self.checkpoint_interval = checkpoint_interval
+        self.on_progress = on_progress
+
+    def crawl(self, groups: Iterable[Group], handle: PageHandler) -> CrawlProgress:
+        checkpoint = self.checkpoint
+        groups = list(groups)
+        progress = CrawlProgress(len(groups))
+        ready: Deque[_GroupCrawl] = deque()
+        for group in groups:
+            key = "group:" + str(group.group_id)
+            state = checkpoint.get(key)
+            if state.get("done"):
+                progress.groups_done += 1
+            else:
+                ready.append(
+                    _GroupCrawl(
+                        group, key, state.get("before_id"), state.get("last_id")
+                    )
+                )
+
+        in_flight: Dict["Future[List[Message]]", _GroupCrawl] = {}
+        last_save = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while ready or in_flight:
+                while ready and len(in_flight) < self.concurrency:
+                    crawl = ready.popleft()
+                    in_flight[pool.submit(self._fetch, crawl)] = crawl
+                progress.in_flight = len(in_flight)
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    crawl = in_flight.pop(future)
+                    try:
+                        messages = future.result()
+                    except Exception as e:
+                        progress.errors[crawl.group.group_id] = e
+                        continue
+                    if messages:
+                        handle(crawl.group, messages)
+                        if crawl.last_id is None:
+                            # The newest message, where an incremental sync can pick up
+                            # once the backfill is done
+                            crawl.last_id = messages[0].message_id
+                        crawl.before_id = messages[-1].message_id
+                        checkpoint.update(
+                            crawl.key, before_id=crawl.before_id, last_id=crawl.last_id
+                        )
+                        progress.pages += 1
+                        progress.messages += len(messages)
+                        ready.append(crawl)
+                    else:
+                        checkpoint.update(crawl.key, done=True)
+                        progress.groups_done += 1
+                progress.in_flight = len(in_flight)
+                if self.on_progress is not None:
+                    self.on_progress(progress)
+                if time.monotonic() - last_save >= self.checkpoint_interval:
+                    checkpoint.save()
+                    last_save = time.monotonic()
+        finally:
+            # Requests already sent are waited for, their pages are dropped
+            pool.shutdown(wait=True)
+            checkpoint.save()
+        return progress
+
+    def _fetch(self, crawl: _GroupCrawl) -> List[Message]:
+        plan = MessagesIndexRequest.plan(
+            self.gmi, crawl.group.group_id, before_id=crawl.before_id, limit=100
+        )
+        # GroupMe answers 304 with no body when there are no more messages
+        return plan.run() or []
@@ -32,6 +32,8 @@ class Block(AbstractObject):
 
 
 class BlockIndexRequest(Request[List[Block]]):
+    cache_ttl = 60.0
+
     def __init__(self, gmi: "GMI", user_id: str) -> None:
         self.user_id = user_id
         super().__init__(gmi)
@@ -80,6 +82,9 @@ class BlockCreateRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/blocks"]
+
     def parse(self, response: JsonType) -> None:
         return None
 
@@ -105,6 +110,9 @@ class BlockUnblockRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/blocks"]
+
     def parse(self, response: JsonType) -> None:
         return None
 
@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Optional, List, Union
 from lowerpines.endpoints.message import AttachmentType
 from lowerpines.endpoints.object import AbstractObject, Field, RetrievableObject
 from lowerpines.endpoints.request import Request, JsonType
+from lowerpines.ratelimit import Priority
 from lowerpines.exceptions import InvalidOperationException
 from lowerpines.message import smart_split_complex_message
 
@@ -13,7 +14,7 @@ if TYPE_CHECKING:  # pragma: no cover
     from lowerpines.endpoints.group import Group
 
 
-class Bot(AbstractObject, RetrievableObject):
+class Bot(AbstractObject, RetrievableObject, key="bot_id"):
     bot_id: str = Field().with_type(str)
     group_id: str = Field().with_type(str)
     name: str = Field().with_type(str)
@@ -114,6 +115,9 @@ class BotCreateRequest(Request[Bot]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/bots"]
+
     def url(self) -> str:
         return self.base_url + "/bots"
 
@@ -132,6 +136,8 @@ class BotCreateRequest(Request[Bot]):
 
 
 class BotPostRequest(Request[None]):
+    priority = Priority.HIGH
+
     def __init__(
         self,
         gmi: "GMI",
@@ -161,6 +167,8 @@ class BotPostRequest(Request[None]):
 
 
 class BotIndexRequest(Request[List[Bot]]):
+    cache_ttl = 60.0
+
     def parse(self, response: JsonType) -> List[Bot]:
         bots = []
         for bot_json in response:
@@ -185,6 +193,9 @@ class BotDestroyRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/bots"]
+
     def url(self) -> str:
         return self.base_url + "/bots/destroy"
 
@@ -220,6 +231,9 @@ class BotUpdateRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/bots"]
+
     def args(self) -> JsonType:
         post_dict: JsonType = {"bot": {"bot_id": self.bot_id}}
         group_id = self.group_id
@@ -1,10 +1,12 @@
 # pyre-strict
-from typing import List, Optional, TYPE_CHECKING, Any
+from typing import List, Optional, TYPE_CHECKING, Any, TypeVar
 
 from lowerpines.endpoints.message import AttachmentType
 from lowerpines.endpoints.object import AbstractObject, Field
 from lowerpines.endpoints.request import Request, JsonType
+from lowerpines.ratelimit import Priority
 from lowerpines.exceptions import InvalidOperationException
+from lowerpines.history import MessageIterator
 from lowerpines.message import smart_split_complex_message
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -12,6 +14,9 @@ if TYPE_CHECKING:  # pragma: no cover
     from lowerpines.message import ComplexMessage
 
 
+T = TypeVar("T")
+
+
 class Chat(AbstractObject):
     created_at: int = Field().with_type(int)
     updated_at: int = Field().with_type(int)
@@ -56,7 +61,7 @@ class Chat(AbstractObject):
         return "C:" + str(self.other_user)
 
 
-class DirectMessage(AbstractObject):
+class DirectMessage(AbstractObject, slots=("gmi",)):
     @staticmethod
     def get(gmi: "GMI", *args: Any) -> None:
         raise InvalidOperationException("This is non-trivial to implement")
@@ -65,18 +70,18 @@ class DirectMessage(AbstractObject):
         raise InvalidOperationException("This is non-trivial to implement")
 
     attachments: List[AttachmentType] = Field().with_type(List[AttachmentType])
-    avatar_url: str = Field().with_type(str)
-    conversation_id: str = Field().with_type(str)
+    avatar_url: str = Field().interned().with_type(str)
+    conversation_id: str = Field().interned().with_type(str)
     created_at: str = Field().with_type(str)
     favorited_by: str = Field().with_type(str)
     direct_message_id: str = Field().with_api_name("id").with_type(str)
-    name: str = Field().with_type(str)
-    recipient_id: str = Field().with_type(str)
-    sender_id: str = Field().with_type(str)
-    sender_type: str = Field().with_type(str)
+    name: str = Field().interned().with_type(str)
+    recipient_id: str = Field().interned().with_type(str)
+    sender_id: str = Field().interned().with_type(str)
+    sender_type: str = Field().interned().with_type(str)
     source_guid: str = Field().with_type(str)
     text: str = Field().with_type(str)
-    user_id: str = Field().with_type(str)
+    user_id: str = Field().interned().with_type(str)
 
     def __init__(
         self,
@@ -126,7 +131,7 @@ class DirectMessageUser(AbstractObject):
         raise InvalidOperationException("This operation is non-trivial to implement")
 
     avatar_url: str = Field()  # type: ignore
-    user_id: str = Field()  # type: ignore
+    user_id: str = Field().with_api_name("id")  # type: ignore
     name: str = Field()  # type: ignore
 
     def __init__(self, gmi: "GMI") -> None:
@@ -151,6 +156,43 @@ class ChatMessagesManager:
             messages.extend(self.before(messages[-1]))
         return messages
 
+    def iter_all(self, prefetch: int = 0) -> MessageIterator[DirectMessage]:
+        # Like all(), but one page at a time, newest first
+        return self.iter_before(None, prefetch)
+
+    def iter_before(
+        self, before_id: Optional[str] = None, prefetch: int = 0
+    ) -> MessageIterator[DirectMessage]:
+        # Every message older than before_id (or all of them), newest first
+        return MessageIterator(
+            self._page, self._parse, cursor=before_id, prefetch=prefetch
+        )
+
+    def iter_since(
+        self, since_id: str, before_id: Optional[str] = None, prefetch: int = 0
+    ) -> MessageIterator[DirectMessage]:
+        # Every message newer than since_id, newest first: the direct messages API can
+        # only page backwards, so this walks back from the newest message (or from
+        # before_id, to resume) until it reaches since_id
+        return MessageIterator(
+            self._page,
+            self._parse,
+            cursor=before_id,
+            stop_at=since_id,
+            prefetch=prefetch,
+        )
+
+    def _page(self, before_id: Optional[str]) -> List[JsonType]:
+        return (
+            DirectMessageIndexJsonRequest.plan(
+                self.chat.gmi, self.chat.other_user.user_id, before_id=before_id
+            ).run()
+            or []
+        )
+
+    def _parse(self, message_json: JsonType) -> DirectMessage:
+        return DirectMessage.from_json(self.chat.gmi, message_json)
+
     def recent(self) -> List[DirectMessage]:
         return DirectMessageIndexRequest(
             self.chat.gmi, self.chat.other_user.user_id
@@ -200,7 +242,10 @@ class DirectMessageChatsRequest(Request[List[Chat]]):
         return "GET"
 
 
-class DirectMessageIndexRequest(Request[List[DirectMessage]]):
+class _DirectMessageIndex(Request[T]):
+    # A page of a chat's messages, parsed by the subclasses
+    priority = Priority.LOW
+
     def __init__(
         self,
         gmi: "GMI",
@@ -228,17 +273,27 @@ class DirectMessageIndexRequest(Request[List[DirectMessage]]):
             arg_dict["since_id"] = since_id
         return arg_dict
 
+    def mode(self) -> str:
+        return "GET"
+
+
+class DirectMessageIndexRequest(_DirectMessageIndex[List[DirectMessage]]):
     def parse(self, response: JsonType) -> List[DirectMessage]:
         dms = []
         for dm_json in response["direct_messages"]:
             dms.append(DirectMessage.from_json(self.gmi, dm_json))
         return dms
 
-    def mode(self) -> str:
-        return "GET"
+
+class DirectMessageIndexJsonRequest(_DirectMessageIndex[List[JsonType]]):
+    # The same page, as the API's message JSON instead of DirectMessage objects
+    def parse(self, response: JsonType) -> List[JsonType]:
+        return response["direct_messages"]
 
 
 class DirectMessageCreateRequest(Request[DirectMessage]):
+    priority = Priority.HIGH
+
     def __init__(
         self,
         gmi: "GMI",
@@ -5,9 +5,15 @@ from typing import TYPE_CHECKING, Optional, List, Union
 
 from lowerpines.endpoints.object import AbstractObject, Field, RetrievableObject
 from lowerpines.endpoints.request import Request, JsonType
-from lowerpines.endpoints.member import MembersAddRequest, MembersRemoveRequest, Member
+from lowerpines.endpoints.member import (
+    MembersAddRequest,
+    MembersRemoveRequest,
+    MemberList,
+)
 from lowerpines.endpoints.message import Message
 from lowerpines.exceptions import InvalidOperationException
+from lowerpines.frame import MessageFrame
+from lowerpines.history import MessageIterator
 from lowerpines.message import smart_split_complex_message
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -17,7 +23,12 @@ if TYPE_CHECKING:  # pragma: no cover
     from lowerpines.manager import AbstractManager
 
 
-class Group(AbstractObject, RetrievableObject):
+class Group(
+    AbstractObject,
+    RetrievableObject,
+    slots=("gmi", "messages", "members"),
+    key="group_id",
+):
     group_id: str = Field().with_api_name("id").with_type(str)
     name: str = Field().with_type(str)
     type: str = Field().with_type(str)
@@ -30,7 +41,7 @@ class Group(AbstractObject, RetrievableObject):
     share_qr_code_url: Optional[str] = Field().with_type(str)
     office_mode: bool = Field().with_type(bool)
     phone_number: Optional[str] = Field().with_type(str)
-    members: List[Member]
+    members: MemberList
     members_raw: List[JsonType] = (
         Field().with_api_name("members").with_type(List[JsonType])
     )
@@ -55,16 +66,14 @@ class Group(AbstractObject, RetrievableObject):
         self.name = name  # type: ignore
         self.description = description
         self.image_url = image_url
-        self.members = []
+        self.members = MemberList(gmi, None, [])
 
     @property
     def bots(self) -> "AbstractManager[Bot]":
         return self.gmi.bots.filter(group_id=self.group_id)
 
     def on_fields_loaded(self) -> None:
-        self.members = []
-        for member_json in self.members_raw:
-            self.members.append(Member.from_json(self.gmi, member_json, self.group_id))
+        self.members = MemberList(self.gmi, self.group_id, self.members_raw)
         self.messages.count = self.messages_count_raw
         self.messages.last_id = self.messages_last_message_id_raw
         self.messages.last_created_at = self.messages_last_message_created_at_raw
@@ -151,6 +160,65 @@ class GroupMessagesManager:
             messages.extend(self.before(messages[-1]))
         return messages
 
+    def iter_all(self, prefetch: int = 0) -> MessageIterator[Message]:
+        # Like all(), but one page at a time, newest first
+        return self.iter_before(None, prefetch)
+
+    def iter_before(
+        self, before_id: Optional[str] = None, prefetch: int = 0
+    ) -> MessageIterator[Message]:
+        # Every message older than before_id (or all of them), newest first
+        return MessageIterator(
+            lambda cursor: self._page(before_id=cursor),
+            self._parse,
+            cursor=before_id,
+            prefetch=prefetch,
+        )
+
+    def iter_since(self, since_id: str, prefetch: int = 0) -> MessageIterator[Message]:
+        # Every message newer than since_id, oldest first
+        return MessageIterator(
+            lambda cursor: self._page(after_id=cursor),
+            self._parse,
+            cursor=since_id,
+            prefetch=prefetch,
+        )
+
+    def _page(
+        self, before_id: Optional[str] = None, after_id: Optional[str] = None
+    ) -> List[JsonType]:
+        from lowerpines.endpoints.message import MessagesIndexJsonRequest
+
+        # Planned and run rather than constructed, so that paging still sends its
+        # requests inside deferred(). GroupMe answers 304 with no body when there are
+        # no more messages
+        return (
+            MessagesIndexJsonRequest.plan(
+                self.group.gmi,
+                self.group.group_id,
+                before_id=before_id,
+                after_id=after_id,
+                limit=100,
+            ).run()
+            or []
+        )
+
+    def _parse(self, message_json: JsonType) -> Message:
+        return Message.from_json(self.group.gmi, message_json)
+
+    def frame(self, frame: Optional[MessageFrame] = None) -> MessageFrame:
+        # Like all(), but the pages go straight into a MessageFrame without creating
+        # Message objects
+        if frame is None:
+            frame = MessageFrame()
+        before_id = None
+        while True:
+            page = self._page(before_id=before_id)
+            if not page:
+                return frame
+            frame.extend(page)
+            before_id = page[-1]["id"]
+
     def recent(self, count: int = 100) -> List[Message]:
         from lowerpines.endpoints.message import MessagesIndexRequest
 
@@ -229,6 +297,8 @@ class GroupsFormerRequest(Request[List[Group]]):
 
 
 class GroupsShowRequest(Request[Group]):
+    cache_ttl = 30.0
+
     def __init__(self, gmi: "GMI", group_id: str) -> None:
         self.group_id = group_id
         super().__init__(gmi)
@@ -312,6 +382,9 @@ class GroupsUpdateRequest(Request[Group]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + str(self.group_id)]
+
     def args(self) -> JsonType:
         arg_dict = {}
         if self.name is not None:
@@ -341,6 +414,9 @@ class GroupsDestroyRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + str(self.group_id)]
+
 
 class GroupsJoinRequest(Request[Group]):
     def __init__(self, gmi: "GMI", group_id: str, share_token: str) -> None:
@@ -391,6 +467,9 @@ class GroupsChangeOwnersRequest(Request[JsonType]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + str(self.group_id)]
+
     def url(self) -> str:
         return self.base_url + "/groups/change_owners"
 
@@ -2,6 +2,7 @@
 from requests import Response
 from typing import TYPE_CHECKING
 
+from lowerpines import json_backend
 from lowerpines.endpoints.request import Request, JsonType
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -26,4 +27,4 @@ class ImageConvertRequest(Request[str]):
         return response["payload"]["url"]
 
     def extract_response(self, response: Response) -> JsonType:
-        return response.json()
+        return json_backend.loads(response.content)
@@ -33,6 +33,8 @@ class Leaderboard:
 
 
 class LeaderboardIndexRequest(Request[List[Message]]):
+    cache_ttl = 60.0
+
     def __init__(self, gmi: "GMI", group_id: str, period: str) -> None:
         self.group_id = group_id
         if period not in ["day", "week", "month"]:
@@ -1,6 +1,6 @@
 # pyre-strict
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List
 
 from lowerpines.endpoints.request import Request, JsonType
 
@@ -30,6 +30,12 @@ class LikeCreateRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + self.conversation_id + "/likes"]
+
+    def idempotent(self) -> bool:
+        return True
+
 
 class LikeDestroyRequest(Request[None]):
     def __init__(self, gmi: "GMI", conversation_id: str, message_id: str) -> None:
@@ -52,3 +58,9 @@ class LikeDestroyRequest(Request[None]):
 
     def mode(self) -> str:
         return "POST"
+
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + self.conversation_id + "/likes"]
+
+    def idempotent(self) -> bool:
+        return True
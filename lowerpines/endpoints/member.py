@@ -1,5 +1,14 @@
 # pyre-strict
-from typing import TYPE_CHECKING, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+    overload,
+)
 
 from lowerpines.endpoints.object import AbstractObject, Field, RetrievableObject
 from lowerpines.endpoints.request import Request, JsonType
@@ -9,7 +18,9 @@ if TYPE_CHECKING:  # pragma: no cover
     from lowerpines.gmi import GMI
 
 
-class Member(AbstractObject, RetrievableObject):
+class Member(
+    AbstractObject, RetrievableObject, slots=("gmi", "group_id"), key="member_id"
+):
     member_id: str = Field().with_api_name("id").with_type(str)
     user_id: str = Field().with_type(str)
     nickname: str = Field().with_type(str)
@@ -78,6 +89,67 @@ class Member(AbstractObject, RetrievableObject):
         return str(self)
 
 
+class MemberList(Sequence[Member]):
+    # The members of a Group, backed by the raw JSON. A Member object is only built when it
+    # is first accessed, so listing groups doesn't construct every member of every group.
+    __slots__ = ("gmi", "group_id", "raw", "_members", "_by_user_id")
+
+    def __init__(
+        self, gmi: "GMI", group_id: Optional[str], raw: Optional[List[JsonType]]
+    ) -> None:
+        self.gmi = gmi
+        self.group_id = group_id
+        self.raw: List[JsonType] = raw or []
+        self._members: List[Optional[Member]] = [None] * len(self.raw)
+        self._by_user_id: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def _member(self, index: int) -> Member:
+        member = self._members[index]
+        if member is None:
+            member = Member.from_json(self.gmi, self.raw[index], self.group_id)
+            self._members[index] = member
+        return member
+
+    @overload
+    def __getitem__(self, index: int) -> Member: ...  # noqa: E704
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Member]: ...  # noqa: E704
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Member, List[Member]]:
+        if isinstance(index, slice):
+            return [self._member(i) for i in range(len(self.raw))[index]]
+        if index < 0:
+            index += len(self.raw)
+        if not 0 <= index < len(self.raw):
+            raise IndexError("member index out of range")
+        return self._member(index)
+
+    def __iter__(self) -> Iterator[Member]:
+        for i in range(len(self.raw)):
+            yield self._member(i)
+
+    def get_by_user_id(self, user_id: str) -> Optional[Member]:
+        # Finds a member by scanning the raw JSON once, only the match is built
+        by_user_id = self._by_user_id
+        if by_user_id is None:
+            by_user_id = {
+                str(member_json.get("user_id")): i
+                for i, member_json in enumerate(self.raw)
+            }
+            self._by_user_id = by_user_id
+        index = by_user_id.get(user_id)
+        if index is None:
+            return None
+        return self._member(index)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 class MembersAddRequest(Request[str]):
     def __init__(
         self,
@@ -111,6 +183,9 @@ class MembersAddRequest(Request[str]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + str(self.group_id)]
+
     def parse(self, response: JsonType) -> str:
         return response["results_id"]
 
@@ -150,6 +225,9 @@ class MembersRemoveRequest(Request[None]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + str(self.group_id)]
+
     def url(self) -> str:
         return (
             self.base_url
@@ -173,6 +251,9 @@ class MembersUpdateRequest(Request[Member]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/groups/" + str(self.group_id)]
+
     def url(self) -> str:
         return self.base_url + "/groups/" + str(self.group_id) + "/memberships/update"
 
@@ -1,8 +1,11 @@
 # pyre-strict
-from typing import TYPE_CHECKING, Optional, Dict, List, Any
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, TypeVar
+
+from requests import Response
 
 from lowerpines.endpoints.object import AbstractObject, Field, RetrievableObject
-from lowerpines.endpoints.request import Request, JsonType
+from lowerpines.endpoints.request import JsonType, PreparedCall, Request, Steps
+from lowerpines.ratelimit import Priority
 from lowerpines.endpoints.like import LikeCreateRequest, LikeDestroyRequest
 from lowerpines.exceptions import InvalidOperationException
 
@@ -10,26 +13,37 @@ if TYPE_CHECKING:  # pragma: no cover
     from lowerpines.gmi import GMI
     from lowerpines.message import ComplexMessage  # noqa: F401
 
+T = TypeVar("T")
+
 # TODO model attachments better
 AttachmentType = Dict[str, Any]
 
+# Seconds after a message was first sent during which GroupMe rejects another message
+# with the same source_guid, retries of MessagesCreateRequest stop before it runs out
+SOURCE_GUID_WINDOW = 30.0
+
 
-class Message(AbstractObject, RetrievableObject):
+class Message(
+    AbstractObject,
+    RetrievableObject,
+    slots=("gmi", "_complex_text"),
+    key="message_id",
+):
     message_id: Optional[str] = Field().with_api_name("id").with_type(str)
     source_guid: str = Field().with_type(str)
     created_at: int = Field().with_type(int)
-    user_id: str = Field().with_type(str)
-    group_id: str = Field().with_type(str)
-    name: str = Field().with_type(str)
-    avatar_url: Optional[str] = Field().with_type(str)
+    user_id: str = Field().interned().with_type(str)
+    group_id: str = Field().interned().with_type(str)
+    name: str = Field().interned().with_type(str)
+    avatar_url: Optional[str] = Field().interned().with_type(str)
     text: str = Field().with_type(str)
     system: bool = Field().with_type(bool)
     favorited_by: List[str] = Field().with_type(List[str])
     attachments: List[AttachmentType] = Field().with_type(List[AttachmentType])
-    sender_type: Optional[str] = Field().with_type(str)
-    sender_id: str = Field().with_type(str)
+    sender_type: Optional[str] = Field().interned().with_type(str)
+    sender_id: str = Field().interned().with_type(str)
 
-    complex_text: Optional["ComplexMessage"] = None
+    _complex_text: Optional["ComplexMessage"] = None
 
     def __init__(
         self,
@@ -68,27 +82,20 @@ class Message(AbstractObject, RetrievableObject):
             )
 
     def on_fields_loaded(self) -> None:
-        from lowerpines.message import ComplexMessage, RefAttach  # noqa: F811
-
-        complex_text = ComplexMessage("")
-        doing_mentions = False
-        for attachment in self.attachments:
-            if attachment["type"] == "mentions":
-                doing_mentions = True
-                prev_index = 0
-                for i in range(len(self.text)):
-                    for loci, user_id in zip(
-                        attachment["loci"], attachment["user_ids"]
-                    ):
-                        if loci[0] == i:
-                            complex_text += self.text[prev_index : loci[0]] + RefAttach(
-                                user_id, self.text[loci[0] : loci[0] + loci[1]]
-                            )
-                            prev_index = loci[0] + loci[1]
-                complex_text = complex_text + self.text[prev_index:]
-        if not doing_mentions:
-            complex_text = ComplexMessage(self.text)
-        self.complex_text = complex_text
+        # Parsed on first access, most messages fetched in a crawl are never rendered
+        self._complex_text = None
+
+    @property
+    def complex_text(self) -> "ComplexMessage":
+        complex_text = self._complex_text
+        if complex_text is None:
+            from lowerpines.message import parse_complex_message
+
+            complex_text = parse_complex_message(
+                self.text or "", self.attachments or []
+            )
+            self._complex_text = complex_text
+        return complex_text
 
     def __repr__(self) -> str:
         return str(self)
@@ -113,7 +120,10 @@ class Message(AbstractObject, RetrievableObject):
         LikeDestroyRequest(self.gmi, self.group_id, message_id)
 
 
-class MessagesIndexRequest(Request[List[Message]]):
+class _MessagesIndex(Request[T]):
+    # A page of a group's messages, parsed by the subclasses
+    priority = Priority.LOW
+
     def __init__(
         self,
         gmi: "GMI",
@@ -161,6 +171,8 @@ class MessagesIndexRequest(Request[List[Message]]):
             args_dict["limit"] = self.limit  # type: ignore
         return args_dict
 
+
+class MessagesIndexRequest(_MessagesIndex[List[Message]]):
     def parse(self, response: JsonType) -> List[Message]:
         # count = int(response['count'])
         messages = []
@@ -169,7 +181,15 @@ class MessagesIndexRequest(Request[List[Message]]):
         return messages
 
 
+class MessagesIndexJsonRequest(_MessagesIndex[List[JsonType]]):
+    # The same page, as the API's message JSON instead of Message objects
+    def parse(self, response: JsonType) -> List[JsonType]:
+        return response["messages"]
+
+
 class MessagesCreateRequest(Request[Message]):
+    priority = Priority.HIGH
+
     def __init__(
         self,
         gmi: "GMI",
@@ -182,11 +202,43 @@ class MessagesCreateRequest(Request[Message]):
         self.source_guid = source_guid
         self.text = text
         self.attachments = attachments
+        self.posted: Optional[JsonType] = None
         super().__init__(gmi)
 
     def mode(self) -> str:
         return "POST"
 
+    # GroupMe only remembers a source_guid for a limited time, see SOURCE_GUID_WINDOW
+    retry_window = SOURCE_GUID_WINDOW
+
+    def idempotent(self) -> bool:
+        # A retry can't post the message twice: GroupMe answers 409 to a source_guid it
+        # has already seen, see attempts. Without a source_guid it would
+        return bool(self.source_guid)
+
+    def attempts(self, call: PreparedCall) -> "Steps[Response]":
+        r = yield from super().attempts(call)
+        if r.status_code == 409 and self.retries > 0:
+            # An earlier attempt was posted but its response was lost, so the retry is a
+            # duplicate. Succeed with the message that was posted
+            self.posted = yield from self.find_posted()
+        return r
+
+    def find_posted(self) -> "Steps[Optional[JsonType]]":
+        lookup = MessagesIndexJsonRequest.plan(self.gmi, self.group_id, limit=100)
+        messages = yield lookup
+        for message_json in messages or []:
+            if message_json.get("source_guid") == self.source_guid:
+                return message_json
+        return None
+
+    def handle_response(self, r: Response) -> Optional[JsonType]:
+        posted = self.posted
+        if posted is not None:
+            self.timings.status = r.status_code
+            return {"message": posted}
+        return super().handle_response(r)
+
     def url(self) -> str:
         return self.base_url + "/groups/" + str(self.group_id) + "/messages"
 
@@ -1,5 +1,17 @@
 # pyre-strict
-from typing import Dict, TYPE_CHECKING, Type, List, Tuple, Optional, TypeVar, Any
+import sys
+from typing import (
+    Dict,
+    TYPE_CHECKING,
+    Type,
+    List,
+    Tuple,
+    Optional,
+    TypeVar,
+    Any,
+    Callable,
+    Hashable,
+)
 
 from lowerpines.endpoints.request import JsonType
 
@@ -13,11 +25,20 @@ class Field:
     def __init__(self) -> None:
         self.name = ""
         self.api_name: Optional[str] = None
+        # api_name split on ".", e.g. ("messages", "count")
+        self.path: Tuple[str, ...] = ()
+        self.intern = False
 
     def with_api_name(self, api_name: str) -> "Field":
         self.api_name = api_name
         return self
 
+    def interned(self) -> "Field":
+        # For strings repeated across many objects (ids, names, urls): with
+        # GMI.intern_strings every object shares one copy of each value
+        self.intern = True
+        return self
+
     def with_type(self, _: Type[T]) -> T:
         # This is intentional, it allows us to trick type-checkers into asserting that the field type is T,
         # which will be true at runtime, since Field types are erased by the metaclass
@@ -27,6 +48,7 @@ class Field:
         self.name = name
         if self.api_name is None:
             self.api_name = name
+        self.path = tuple(self.api_name.split("."))
         return self
 
 
@@ -36,9 +58,14 @@ class AbstractObjectType(type):
         name: str,
         bases: Tuple[Type["AbstractObjectType"]],
         attrs: Dict[str, Field],
+        slots: Optional[Tuple[str, ...]] = None,
+        key: Optional[str] = None,
     ) -> "AbstractObjectType":
-        new_attrs = {}  # type: ignore
-        fields = []
+        # slots=(...) makes instances use __slots__ instead of a __dict__: one slot per
+        # Field plus the other instance attributes named in slots
+        # key="..." names the Field holding the object's id, used by GMI.identity_map
+        new_attrs: Dict[str, Any] = {}  # pyre-ignore
+        fields: List[Field] = []
         for attr_name, attr_value in attrs.items():
             if isinstance(attr_value, Field):
                 attr_value.with_field_name(attr_name)
@@ -46,18 +73,106 @@ class AbstractObjectType(type):
                 new_attrs[attr_name] = None
             else:
                 new_attrs[attr_name] = attr_value
-        new_attrs["_fields"] = fields  # type: ignore
+        new_attrs["_fields"] = fields
+        new_attrs["_extract_fields"] = staticmethod(_compile_extractor(name, fields))
+        if any(field.intern for field in fields):
+            new_attrs["_extract_fields_interned"] = staticmethod(
+                _compile_extractor(name, fields, intern=True)
+            )
+        else:
+            new_attrs["_extract_fields_interned"] = new_attrs["_extract_fields"]
+        if key is not None:
+            key_fields = [field for field in fields if field.name == key]
+            if not key_fields:
+                raise ValueError(name + " has no field " + repr(key))
+            new_attrs["_key_field"] = key_fields[0]
+
+        defaults: Dict[str, Any] = {}  # pyre-ignore
+        if slots is not None:
+            # A slot can't have a class-level default, so defaults (None for every Field)
+            # are served by __getattr__ until the slot is assigned
+            slot_names = [field.name for field in fields] + list(slots)
+            if key is not None:
+                # The identity map only holds weak references
+                slot_names.append("__weakref__")
+            for slot_name in slot_names:
+                if slot_name in new_attrs:
+                    defaults[slot_name] = new_attrs.pop(slot_name)
+            new_attrs["__slots__"] = tuple(slot_names)
+            new_attrs["__getattr__"] = _slot_defaults_getattr(defaults)
 
         return super(AbstractObjectType, mcs).__new__(  # type: ignore
             mcs, name, bases, new_attrs
         )
 
+    def __init__(
+        cls,
+        name: str,
+        bases: Tuple[Type["AbstractObjectType"]],
+        attrs: Dict[str, Field],
+        slots: Optional[Tuple[str, ...]] = None,
+        key: Optional[str] = None,
+    ) -> None:
+        super(AbstractObjectType, cls).__init__(name, bases, attrs)
+
+
+def _compile_extractor(
+    class_name: str, fields: List[Field], intern: bool = False
+) -> Callable[[Any, JsonType], None]:
+    # Generates a function that copies every field of a model out of its API JSON, so
+    # from_json doesn't re-split api names and loop over fields for every object:
+    #
+    #   def extract(obj, json_dict):
+    #       get = json_dict.get
+    #       obj.group_id = get("id")
+    #       obj.messages_count_raw = get("messages").get("count")
+    #
+    # With intern=True, string values of interned() fields go through sys.intern
+    lines = ["def extract(obj, json_dict):", "    get = json_dict.get"]
+    for field in fields:
+        if not field.name.isidentifier():  # pragma: no cover
+            raise ValueError("Invalid field name: " + repr(field.name))
+        getters = [".get(" + repr(key) + ")" for key in field.path[1:]]
+        value = "get(" + repr(field.path[0]) + ")" + "".join(getters)
+        if intern and field.intern:
+            lines.append("    value = " + value)
+            lines.append(
+                "    obj."
+                + field.name
+                + " = intern(value) if value.__class__ is str else value"
+            )
+        else:
+            lines.append("    obj." + field.name + " = " + value)
+    namespace: Dict[str, Any] = {"intern": sys.intern}  # pyre-ignore
+    exec(compile("\n".join(lines), "<" + class_name + " fields>", "exec"), namespace)
+    return namespace["extract"]
+
+
+def _slot_defaults_getattr(
+    defaults: Dict[str, Any],  # pyre-ignore
+) -> Callable[[Any, str], Any]:  # pyre-ignore
+    # Only called when normal lookup fails, i.e. for slots that were never assigned, so
+    # objects built by from_json (which assigns every Field) never pay for it
+    def __getattr__(self: Any, name: str) -> Any:  # pyre-ignore
+        try:
+            return defaults[name]
+        except KeyError:
+            raise AttributeError(
+                type(self).__name__ + " object has no attribute " + repr(name)
+            ) from None
+
+    return __getattr__
+
 
 TAbstractObject = TypeVar("TAbstractObject", bound="AbstractObject")
 
 
 class AbstractObject(metaclass=AbstractObjectType):
+    __slots__ = ()
     _fields: List[Field] = []
+    _extract_fields: Callable[[Any, JsonType], None]  # pyre-ignore
+    _extract_fields_interned: Callable[[Any, JsonType], None]  # pyre-ignore
+    _key_field: Optional[Field] = None
 
     def __init__(self, _: "GMI", *_args: JsonType) -> None:
         pass
@@ -75,22 +190,41 @@ class AbstractObject(metaclass=AbstractObjectType):
     def from_json(
         cls: Type[TAbstractObject], gmi: "GMI", json_dict: JsonType, *args: Any
     ) -> TAbstractObject:
+        if gmi.intern_strings:
+            extract = cls._extract_fields_interned
+        else:
+            extract = cls._extract_fields
+        identity_map = gmi.identity_map
+        key_field = cls._key_field
+        key: Optional[Hashable] = None
+        if identity_map is not None and key_field is not None:
+            value: Any = json_dict  # pyre-ignore
+            for name in key_field.path:
+                value = value.get(name)
+            key = value
+            if key is not None:
+                existing = identity_map.get(cls, key)
+                if existing is not None:
+                    extract(existing, json_dict)
+                    existing.on_fields_loaded()
+                    return existing
+
         # TODO Pull out args that are needed by constructor and use them here, removes a few pyre ignores
         obj = cls(gmi, *args)
-
-        for field in obj._fields:
-            json_val: Any = json_dict  # pyre-ignore
-            api_name = field.api_name
-            if api_name is None:  # pragma: no cover
-                raise ValueError("api_name should be known by this point")
-            for val in api_name.split("."):
-                json_val = json_val.get(val, None)
-            setattr(obj, field.name, json_val)
+        extract(obj, json_dict)
         obj.on_fields_loaded()
+        if identity_map is not None and key is not None:
+            existing = identity_map.add(cls, key, obj)
+            if existing is not obj:
+                # Another thread parsed the same object first
+                existing._refresh_from_other(obj)
+                return existing
         return obj
 
 
 class RetrievableObject:
+    __slots__ = ()
+
     def save(self) -> None:
         raise NotImplementedError  # pragma: no cover
 
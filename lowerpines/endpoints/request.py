@@ -1,32 +1,176 @@
 # pyre-strict
+import hashlib
 import json
-from typing import TypeVar, Generic, TYPE_CHECKING, Optional, Dict, Any, Union
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    TypeVar,
+    Generic,
+    TYPE_CHECKING,
+    Optional,
+    Dict,
+    Any,
+    Union,
+    Generator,
+    Iterator,
+    List,
+    Tuple,
+    Type,
+)
 
 import requests
 from requests import Response
 
+from lowerpines import json_backend
 from lowerpines.exceptions import (
     InvalidOperationException,
     GroupMeApiException,
+    RateLimitedException,
+    ServerErrorException,
     TimeoutException,
     UnauthorizedException,
 )
+from lowerpines.metrics import RequestEvent, RequestTimings
+from lowerpines.ratelimit import Priority
 
 if TYPE_CHECKING:  # pragma: no cover
     from lowerpines.gmi import GMI
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 T = TypeVar("T")
+TRequest = TypeVar("TRequest", bound="Request[Any]")
 
 # TODO Model JSON better
 JsonType = Dict[str, Any]
 
+_execution = threading.local()
+
+
+@contextmanager
+def deferred() -> Iterator[None]:
+    # Requests constructed inside this block are built but not sent, they can be
+    # inspected and later sent by calling run() or by handing them to an executor
+    previous = getattr(_execution, "deferred", False)
+    _execution.deferred = True
+    try:
+        yield
+    finally:
+        _execution.deferred = previous
+
+
+class PreparedCall:
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+        data: Optional[Union[str, bytes]] = None,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = headers
+        self.data = data
+        # Name of the Request class, transports can use it to tell endpoints apart
+        self.endpoint = endpoint
+
+
+# What Request.steps() asks of whoever drives it: a PreparedCall to send, answered with
+# the response (or the error thrown in), a delay in seconds to wait, or another request
+# to run, answered with its result
+Step = Union[PreparedCall, float, "Request[Any]"]
+Steps = Generator[Step, Any, T]
+
 
 class Request(Generic[T]):
+    # Used by RateLimiter to order queued requests, see RateLimiter.priorities to override
+    priority = Priority.NORMAL
+
+    # The parsed response, set by complete(). Requests with an empty response body never
+    # set it
+    result: T
+
     def __init__(self, gmi: "GMI") -> None:
         self.gmi = gmi
-        nullable_result = self.execute()
+        base_url = gmi.base_url
+        if base_url is not None:
+            self.base_url = base_url
+        self.elapsed: Optional[float] = None
+        self.retries = 0
+        self.timings = RequestTimings()
+        self.coalesced = False
+        if not getattr(_execution, "deferred", False):
+            self.run()
+
+    @classmethod
+    def plan(cls: Type[TRequest], gmi: "GMI", *args: Any, **kwargs: Any) -> TRequest:
+        with deferred():
+            return cls(gmi, *args, **kwargs)
+
+    def run(self) -> T:
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            flight = self.gmi.singleflight
+            if flight is not None and self.coalescable():
+                leader, self.coalesced = flight.do(self.flight_key(), self._run_once)
+                if self.coalesced:
+                    self.share_from(leader)
+            else:
+                self._run_once()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.finish(start, error)
+        # Requests with an empty response body never set a result
+        return getattr(self, "result", None)  # type: ignore
+
+    def _run_once(self) -> "Request[T]":
+        self.complete(self.execute())
+        return self
+
+    def share_from(self, leader: "Request[T]") -> None:
+        # Coalesced requests share the parsed result, so the objects are the same for every caller
+        if hasattr(leader, "result"):
+            self.result = leader.result
+        self.timings.status = leader.timings.status
+
+    def finish(self, start: float, error: Optional[BaseException]) -> None:
+        self.elapsed = time.perf_counter() - start
+        hooks = self.gmi.hooks
+        if hooks:
+            event = RequestEvent(self, error)
+            for hook in hooks:
+                try:
+                    hook(event)
+                except Exception:
+                    # The request already happened: a broken hook must not replace its
+                    # error, or make a message that was sent look like it failed
+                    logger.exception("Request hook %r failed", hook)
+
+    @property
+    def executed(self) -> bool:
+        return self.elapsed is not None
+
+    def key(self) -> Tuple[str, str, str]:
+        args = self.args()
+        if isinstance(args, bytes):
+            args_key = hashlib.sha1(args).hexdigest()
+        else:
+            args_key = json.dumps(args, sort_keys=True)
+        return self.mode(), self.url(), args_key
+
+    def complete(self, nullable_result: Optional[JsonType]) -> None:
         if nullable_result is not None:
-            self.result: T = self.parse(nullable_result)
+            start = time.perf_counter()
+            self.result = self.parse(nullable_result)
+            self.timings.parse += time.perf_counter() - start
         else:
             json_dump_dir = self.gmi.write_json_to
             if json_dump_dir is not None:
@@ -34,6 +178,7 @@ class Request(Generic[T]):
 
                 dump_json(json_dump_dir, self, nullable_result)
 
+    # GMI.base_url overrides this, e.g. to point a GMI at test.fake_server
     base_url = "https://api.groupme.com/v3"
 
     def url(self) -> str:
@@ -48,40 +193,146 @@ class Request(Generic[T]):
     def args(self) -> Union[JsonType, bytes]:
         return {}
 
-    def execute(self) -> Optional[JsonType]:
+    # Seconds a GET response may be served from GMI.cache, None disables caching
+    cache_ttl: Optional[float] = None
+
+    def invalidates(self) -> List[str]:
+        # URLs of GET requests whose cached responses are stale once this request succeeds
+        return []
+
+    # Seconds after the first attempt during which a retry is still safe to send, None
+    # for no limit
+    retry_window: Optional[float] = None
+
+    # Identical GETs sent at the same time share one response when GMI.singleflight is set
+    coalesce = True
+
+    def coalescable(self) -> bool:
+        return self.coalesce and self.mode() == "GET"
+
+    def flight_key(self) -> Tuple[Type["Request[Any]"], str, str, str, str]:
+        # The class is part of the key: MessagesIndexJsonRequest sends the same call as
+        # MessagesIndexRequest but parses the response into something else
+        return (type(self), self.gmi.access_token) + self.key()
+
+    def idempotent(self) -> bool:
+        # Only idempotent requests are retried after a server error or a dropped connection,
+        # POST endpoints that are safe to send twice should override this
+        return self.mode() == "GET"
+
+    def prepare(self) -> PreparedCall:
         params = {}
         headers = {
             "X-Access-Token": self.gmi.access_token,
             "User-Agent": "GroupYouLibrary/1.0",
         }
         args = self.args()
+        endpoint = type(self).__name__
         if self.mode() == "GET" and isinstance(args, dict):
             params.update(args)
-            r = requests.get(url=self.url(), params=params, headers=headers)
+            return PreparedCall("GET", self.url(), params, headers, endpoint=endpoint)
         elif self.mode() == "POST" and isinstance(args, dict):
             headers["Content-Type"] = "application/json"
-            r = requests.post(
-                url=self.url(),
-                params=params,
-                headers=headers,
-                data=json.dumps(self.args()),
+            return PreparedCall(
+                "POST", self.url(), params, headers, json.dumps(args), endpoint
             )
         elif self.mode() == "POST_RAW" and isinstance(args, bytes):
-            r = requests.post(
-                url=self.url(), params=params, headers=headers, data=self.args()
-            )
+            return PreparedCall("POST", self.url(), params, headers, args, endpoint)
         else:
             raise InvalidOperationException()
-        self.error_check(r)
-        string_content = r.content.decode("utf-8")
-        if not string_content or string_content.isspace():
-            return None
-        else:
-            return self.extract_response(r)
+
+    def execute(self) -> Optional[JsonType]:
+        # Drives steps() with blocking I/O, AsyncGMI drives the same steps without
+        # blocking the event loop
+        steps = self.steps()
+        try:
+            step = next(steps)
+            while True:
+                if isinstance(step, PreparedCall):
+                    try:
+                        response = self.send(step)
+                    except requests.RequestException as e:
+                        step = steps.throw(e)
+                    else:
+                        step = steps.send(response)
+                elif isinstance(step, Request):
+                    step = steps.send(step.run())
+                else:
+                    time.sleep(step)
+                    step = next(steps)
+        except StopIteration as done:
+            return done.value
+
+    def send(self, call: PreparedCall) -> Response:
+        # A single attempt, once the rate limiter lets it through
+        limiter = self.gmi.rate_limiter
+        if limiter is not None:
+            limiter.acquire(self)
+        start = time.perf_counter()
+        try:
+            return self.gmi.client.send(call)
+        finally:
+            self.timings.network += time.perf_counter() - start
+
+    def steps(self) -> "Steps[Optional[JsonType]]":
+        # Everything execute() does besides I/O: the response cache and the retry loop
+        call = self.prepare()
+        cache = self.gmi.cache
+        if cache is None:
+            return self.handle_response((yield from self.attempts(call)))
+        entry = cache.lookup(self, call)
+        if entry is not None and entry.fresh:
+            return self.handle_response(entry.response)
+        return cache.complete(self, entry, (yield from self.attempts(call)))
+
+    def attempts(self, call: PreparedCall) -> "Steps[Response]":
+        policy = self.gmi.retry_policy
+        waited = 0.0
+        first = time.monotonic()
+        while True:
+            try:
+                r = yield call
+            except requests.RequestException as e:
+                delay = policy.next_delay(
+                    self,
+                    self.retries,
+                    waited,
+                    error=e,
+                    elapsed=time.monotonic() - first,
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = policy.next_delay(
+                    self,
+                    self.retries,
+                    waited,
+                    response=r,
+                    elapsed=time.monotonic() - first,
+                )
+                if delay is None:
+                    return r
+            yield delay
+            waited += delay
+            self.retries += 1
+
+    def handle_response(self, r: Response) -> Optional[JsonType]:
+        start = time.perf_counter()
+        content = r.content
+        self.timings.status = r.status_code
+        self.timings.response_bytes += len(content)
+        try:
+            self.error_check(r)
+            if not content or content.isspace():
+                return None
+            else:
+                return self.extract_response(r)
+        finally:
+            self.timings.decode += time.perf_counter() - start
 
     def error_check(self, request: Response) -> None:
         code = int(request.status_code)
-        if 399 < code < 500:
+        if code > 399:
             request_string = (
                 str(self.mode())
                 + " "
@@ -89,8 +340,14 @@ class Request(Generic[T]):
                 + " with data:\n"
                 + str(self.args())
             )
+            if code == 429:
+                raise RateLimitedException("Rate limited for " + request_string)
+            elif code > 499:
+                raise ServerErrorException(
+                    "Server error " + str(code) + " for " + request_string
+                )
             try:
-                errors = request.json()["meta"]["errors"]
+                errors = json_backend.loads(request.content)["meta"]["errors"]
                 if "request timeout" in errors:
                     raise TimeoutException("Timeout for " + request_string)
                 elif "unauthorized" in errors:
@@ -105,7 +362,7 @@ class Request(Generic[T]):
             )
 
     def extract_response(self, response: Response) -> JsonType:
-        response = response.json()["response"]
+        response = json_backend.loads(response.content)["response"]
 
         json_dump_dir = self.gmi.write_json_to
         if json_dump_dir is not None:
@@ -1,5 +1,5 @@
 # pyre-strict
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 from lowerpines.endpoints.object import AbstractObject, Field, RetrievableObject
 from lowerpines.endpoints.request import Request, JsonType
@@ -46,6 +46,8 @@ class User(AbstractObject, RetrievableObject):
 
 
 class UserMeRequest(Request[User]):
+    cache_ttl = 300.0
+
     def mode(self) -> str:
         return "GET"
 
@@ -74,6 +76,9 @@ class UserUpdateRequest(Request[User]):
     def mode(self) -> str:
         return "POST"
 
+    def invalidates(self) -> List[str]:
+        return [self.base_url + "/users/me"]
+
     def parse(self, response: JsonType) -> User:
         return User.from_json(self.gmi, response)
 
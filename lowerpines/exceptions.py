@@ -23,3 +23,11 @@ class TimeoutException(GroupMeApiException):
 
 class UnauthorizedException(GroupMeApiException):
     pass
+
+
+class RateLimitedException(GroupMeApiException):
+    pass
+
+
+class ServerErrorException(GroupMeApiException):
+    pass
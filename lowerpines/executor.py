@@ -0,0 +1,73 @@
+# pyre-strict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generic, Iterable, List, Optional, TypeVar
+
+from lowerpines.endpoints.request import Request
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BulkResult(Generic[T]):
+    def __init__(
+        self,
+        plan: Request[T],
+        result: Optional[T] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.plan = plan
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def get(self) -> Optional[T]:
+        error = self.error
+        if error is not None:
+            raise error
+        return self.result
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return "BulkResult(error=" + repr(self.error) + ")"
+        return "BulkResult(result=" + repr(self.result) + ")"
+
+
+class Executor:
+    def run(self, plan: Request[T]) -> T:
+        return plan.run()
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        raise NotImplementedError  # pragma: no cover
+
+    def run_all(self, plans: Iterable[Request[Any]]) -> List[Any]:  # pyre-ignore
+        return self.map(self.run, plans)
+
+    def bulk(self, plans: Iterable[Request[T]]) -> List[BulkResult[T]]:
+        return self.map(self._run_captured, plans)
+
+    def _run_captured(self, plan: Request[T]) -> BulkResult[T]:
+        try:
+            result: T = self.run(plan)
+        except Exception as e:
+            return BulkResult(plan, error=e)
+        return BulkResult(plan, result=result)
+
+
+class SerialExecutor(Executor):
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        return [func(item) for item in items]
+
+
+class ThreadedExecutor(Executor):
+    def __init__(self, concurrency: int = 8) -> None:
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.concurrency = concurrency
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        # Executor.map yields results in input order, regardless of completion order
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(func, items))
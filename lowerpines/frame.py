@@ -0,0 +1,178 @@
+# pyre-strict
+from array import array
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from lowerpines.endpoints.request import JsonType
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+    import pandas  # type: ignore[import-untyped]
+
+
+class _Dictionary:
+    # A dictionary-encoded string column: one int code per row, each distinct value
+    # stored once. None is stored as -1
+    __slots__ = ("codes", "_index", "_values")
+
+    def __init__(self) -> None:
+        self.codes = array("i")
+        # Value to code, in code order. Starts with None so dict.setdefault can assign
+        # codes without a Python-level branch per row
+        self._index: Dict[Optional[str], int] = {None: -1}
+        self._values: List[str] = []
+
+    @property
+    def values(self) -> List[str]:
+        values = self._values
+        if len(values) != len(self._index) - 1:
+            # Only rebuilt when new values were added, None is the first key
+            values[:] = [value for value in self._index if value is not None]
+        return values
+
+    def encode(self, values: Iterable[Optional[str]]) -> List[int]:
+        index = self._index
+        setdefault = index.setdefault
+        return [setdefault(value, len(index) - 1) for value in values]
+
+    def extend(self, values: Iterable[Optional[str]]) -> None:
+        self.codes.extend(self.encode(values))
+
+    def get(self, row: int) -> Optional[str]:
+        code = self.codes[row]
+        return None if code == -1 else self.values[code]
+
+
+class MessageFrame:
+    # Message history stored by column instead of as Message objects, for analysis of
+    # whole histories. Each column is a flat buffer:
+    #
+    #   message_id, created_at    array of int64
+    #   system                    array of int8 (0/1)
+    #   user_id, name,            dictionary-encoded: int32 codes into a list of the
+    #   sender_type                 distinct values, -1 for missing
+    #   text                      utf-8 bytes of every text back to back, and int64
+    #                               offsets (row i is text_data[offsets[i]:offsets[i+1]])
+    #   favorited_by              ragged: int32 user_id codes back to back, and int64
+    #                               offsets into them
+    #
+    # to_numpy() and to_pandas() wrap the buffers without copying them (numpy and pandas
+    # are optional). While such arrays are alive Python won't let the buffers grow, so
+    # appending raises BufferError until they are gone.
+    def __init__(self) -> None:
+        self.message_id = array("q")
+        self.created_at = array("q")
+        self.system = array("b")
+        self.user_id = _Dictionary()
+        self.name = _Dictionary()
+        self.sender_type = _Dictionary()
+        self.text_data = bytearray()
+        self.text_offsets = array("q", [0])
+        self.favorited_by_codes = array("i")
+        self.favorited_by_offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.message_id)
+
+    def append(self, message_json: JsonType) -> None:
+        # message_json is one message of a messages index page, as returned by the API
+        self.extend([message_json])
+
+    def extend(self, messages_json: Iterable[JsonType]) -> None:
+        # Column by column, so each column is filled by one comprehension
+        page = list(messages_json)
+        self.message_id.extend([int(m["id"]) for m in page])
+        self.created_at.extend([m.get("created_at") or 0 for m in page])
+        self.system.extend([1 if m.get("system") else 0 for m in page])
+        self.user_id.extend([m.get("user_id") for m in page])
+        self.name.extend([m.get("name") for m in page])
+        self.sender_type.extend([m.get("sender_type") for m in page])
+
+        texts = [(m.get("text") or "").encode("utf-8") for m in page]
+        base = len(self.text_data)
+        self.text_data += b"".join(texts)
+        self.text_offsets.extend([base + end for end in accumulate(map(len, texts))])
+
+        favorited_by = [m.get("favorited_by") or () for m in page]
+        base = len(self.favorited_by_codes)
+        self.favorited_by_codes.extend(
+            self.user_id.encode(
+                [user_id for users in favorited_by for user_id in users]
+            )
+        )
+        self.favorited_by_offsets.extend(
+            [base + end for end in accumulate(map(len, favorited_by))]
+        )
+
+    def text(self, row: int) -> str:
+        start, end = self.text_offsets[row], self.text_offsets[row + 1]
+        return self.text_data[start:end].decode("utf-8")
+
+    def favorited_by(self, row: int) -> List[str]:
+        start = self.favorited_by_offsets[row]
+        end = self.favorited_by_offsets[row + 1]
+        values = self.user_id.values
+        return [values[code] for code in self.favorited_by_codes[start:end]]
+
+    def row(self, row: int) -> Dict[str, Any]:  # pyre-ignore
+        return {
+            "id": str(self.message_id[row]),
+            "created_at": self.created_at[row],
+            "system": bool(self.system[row]),
+            "user_id": self.user_id.get(row),
+            "name": self.name.get(row),
+            "sender_type": self.sender_type.get(row),
+            "text": self.text(row),
+            "favorited_by": self.favorited_by(row),
+        }
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:  # pyre-ignore
+        import numpy
+
+        def wrap(buffer: Any, dtype: Any) -> "numpy.ndarray":  # pyre-ignore
+            return numpy.frombuffer(buffer, dtype=dtype)
+
+        return {
+            "message_id": wrap(self.message_id, numpy.int64),
+            "created_at": wrap(self.created_at, numpy.int64),
+            "system": wrap(self.system, numpy.int8).view(numpy.bool_),
+            "user_id_codes": wrap(self.user_id.codes, numpy.intc),
+            "name_codes": wrap(self.name.codes, numpy.intc),
+            "sender_type_codes": wrap(self.sender_type.codes, numpy.intc),
+            "text_data": wrap(self.text_data, numpy.uint8),
+            "text_offsets": wrap(self.text_offsets, numpy.int64),
+            "favorited_by_codes": wrap(self.favorited_by_codes, numpy.intc),
+            "favorited_by_offsets": wrap(self.favorited_by_offsets, numpy.int64),
+        }
+
+    def to_pandas(self) -> "pandas.DataFrame":  # pyre-ignore
+        # Numbers and dictionary codes are shared with the frame, the text column has to
+        # be decoded into Python strings
+        import numpy
+        import pandas
+
+        columns = self.to_numpy()
+
+        def categorical(codes: Any, values: List[str]) -> Any:  # pyre-ignore
+            return pandas.Categorical.from_codes(codes, categories=values)
+
+        text_data = bytes(self.text_data)
+        offsets = self.text_offsets
+        return pandas.DataFrame(
+            {
+                "message_id": columns["message_id"],
+                "created_at": columns["created_at"],
+                "system": columns["system"],
+                "user_id": categorical(columns["user_id_codes"], self.user_id.values),
+                "name": categorical(columns["name_codes"], self.name.values),
+                "sender_type": categorical(
+                    columns["sender_type_codes"], self.sender_type.values
+                ),
+                "text": [
+                    text_data[offsets[i] : offsets[i + 1]].decode("utf-8")
+                    for i in range(len(self))
+                ],
+                "favorite_count": numpy.diff(columns["favorited_by_offsets"]),
+            },
+            copy=False,
+        )
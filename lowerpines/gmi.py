@@ -1,9 +1,23 @@
 # pyre-strict
-from typing import Optional
+from typing import Optional, TYPE_CHECKING, Iterable, TypeVar
 
-import requests
 from typing import List
 
+from lowerpines.cache import ResponseCache
+from lowerpines.client import HttpClient
+from lowerpines.identity import IdentityMap
+from lowerpines.metrics import RequestHook
+from lowerpines.ratelimit import RateLimiter
+from lowerpines.retry import RetryPolicy
+from lowerpines.singleflight import SingleFlight
+from lowerpines.transport import Transport
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.endpoints.request import Request
+    from lowerpines.executor import BulkResult
+
+T = TypeVar("T")
+
 _gmi_objects: List["GMI"] = []
 
 
@@ -19,6 +33,19 @@ def get_gmi(access_token: str) -> "GMI":
 class GMI:
     def __init__(self, access_token: str) -> None:
         self.access_token = access_token
+        self.client: Transport = HttpClient()
+        self.retry_policy = RetryPolicy()
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.cache: Optional[ResponseCache] = None
+        self.hooks: List[RequestHook] = []
+        self.singleflight: Optional[SingleFlight] = None
+        # Replaces Request.base_url for every request sent by this GMI
+        self.base_url: Optional[str] = None
+        # Set to an IdentityMap to get one shared object per group, message, bot and member
+        self.identity_map: Optional[IdentityMap] = None
+        # Share one copy of each repeated string (user ids, names, avatar urls...) between
+        # parsed objects, see Field.interned()
+        self.intern_strings = False
 
         from lowerpines.group import GroupManager
         from lowerpines.bot import BotManager
@@ -43,7 +70,21 @@ class GMI:
         self.chats = ChatManager(self)
         self.user = UserManager(self)
 
+        cache = self.cache
+        if cache is not None:
+            cache.clear()
+        identity_map = self.identity_map
+        if identity_map is not None:
+            identity_map.clear()
+
     def convert_image_url(self, url: str) -> str:
         from lowerpines.endpoints.image import ImageConvertRequest
 
-        return ImageConvertRequest(self, requests.get(url).content).result
+        return ImageConvertRequest(self, self.client.request("GET", url).content).result
+
+    def bulk(
+        self, plans: Iterable["Request[T]"], concurrency: int = 8
+    ) -> List["BulkResult[T]"]:
+        from lowerpines.executor import ThreadedExecutor
+
+        return ThreadedExecutor(concurrency).bulk(plans)
@@ -3,7 +3,8 @@
 from typing import List
 
 from lowerpines.manager import AbstractManager
-from lowerpines.endpoints.group import Group
+from lowerpines.endpoints.group import Group, GroupsShowRequest
+from lowerpines.executor import BulkResult, ThreadedExecutor
 
 
 class GroupManager(AbstractManager[Group]):
@@ -18,3 +19,13 @@ class GroupManager(AbstractManager[Group]):
 
     def rejoin(self, group_id: str) -> Group:
         return Group.rejoin(self.gmi, group_id)
+
+    def refresh_all(self, concurrency: int = 8) -> List[BulkResult[Group]]:
+        groups = self.lazy_fill_content()
+        results = ThreadedExecutor(concurrency).bulk(
+            [GroupsShowRequest.plan(self.gmi, group.group_id) for group in groups]
+        )
+        for group, result in zip(groups, results):
+            if result.result is not None:
+                group._refresh_from_other(result.result)
+        return results
@@ -0,0 +1,153 @@
+# pyre-strict
+import queue
+import threading
+from typing import Callable, Generic, Iterator, List, Optional, TypeVar, Union
+
+from lowerpines.endpoints.request import JsonType
+
+T = TypeVar("T")
+
+# fetch_page(cursor) returns the JSON of the messages after cursor, empty at the end
+FetchPage = Callable[[Optional[str]], List[JsonType]]
+
+
+class MessageIterator(Generic[T]):
+    # Yields a message history one page at a time: the next page is only requested once
+    # the current one has been consumed, so memory stays at one page however long the
+    # history is, and breaking out of the loop stops the requests.
+    #
+    # With prefetch=n a background thread requests the next page as soon as the last id
+    # of the previous one is known, staying up to n pages ahead, so the network wait for
+    # page N+1 overlaps with parsing and consuming page N. Messages are parsed on the
+    # consumer's side. close() (or dropping the iterator) stops the thread.
+    #
+    # cursor is the id of the last message yielded. Passing it back to the method that
+    # created the iterator (e.g. group.messages.iter_before(iterator.cursor)) resumes
+    # right after it, also in another process.
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        parse: Callable[[JsonType], T],
+        cursor: Optional[str] = None,
+        stop_at: Optional[str] = None,
+        prefetch: int = 0,
+    ) -> None:
+        # stop_at ends the iteration at the first message with an id at or below it
+        self._fetch_page = fetch_page
+        self._parse = parse
+        self._stop_at: Optional[int] = None if stop_at is None else int(stop_at)
+        self._page: Iterator[JsonType] = iter(())
+        self._prefetcher: Optional[_Prefetcher] = None
+        if prefetch > 0:
+            self._prefetcher = _Prefetcher(fetch_page, cursor, self._stop_at, prefetch)
+        self.cursor = cursor
+        self.done = False
+        self.pages = 0
+
+    def __iter__(self) -> "MessageIterator[T]":
+        return self
+
+    def __next__(self) -> T:
+        while True:
+            for message_json in self._page:
+                message_id = message_json["id"]
+                stop_at = self._stop_at
+                if stop_at is not None and int(message_id) <= stop_at:
+                    self._finish()
+                    break
+                self.cursor = message_id
+                return self._parse(message_json)
+            if self.done:
+                raise StopIteration
+            prefetcher = self._prefetcher
+            if prefetcher is None:
+                page = self._fetch_page(self.cursor)
+            else:
+                page = prefetcher.get()
+            self.pages += 1
+            if not page:
+                self._finish()
+                raise StopIteration
+            self._page = iter(page)
+
+    def _finish(self) -> None:
+        self.done = True
+        self._page = iter(())
+        self.close()
+
+    def close(self) -> None:
+        prefetcher = self._prefetcher
+        if prefetcher is not None:
+            prefetcher.close()
+
+    def __enter__(self) -> "MessageIterator[T]":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+class _Prefetcher:
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        cursor: Optional[str],
+        stop_at: Optional[int],
+        depth: int,
+    ) -> None:
+        self._pages: "queue.Queue[Union[List[JsonType], BaseException]]" = queue.Queue(
+            depth
+        )
+        self._stopped = threading.Event()
+        # The thread doesn't reference the iterator, so dropping it runs __del__
+        threading.Thread(
+            target=_prefetch,
+            args=(fetch_page, cursor, stop_at, self._pages, self._stopped),
+            daemon=True,
+        ).start()
+
+    def get(self) -> List[JsonType]:
+        page = self._pages.get()
+        if isinstance(page, BaseException):
+            raise page
+        return page
+
+    def close(self) -> None:
+        self._stopped.set()
+
+
+def _prefetch(
+    fetch_page: FetchPage,
+    cursor: Optional[str],
+    stop_at: Optional[int],
+    pages: "queue.Queue[Union[List[JsonType], BaseException]]",
+    stopped: threading.Event,
+) -> None:
+    try:
+        while not stopped.is_set():
+            page = fetch_page(cursor)
+            _put(pages, page, stopped)
+            if not page:
+                return
+            cursor = page[-1]["id"]
+            if stop_at is not None and int(cursor) <= stop_at:
+                return
+    except BaseException as e:
+        _put(pages, e, stopped)
+
+
+def _put(
+    pages: "queue.Queue[Union[List[JsonType], BaseException]]",
+    page: Union[List[JsonType], BaseException],
+    stopped: threading.Event,
+) -> None:
+    # Waits for the consumer to make room, unless the iterator is closed
+    while not stopped.is_set():
+        try:
+            pages.put(page, timeout=0.05)
+            return
+        except queue.Full:
+            pass
@@ -0,0 +1,42 @@
+# pyre-strict
+import threading
+import weakref
+from typing import Any, Hashable, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class IdentityMap:
+    # Maps (model class, primary key) to the one live object for it, so fetching the
+    # same group, message, bot or member again updates that object in place instead of
+    # creating a copy. Objects are held weakly: once nothing else refers to one it is
+    # dropped from the map, so memory follows what the caller keeps, not what it fetched
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._objects: "weakref.WeakValueDictionary[Tuple[type, Hashable], Any]" = (
+            weakref.WeakValueDictionary()
+        )  # pyre-ignore
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cls: Type[T], key: Hashable) -> Optional[T]:
+        with self._lock:
+            obj = self._objects.get((cls, key))
+            if obj is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return obj
+
+    def add(self, cls: Type[T], key: Hashable, obj: T) -> T:
+        # Returns the object already mapped to key if another thread added one first
+        with self._lock:
+            return self._objects.setdefault((cls, key), obj)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._objects)
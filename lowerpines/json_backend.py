@@ -0,0 +1,62 @@
+# pyre-strict
+import json
+from typing import Any, Callable, Optional, Union
+
+JsonLoads = Callable[[Union[str, bytes]], Any]  # pyre-ignore
+
+# Tried in this order when no backend is requested explicitly
+PREFERRED_BACKENDS = ["orjson", "msgspec", "json"]
+
+
+def _import_backend(name: str) -> JsonLoads:
+    if name == "orjson":
+        import orjson
+
+        return orjson.loads
+    elif name == "msgspec":
+        import msgspec
+
+        decode = msgspec.json.decode
+
+        def msgspec_loads(data: Union[str, bytes]) -> Any:  # pyre-ignore
+            try:
+                return decode(data)
+            except msgspec.DecodeError as e:
+                # Callers expect the same exception as json.loads raises
+                raise ValueError(str(e)) from e
+
+        return msgspec_loads
+    elif name == "json":
+        return json.loads
+    else:
+        raise ValueError("Unknown JSON backend: " + name)
+
+
+_backend_name = "json"
+_backend_loads: JsonLoads = json.loads
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    # With no name, the fastest installed backend is selected
+    global _backend_name, _backend_loads
+    if name is not None:
+        _backend_loads = _import_backend(name)
+        _backend_name = name
+        return name
+    for candidate in PREFERRED_BACKENDS:
+        try:
+            return set_backend(candidate)
+        except ImportError:
+            pass
+    raise ImportError("No JSON backend available")  # pragma: no cover
+
+
+def get_backend() -> str:
+    return _backend_name
+
+
+def loads(data: Union[str, bytes]) -> Any:  # pyre-ignore
+    return _backend_loads(data)
+
+
+set_backend()
@@ -1,5 +1,5 @@
 # pyre-strict
-from typing import Union, List, Tuple, Dict, Any
+from typing import Union, List, Optional, Tuple, Dict, Any
 
 
 class MessageAttach:
@@ -98,83 +98,227 @@ class LinkedImageAttach(QueuedAttach):
 
 
 class ComplexMessage:
-    contents: List[Union[MessageAttach, str]]
+    # Every parsed Message holds one of these, so it has no __dict__
+    __slots__ = ("_contents", "_split")
+    _contents: List[Union[MessageAttach, str]]
+    _split: Optional[Tuple[str, List[Dict[str, Any]]]]  # pyre-ignore
 
     # pyre-ignore
     def __init__(self, data: Union[list, str, MessageAttach]) -> None:
         if isinstance(data, list):
-            self.contents = data
-        elif isinstance(data, str):
-            self.contents = [data]
+            self._contents = data
+        else:
+            self._contents = [data]
+        self._split = None
+
+    @property
+    def contents(self) -> List[Union[MessageAttach, str]]:
+        # The caller may edit the list in place, so the cached text and attachments
+        # can't be trusted after this
+        self._split = None
+        return self._contents
+
+    @contents.setter
+    def contents(self, contents: List[Union[MessageAttach, str]]) -> None:
+        self._contents = contents
+        self._split = None
 
     def __add__(
         self, other: Union["ComplexMessage", str, "MessageAttach"]
     ) -> "ComplexMessage":
         if isinstance(other, ComplexMessage):
-            self.contents.extend(other.contents)
+            self._contents.extend(other._contents)
         else:
-            self.contents.append(other)
+            self._contents.append(other)
+        self._split = None
         return self
 
     def __radd__(self, other: Union[str, "MessageAttach"]) -> "ComplexMessage":
-        self.contents.insert(0, other)
+        self._contents.insert(0, other)
+        self._split = None
         return self
 
     def __str__(self) -> str:
-        return str(self.contents)
+        return str(self._contents)
 
     def get_text(self) -> str:
-        return "".join([str(part) for part in self.contents])
+        return self.smart_split()[0]
 
     def get_attachments(self) -> List[Dict[str, str]]:
-        attach_list: list[Any] = []  # type: ignore
-        mentions = {"type": "mentions", "user_ids": list(), "loci": list()}
-        emojis = {"type": "emoji", "placeholder": EMOJI_PLACEHOLDER, "charmap": []}
-        queued = {"type": "postprocessing", "queues": []}
-        content_frag = ""
-        for part in self.contents:
-            if isinstance(part, RefAttach):
-                mentions["user_ids"].append(part.user_id)  # type: ignore
-                mentions["loci"].append(  # type: ignore
-                    [len(content_frag), len(part.display)]
+        return self.smart_split()[1]
+
+    def smart_split(self) -> Tuple[str, List[Dict[str, Any]]]:  # pyre-ignore
+        # Cached until the message is changed, posting the same message again (or
+        # retrying it) doesn't serialize it again. Don't modify the returned list
+        split = self._split
+        if split is None:
+            builder = MessageBuilder()
+            for part in self._contents:
+                builder.add(part)
+            split = self._split = builder.smart_split()
+        return split
+
+    def just_str(self) -> str:
+        return "".join([s for s in self._contents if isinstance(s, str)])
+
+
+class MessageBuilder:
+    # Builds the text and attachments of a message in one pass. The offset of the next
+    # part is tracked as an integer and each attachment type is looked up through its
+    # own attribute, so appending is O(1) however long the message gets:
+    #
+    #   builder = MessageBuilder().text("Hi ").mention(user_id, "@" + name)
+    #   group.post(builder.build())
+    __slots__ = (
+        "_contents",
+        "_text",
+        "_offset",
+        "_attachments",
+        "_mentions",
+        "_emojis",
+        "_queued",
+    )
+
+    def __init__(self) -> None:
+        self._contents: List[Union[MessageAttach, str]] = []
+        self._text: List[str] = []
+        self._offset = 0
+        self._attachments: List[Dict[str, Any]] = []  # pyre-ignore
+        self._mentions: Optional[Dict[str, Any]] = None  # pyre-ignore
+        self._emojis: Optional[Dict[str, Any]] = None  # pyre-ignore
+        self._queued: Optional[Dict[str, Any]] = None  # pyre-ignore
+
+    def text(self, text: str) -> "MessageBuilder":
+        return self.add(text)
+
+    def mention(self, user_id: str, display: str = "") -> "MessageBuilder":
+        return self.add(RefAttach(user_id, display))
+
+    def emoji(self, pack_id: int, emoji_id: int) -> "MessageBuilder":
+        return self.add(EmojiAttach(pack_id, emoji_id))
+
+    def image(self, image_url: str) -> "MessageBuilder":
+        return self.add(ImageAttach(image_url))
+
+    def add(
+        self, part: Union["ComplexMessage", str, MessageAttach]
+    ) -> "MessageBuilder":
+        if isinstance(part, str):
+            text = part
+        elif isinstance(part, ComplexMessage):
+            for inner in part._contents:
+                self.add(inner)
+            return self
+        elif isinstance(part, RefAttach):
+            mentions = self._mentions
+            if mentions is None:
+                mentions = self._mentions = self._attach(
+                    {"type": "mentions", "user_ids": [], "loci": []}
+                )
+            mentions["user_ids"].append(part.user_id)
+            mentions["loci"].append([self._offset, len(part.display)])
+            text = part.display
+        elif isinstance(part, ImageAttach):
+            self._attachments.append({"type": "image", "url": part.image_url})
+            text = ""
+        elif isinstance(part, LocationAttach):
+            self._attachments.append(
+                {
+                    "type": "location",
+                    "name": part.name,
+                    "lat": part.lat,
+                    "long": part.long,
+                }
+            )
+            text = part.name
+        elif isinstance(part, SplitAttach):
+            self._attachments.append({"type": "split", "token": part.token})
+            text = part.token
+        elif isinstance(part, EmojiAttach):
+            emojis = self._emojis
+            if emojis is None:
+                emojis = self._emojis = self._attach(
+                    {"type": "emoji", "placeholder": EMOJI_PLACEHOLDER, "charmap": []}
                 )
-                if mentions not in attach_list:
-                    attach_list.append(mentions)
-            elif isinstance(part, ImageAttach):
-                attach_list.append({"type": "image", "url": part.image_url})
-            elif isinstance(part, LocationAttach):
-                attach_list.append(
-                    {  # type: ignore
-                        "type": "location",
-                        "name": part.name,
-                        "lat": part.lat,  # type: ignore
-                        "long": part.long,  # type: ignore
-                    }
+            emojis["charmap"].append([part.pack_id, part.emoji_id])
+            text = EMOJI_PLACEHOLDER
+        elif isinstance(part, QueuedAttach):
+            queued = self._queued
+            if queued is None:
+                queued = self._queued = self._attach(
+                    {"type": "postprocessing", "queues": []}
                 )
-            elif isinstance(part, SplitAttach):
-                attach_list.append({"type": "split", "token": part.token})
-            elif isinstance(part, EmojiAttach):
-                emojis["charmap"].append([part.pack_id, part.emoji_id])  # type: ignore
-                if emojis not in attach_list:
-                    attach_list.append(emojis)
-            elif isinstance(part, QueuedAttach):
-                if part.queue not in queued["queues"]:
-                    queued["queues"].append(part.queue)  # type: ignore
-                if queued not in attach_list:
-                    attach_list.append(queued)
-            content_frag += str(part)
-        return attach_list  # type: ignore
+            if part.queue not in queued["queues"]:
+                queued["queues"].append(part.queue)
+            text = part.url
+        else:
+            text = str(part)
+        self._contents.append(part)
+        if text:
+            self._text.append(text)
+            self._offset += len(text)
+        return self
 
-    def just_str(self) -> str:
-        return "".join([s for s in self.contents if isinstance(s, str)])
+    def _attach(self, attachment: Dict[str, Any]) -> Dict[str, Any]:  # pyre-ignore
+        self._attachments.append(attachment)
+        return attachment
+
+    def smart_split(self) -> Tuple[str, List[Dict[str, Any]]]:  # pyre-ignore
+        return "".join(self._text), self._attachments
+
+    def build(self) -> ComplexMessage:
+        # The builder's parts become the message's, don't keep adding to the builder
+        message = ComplexMessage(self._contents)
+        message._split = self.smart_split()
+        return message
 
 
 def smart_split_complex_message(
     message: Union[ComplexMessage, str],
 ) -> Tuple[str, List[Dict[str, str]]]:
     if isinstance(message, ComplexMessage):
-        return message.get_text(), message.get_attachments()
+        return message.smart_split()
     elif isinstance(message, str):
         return message, []
     else:
         raise ValueError("Message object must be a str or ComplexMessage")
+
+
+def parse_complex_message(
+    text: str, attachments: List[Dict[str, Any]]  # pyre-ignore
+) -> ComplexMessage:
+    # The reverse of get_attachments for the attachments that point into the text:
+    # mentions (loci) and emoji (placeholder characters, matched to the charmap in
+    # order). Every span is collected, sorted by offset and the text is cut between
+    # them in one pass; a span overlapping an earlier one is dropped
+    spans: List[Tuple[int, int, MessageAttach]] = []
+    for attachment in attachments:
+        kind = attachment.get("type")
+        if kind == "mentions":
+            for loci, user_id in zip(attachment["loci"], attachment["user_ids"]):
+                offset, length = loci[0], loci[1]
+                display = text[offset : offset + length]
+                spans.append((offset, length, RefAttach(user_id, display)))
+        elif kind == "emoji":
+            offset = text.find(EMOJI_PLACEHOLDER)
+            for pack_id, emoji_id in attachment.get("charmap", []):
+                if offset == -1:
+                    break
+                spans.append((offset, 1, EmojiAttach(pack_id, emoji_id)))
+                offset = text.find(EMOJI_PLACEHOLDER, offset + 1)
+    if not spans:
+        return ComplexMessage(text)
+
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    contents: List[Union[MessageAttach, str]] = []
+    position = 0
+    for offset, length, part in spans:
+        if offset < position or offset >= len(text):
+            continue
+        if offset > position:
+            contents.append(text[position:offset])
+        contents.append(part)
+        position = offset + length
+    if position < len(text):
+        contents.append(text[position:])
+    return ComplexMessage(contents)
@@ -0,0 +1,220 @@
+# pyre-strict
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.endpoints.request import Request
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        # Seconds spent waiting on the server, turning the body into JSON and building objects
+        self.network = 0.0
+        self.decode = 0.0
+        self.parse = 0.0
+        self.status: Optional[int] = None
+        self.response_bytes = 0
+
+
+class RequestEvent:
+    def __init__(self, request: "Request[Any]", error: Optional[BaseException]) -> None:
+        timings = request.timings
+        self.request = request
+        self.endpoint: str = type(request).__name__
+        self.mode: str = request.mode()
+        self.status: Optional[int] = timings.status
+        self.elapsed: float = request.elapsed or 0.0
+        self.network: float = timings.network
+        self.decode: float = timings.decode
+        self.parse: float = timings.parse
+        self.response_bytes: int = timings.response_bytes
+        self.retries: int = request.retries
+        # True when the response was shared from an identical request already in flight
+        self.coalesced: bool = request.coalesced
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            "RequestEvent("
+            + self.endpoint
+            + ", status="
+            + str(self.status)
+            + ", elapsed="
+            + "%.4f" % self.elapsed
+            + ")"
+        )
+
+
+RequestHook = Callable[[RequestEvent], None]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((_format_value(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class EndpointMetrics:
+    def __init__(self) -> None:
+        self.latency: Dict[str, Histogram] = {
+            phase: Histogram(LATENCY_BUCKETS)
+            for phase in ("total", "network", "decode", "parse")
+        }
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.statuses: Dict[Tuple[str, str], int] = {}
+        self.errors = 0
+        self.retries = 0
+        self.coalesced = 0
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        # Registries are hooks themselves: gmi.hooks.append(registry)
+        self.observe(event)
+
+    def observe(self, event: RequestEvent) -> None:
+        with self._lock:
+            metrics = self.endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = EndpointMetrics()
+                self.endpoints[event.endpoint] = metrics
+            metrics.latency["total"].observe(event.elapsed)
+            metrics.latency["network"].observe(event.network)
+            metrics.latency["decode"].observe(event.decode)
+            metrics.latency["parse"].observe(event.parse)
+            metrics.response_bytes.observe(event.response_bytes)
+            status = "none" if event.status is None else str(event.status)
+            key = (event.mode, status)
+            metrics.statuses[key] = metrics.statuses.get(key, 0) + 1
+            if event.error is not None:
+                metrics.errors += 1
+            metrics.retries += event.retries
+            if event.coalesced:
+                metrics.coalesced += 1
+
+    def export_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            lines.append(
+                "# HELP lowerpines_requests_total Requests sent, by endpoint, HTTP mode and status"
+            )
+            lines.append("# TYPE lowerpines_requests_total counter")
+            for endpoint, metrics in endpoints:
+                for (mode, status), count in sorted(metrics.statuses.items()):
+                    labels = _labels(endpoint=endpoint, mode=mode, status=status)
+                    lines.append(
+                        "lowerpines_requests_total" + labels + " " + str(count)
+                    )
+
+            lines.append("# HELP lowerpines_request_errors_total Requests that raised")
+            lines.append("# TYPE lowerpines_request_errors_total counter")
+            for endpoint, metrics in endpoints:
+                lines.append(
+                    "lowerpines_request_errors_total"
+                    + _labels(endpoint=endpoint)
+                    + " "
+                    + str(metrics.errors)
+                )
+
+            lines.append(
+                "# HELP lowerpines_request_retries_total Retries sent by the retry policy"
+            )
+            lines.append("# TYPE lowerpines_request_retries_total counter")
+            for endpoint, metrics in endpoints:
+                lines.append(
+                    "lowerpines_request_retries_total"
+                    + _labels(endpoint=endpoint)
+                    + " "
+                    + str(metrics.retries)
+                )
+
+            lines.append(
+                "# HELP lowerpines_request_coalesced_total Requests answered by an identical request in flight"
+            )
+            lines.append("# TYPE lowerpines_request_coalesced_total counter")
+            for endpoint, metrics in endpoints:
+                lines.append(
+                    "lowerpines_request_coalesced_total"
+                    + _labels(endpoint=endpoint)
+                    + " "
+                    + str(metrics.coalesced)
+                )
+
+            lines.append(
+                "# HELP lowerpines_request_duration_seconds Time spent per request phase"
+            )
+            lines.append("# TYPE lowerpines_request_duration_seconds histogram")
+            for endpoint, metrics in endpoints:
+                for phase, histogram in metrics.latency.items():
+                    _histogram_lines(
+                        lines,
+                        "lowerpines_request_duration_seconds",
+                        histogram,
+                        endpoint=endpoint,
+                        phase=phase,
+                    )
+
+            lines.append("# HELP lowerpines_response_bytes Size of response bodies")
+            lines.append("# TYPE lowerpines_response_bytes histogram")
+            for endpoint, metrics in endpoints:
+                _histogram_lines(
+                    lines,
+                    "lowerpines_response_bytes",
+                    metrics.response_bytes,
+                    endpoint=endpoint,
+                )
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _labels(**labels: str) -> str:
+    parts: List[str] = []
+    for name, value in labels.items():
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(name + '="' + escaped + '"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _histogram_lines(
+    lines: List[str], name: str, histogram: Histogram, **labels: str
+) -> None:
+    for bound, count in histogram.cumulative():
+        lines.append(name + "_bucket" + _labels(**labels, le=bound) + " " + str(count))
+    lines.append(name + "_sum" + _labels(**labels) + " " + repr(histogram.sum))
+    lines.append(name + "_count" + _labels(**labels) + " " + str(histogram.count))
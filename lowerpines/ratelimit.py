@@ -0,0 +1,123 @@
+# pyre-strict
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.endpoints.request import Request
+
+# How often waiters that are not at the front of the queue check again, when they
+# have not been woken up by another waiter
+POLL_INTERVAL = 0.005
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        if burst < 1:
+            raise ValueError("Burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, cost: float = 1) -> float:
+        # Returns 0 if the tokens were taken, otherwise how long until they will be available
+        self.refill()
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1,
+        priorities: Optional[Dict[Type["Request[Any]"], Priority]] = None,
+    ) -> None:
+        # rate: requests per second, burst: requests that can be sent at once after being idle
+        self.bucket = TokenBucket(rate, burst)
+        self.priorities: Dict[Type["Request[Any]"], Priority] = dict(priorities or {})
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+
+    def priority_for(self, request: "Request[Any]") -> Priority:
+        for klass in type(request).__mro__:
+            if klass in self.priorities:
+                return self.priorities[klass]
+        return request.priority
+
+    @property
+    def waiting(self) -> int:
+        with self._cond:
+            return len(self._waiters)
+
+    def acquire(self, request: "Request[Any]") -> None:
+        ticket = self._enqueue(request)
+        with self._cond:
+            try:
+                while True:
+                    delay = self._poll(ticket)
+                    if delay is None:
+                        return
+                    self._cond.wait(delay)
+            except BaseException:
+                self._discard(ticket)
+                raise
+
+    async def acquire_async(self, request: "Request[Any]") -> None:
+        ticket = self._enqueue(request)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._poll(ticket)
+                if delay is None:
+                    return
+                await asyncio.sleep(delay)
+        except BaseException:
+            with self._cond:
+                self._discard(ticket)
+            raise
+
+    def _enqueue(self, request: "Request[Any]") -> Tuple[int, int]:
+        # Waiters are served by priority, then in arrival order
+        ticket = (int(self.priority_for(request)), next(self._counter))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _poll(self, ticket: Tuple[int, int]) -> Optional[float]:
+        # Must be called with the lock held, returns None once the ticket has been served
+        if self._waiters[0] != ticket:
+            return POLL_INTERVAL
+        delay = self.bucket.take()
+        if delay > 0:
+            return delay
+        heapq.heappop(self._waiters)
+        self._cond.notify_all()
+        return None
+
+    def _discard(self, ticket: Tuple[int, int]) -> None:
+        if ticket in self._waiters:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+            self._cond.notify_all()
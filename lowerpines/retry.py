@@ -0,0 +1,129 @@
+# pyre-strict
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, TYPE_CHECKING
+
+import requests
+from requests import Response
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.endpoints.request import Request
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class RetryStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.retries: Dict[str, int] = {}
+        self.exhausted: Dict[str, int] = {}
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def record_exhausted(self, endpoint: str) -> None:
+        with self._lock:
+            self.exhausted[endpoint] = self.exhausted.get(endpoint, 0) + 1
+
+    @property
+    def total_retries(self) -> int:
+        return sum(self.retries.values())
+
+    def __repr__(self) -> str:
+        return (
+            "RetryStats(retries="
+            + str(self.total_retries)
+            + ", exhausted="
+            + str(sum(self.exhausted.values()))
+            + ")"
+        )
+
+
+def parse_retry_after(response: Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_total_delay: float = 60.0,
+        jitter: bool = True,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_total_delay = max_total_delay
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.stats = RetryStats()
+        self._random = random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        if self.jitter:
+            # "Full jitter", spreads out clients that failed at the same moment
+            return self._random.uniform(0, ceiling)
+        return ceiling
+
+    def is_retryable(
+        self,
+        request: "Request[Any]",
+        response: Optional[Response] = None,
+        error: Optional[Exception] = None,
+    ) -> bool:
+        if response is not None:
+            if response.status_code == 429:
+                # Rate limited requests were rejected before being processed
+                return True
+            return response.status_code in self.retry_statuses and request.idempotent()
+        if isinstance(error, requests.ConnectTimeout):
+            # The request never left the client
+            return True
+        return isinstance(error, requests.RequestException) and request.idempotent()
+
+    def next_delay(
+        self,
+        request: "Request[Any]",
+        attempt: int,
+        waited: float,
+        response: Optional[Response] = None,
+        error: Optional[Exception] = None,
+        elapsed: float = 0.0,
+    ) -> Optional[float]:
+        # Returns None when the response (or error) should be passed on to the caller.
+        # elapsed is the time since the request's first attempt, see Request.retry_window
+        if not self.is_retryable(request, response, error):
+            return None
+        endpoint = type(request).__name__
+        delay = self.backoff(attempt)
+        if response is not None:
+            retry_after = parse_retry_after(response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        window = request.retry_window
+        if (
+            attempt >= self.max_retries
+            or waited + delay > self.max_total_delay
+            or (window is not None and elapsed + delay > window)
+        ):
+            self.stats.record_exhausted(endpoint)
+            return None
+        self.stats.record_retry(endpoint)
+        return delay
@@ -0,0 +1,103 @@
+# pyre-strict
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# pyre-ignore
+Result = Any
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, "asyncio.Future[Result]"] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
+
+    def do(self, key: Hashable, func: Callable[[], Result]) -> Tuple[Result, bool]:
+        # Runs func, unless a call with the same key is already running, in which case
+        # its result (or exception) is shared. The bool is True for shared results.
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(
+        self, key: Hashable, func: Callable[[], Awaitable[Result]]
+    ) -> Tuple[Result, bool]:
+        with self._lock:
+            future = self._async_calls.get(key)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self._async_calls[key] = future
+                self.leaders += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            # Shielded so a cancelled waiter doesn't cancel the call for everyone else
+            return await asyncio.shield(future), True
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._async_calls[key]
+
+    def __repr__(self) -> str:
+        return (
+            "SingleFlight(leaders="
+            + str(self.leaders)
+            + ", shared="
+            + str(self.shared)
+            + ")"
+        )
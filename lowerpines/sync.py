@@ -0,0 +1,233 @@
+# pyre-strict
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from lowerpines.checkpoint import Checkpoint
+from lowerpines.endpoints.chat import Chat, DirectMessage, DirectMessageChatsRequest
+from lowerpines.endpoints.group import Group, GroupsIndexRequest
+from lowerpines.endpoints.message import Message, MessagesIndexRequest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.gmi import GMI
+
+GroupHandler = Callable[[Group, List[Message]], None]
+ChatHandler = Callable[[Chat, List[DirectMessage]], None]
+
+INDEX_PAGE_SIZE = 100
+
+
+class SyncResult:
+    def __init__(self) -> None:
+        self.groups = 0
+        self.chats = 0
+        # Groups and chats with messages since the last sync
+        self.changed = 0
+        # Groups and chats seen for the first time, see SyncEngine
+        self.new = 0
+        self.messages = 0
+        # Failed groups and chats, by checkpoint key. Their checkpoint is left as it was,
+        # so the next sync fetches their messages again
+        self.errors: Dict[str, Exception] = {}
+        self.elapsed = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            "SyncResult(groups="
+            + str(self.groups)
+            + ", chats="
+            + str(self.chats)
+            + ", changed="
+            + str(self.changed)
+            + ", messages="
+            + str(self.messages)
+            + ", errors="
+            + str(len(self.errors))
+            + ")"
+        )
+
+
+class SyncEngine:
+    # Keeps copies of group and direct message histories up to date, fetching only what
+    # is new since the last sync.
+    #
+    # The checkpoint records the id of the newest message handled per group ("group:<id>")
+    # and per chat ("chat:<other user id>"). Each sync reads the groups and chats indexes,
+    # which carry the id of every group's and chat's last message, and skips those whose
+    # last message is the recorded one, so an unchanged group costs nothing beyond its
+    # share of an index page. Changed groups are read with after_id from the recorded id
+    # and chats backwards until it (the direct messages API only pages backwards), up to
+    # `concurrency` at a time. handle_group(group, messages) and handle_chat(chat, messages)
+    # get the new messages oldest first on the thread running sync(), and the checkpoint
+    # moves past them once the handler returns. Groups are handled a page at a time, with
+    # the next page fetched once the handler has the previous one, so only a page per
+    # group is held however far behind it is. A chat's new messages are handled at once,
+    # since they can only be put in order once the oldest has been fetched.
+    #
+    # Groups and chats without a checkpoint start at their current last message, without
+    # fetching their history. To backfill it, run a HistoryCrawler with the same
+    # checkpoint first: it records where syncing should pick up.
+    def __init__(
+        self,
+        gmi: "GMI",
+        checkpoint: Optional[Checkpoint] = None,
+        concurrency: int = 8,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.gmi = gmi
+        self.checkpoint: Checkpoint = (
+            checkpoint if checkpoint is not None else Checkpoint()
+        )
+        self.concurrency = concurrency
+
+    def sync(
+        self,
+        handle_group: Optional[GroupHandler] = None,
+        handle_chat: Optional[ChatHandler] = None,
+    ) -> SyncResult:
+        # Only groups are synced without handle_chat, and only chats without handle_group
+        start = time.monotonic()
+        result = SyncResult()
+        jobs: List[Tuple[str, Callable[[], Any], Callable[[Any], None]]] = []
+        if handle_group is not None:
+            groups = self._groups()
+            result.groups = len(groups)
+            for group in groups:
+                key = "group:" + str(group.group_id)
+                job = self._plan(key, group.messages.last_id, result)
+                if job is not None:
+                    jobs.append(
+                        (
+                            key,
+                            partial(self._group_delta, group, job),
+                            partial(handle_group, group),
+                        )
+                    )
+        if handle_chat is not None:
+            chats = self._chats()
+            result.chats = len(chats)
+            for chat in chats:
+                key = "chat:" + str(chat.other_user.user_id)
+                last_message = chat.last_message
+                last_id = (
+                    last_message.direct_message_id if last_message is not None else None
+                )
+                job = self._plan(key, last_id, result)
+                if job is not None:
+                    jobs.append(
+                        (
+                            key,
+                            partial(self._chat_delta, chat, job),
+                            partial(handle_chat, chat),
+                        )
+                    )
+        try:
+            self._run(jobs, result)
+        finally:
+            self.checkpoint.save()
+            result.elapsed = time.monotonic() - start
+        return result
+
+    def _plan(
+        self, key: str, last_id: Optional[str], result: SyncResult
+    ) -> Optional[Tuple[str, str]]:
+        # Returns (the recorded id, the index's last id) when there is something to fetch
+        if last_id is None:
+            return None
+        recorded = self.checkpoint.get(key).get("last_id")
+        if recorded is None:
+            self.checkpoint.update(key, last_id=last_id)
+            result.new += 1
+            return None
+        if recorded == last_id:
+            return None
+        result.changed += 1
+        return recorded, last_id
+
+    def _run(
+        self,
+        jobs: List[Tuple[str, Callable[[], Any], Callable[[Any], None]]],
+        result: SyncResult,
+    ) -> None:
+        pending = list(reversed(jobs))
+        in_flight: Dict["Future[Any]", Tuple[str, Callable[[Any], None]]] = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while pending or in_flight:
+                while pending and len(in_flight) < self.concurrency:
+                    key, fetch, handle = pending.pop()
+                    in_flight[pool.submit(fetch)] = (key, handle)
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key, handle = in_flight.pop(future)
+                    try:
+                        messages, newest_id, more = future.result()
+                    except Exception as e:
+                        result.errors[key] = e
+                        continue
+                    if messages:
+                        handle(messages)
+                        result.messages += len(messages)
+                    self.checkpoint.update(key, last_id=newest_id)
+                    if more is not None:
+                        in_flight[pool.submit(more)] = (key, handle)
+
+    def _group_delta(
+        self, group: Group, job: Tuple[str, str]
+    ) -> Tuple[List[Message], str, Optional[Callable[[], Any]]]:
+        # Returns a page, the id to record once it is handled and how to fetch the next
+        # page, if there is one
+        after_id, last_id = job
+        page = (
+            MessagesIndexRequest.plan(
+                self.gmi, group.group_id, after_id=after_id, limit=100
+            ).run()
+            or []
+        )
+        newest_id = page[-1].message_id if page else None
+        if newest_id is None:
+            return page, after_id, None
+        # Stop at the last message the index knew about, instead of asking for an empty
+        # page
+        if newest_id == last_id:
+            return page, newest_id, None
+        return page, newest_id, partial(self._group_delta, group, (newest_id, last_id))
+
+    def _chat_delta(
+        self, chat: Chat, job: Tuple[str, str]
+    ) -> Tuple[List[DirectMessage], str, None]:
+        since_id = job[0]
+        messages = list(chat.messages.iter_since(since_id))
+        messages.reverse()
+        return messages, messages[-1].direct_message_id if messages else since_id, None
+
+    def _groups(self) -> List[Group]:
+        groups: List[Group] = []
+        page = 1
+        while True:
+            groups_page = (
+                GroupsIndexRequest.plan(
+                    self.gmi, page=page, per_page=INDEX_PAGE_SIZE
+                ).run()
+                or []
+            )
+            groups.extend(groups_page)
+            if len(groups_page) < INDEX_PAGE_SIZE:
+                return groups
+            page += 1
+
+    def _chats(self) -> List[Chat]:
+        chats: List[Chat] = []
+        page = 1
+        while True:
+            chats_page = (
+                DirectMessageChatsRequest.plan(
+                    self.gmi, page=str(page), per_page=str(INDEX_PAGE_SIZE)
+                ).run()
+                or []
+            )
+            chats.extend(chats_page)
+            if len(chats_page) < INDEX_PAGE_SIZE:
+                return chats
+            page += 1
@@ -0,0 +1,215 @@
+# pyre-strict
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from requests import Response
+
+if TYPE_CHECKING:  # pragma: no cover
+    from lowerpines.endpoints.request import PreparedCall
+
+
+class Transport:
+    # Sends a prepared request and returns the raw response, GMI.client is a Transport
+    def send(self, call: "PreparedCall") -> Response:
+        return self.request(
+            call.method,
+            url=call.url,
+            params=call.params,
+            headers=call.headers,
+            data=call.data,
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        raise NotImplementedError  # pragma: no cover
+
+    def close(self) -> None:
+        pass
+
+
+def args_key(
+    method: str,
+    params: Optional[Dict[str, Any]],
+    data: Optional[Union[str, bytes]],
+) -> str:
+    if method == "GET" or data is None:
+        return json.dumps(params or {}, sort_keys=True)
+    if isinstance(data, bytes):
+        return hashlib.sha1(data).hexdigest()
+    return json.dumps(json.loads(data), sort_keys=True)
+
+
+def make_response(
+    status_code: int, body: bytes, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = body
+    response.encoding = "utf-8"
+    response.headers.update(headers or {})
+    return response
+
+
+class Recording:
+    def __init__(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        args: Dict[str, Any],  # pyre-ignore
+        response: Any,  # pyre-ignore
+    ) -> None:
+        self.endpoint = endpoint
+        self.method = "GET" if method == "GET" else "POST"
+        self.url = url
+        self.key: str = json.dumps(args, sort_keys=True)
+        body = b"" if response is None else json.dumps({"response": response}).encode()
+        # Responses are only ever read, so one instance is served to every request
+        self.response: Response = make_response(
+            200, body, {"Content-Type": "application/json"}
+        )
+
+
+NOT_RECORDED_BODY = json.dumps({"meta": {"code": 404, "errors": ["not recorded"]}})
+
+
+class ReplayTransport(Transport):
+    def __init__(
+        self, recordings: Iterable[Recording] = (), strict: bool = False
+    ) -> None:
+        # strict: only serve recordings whose URL and arguments match exactly, otherwise
+        # any recording of the same endpoint is served
+        self.strict = strict
+        self.served = 0
+        self.missed = 0
+        self._lock = threading.Lock()
+        self._exact: Dict[Tuple[str, str, str], Recording] = {}
+        # Fallbacks for non-strict mode, by endpoint (or method and URL) and arguments
+        self._by_endpoint: Dict[str, Dict[str, Recording]] = {}
+        self._by_url: Dict[Tuple[str, str], Dict[str, Recording]] = {}
+        for recording in recordings:
+            self.add(recording)
+
+    @classmethod
+    def from_directory(
+        cls, path: str = "test_data", strict: bool = False
+    ) -> "ReplayTransport":
+        # Files are written by test.dump_json, named <module>.<RequestClass>_<hash>.json
+        recordings: List[Recording] = []
+        for file_name in sorted(os.listdir(path)):
+            if not file_name.endswith(".json"):
+                continue
+            with open(os.path.join(path, file_name)) as f:
+                recorded = json.load(f)
+            endpoint = file_name.split("_")[0].split(".")[-1]
+            request = recorded["request"]
+            recordings.append(
+                Recording(
+                    endpoint,
+                    request["mode"],
+                    request["url"],
+                    request["args"],
+                    recorded["response"],
+                )
+            )
+        return cls(recordings, strict)
+
+    def add(self, recording: Recording) -> None:
+        self._exact[(recording.method, recording.url, recording.key)] = recording
+        self._by_endpoint.setdefault(recording.endpoint, {})[recording.key] = recording
+        url_key = (recording.method, recording.url)
+        self._by_url.setdefault(url_key, {})[recording.key] = recording
+
+    @property
+    def endpoints(self) -> List[str]:
+        return sorted(self._by_endpoint)
+
+    def send(self, call: "PreparedCall") -> Response:
+        fallbacks = None
+        if call.endpoint is not None:
+            fallbacks = self._by_endpoint.get(call.endpoint)
+        if fallbacks is None:
+            fallbacks = self._by_url.get((call.method, call.url))
+        key = args_key(call.method, call.params, call.data)
+        return self._serve(call.method, call.url, key, fallbacks)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        key = args_key(method, params, data)
+        return self._serve(method, url, key, self._by_url.get((method, url)))
+
+    def _serve(
+        self,
+        method: str,
+        url: str,
+        key: str,
+        fallbacks: Optional[Dict[str, Recording]],
+    ) -> Response:
+        recording = self._exact.get((method, url, key))
+        if recording is None and fallbacks and not self.strict:
+            # Prefer a recording with the same arguments, e.g. the same page of another
+            # group's messages
+            recording = fallbacks.get(key) or next(iter(fallbacks.values()))
+        with self._lock:
+            if recording is None:
+                self.missed += 1
+            else:
+                self.served += 1
+        if recording is None:
+            return make_response(404, NOT_RECORDED_BODY.encode())
+        return recording.response
+
+
+class LatencyTransport(Transport):
+    def __init__(
+        self,
+        inner: Transport,
+        latency: float,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        # Every request is delayed by latency plus a uniformly distributed share of jitter
+        self.inner = inner
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def delay(self) -> float:
+        if self.jitter:
+            return self.latency + self._random.uniform(0, self.jitter)
+        return self.latency
+
+    def send(self, call: "PreparedCall") -> Response:
+        time.sleep(self.delay())
+        return self.inner.send(call)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        time.sleep(self.delay())
+        return self.inner.request(method, url, params, headers, data)
+
+    def close(self) -> None:
+        self.inner.close()
@@ -15,6 +15,11 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/x-rst",
     install_requires=["requests"],
+    extras_require={
+        "async": ["aiohttp"],
+        "fast": ["orjson"],
+        "dataframe": ["numpy", "pandas"],
+    },
     license="GNU Lesser General Public License v3 (LGPLv3)",
     author="Jonathan Janzen",
     author_email="jjjonjanzen@gmail.com",
@@ -28,6 +28,10 @@ class TestField(TestCase):
         self.assertEqual(self.api_field.name, self.name_varname)
         self.assertEqual(self.api_field.api_name, self.name_api_field)
 
+    def test_path(self) -> None:
+        field = Field().with_api_name("messages.count").with_field_name("count")
+        self.assertEqual(field.path, ("messages", "count"))
+
 
 class MockAbstractObjectTypeObject(metaclass=AbstractObjectType):
     _fields: List[Field] = []
@@ -68,6 +72,22 @@ class MockAbstractObject(AbstractObject):
         self.fields_loaded = True
 
 
+class MockSlottedObject(AbstractObject, slots=("gmi", "extra")):
+    field1: Field = Field().with_api_name("id")
+    extra = "default"
+
+    def __init__(self, gmi: GMI) -> None:
+        self.gmi = gmi
+
+
+class MockInternedObject(AbstractObject):
+    field1: Field = Field().interned()
+    field2: Field = Field()
+
+    def __init__(self, gmi: GMI) -> None:
+        self.gmi = gmi
+
+
 JSON_TEST_DATA_1: str = os.path.join(
     os.path.dirname(__file__), "mock_abstract_object_1.json"
 )
@@ -93,9 +113,45 @@ class TestAbstractObject(TestCase):
     def test_on_fields_loaded_called(self) -> None:
         self.assertTrue(self.mock_obj.fields_loaded)
 
+    def test_missing_fields(self) -> None:
+        obj = MockAbstractObject.from_json(self.gmi, {"foo": {}})
+        self.assertIsNone(obj.field1)
+        self.assertIsNone(obj.field3)
+        self.assertIsNone(obj.field4)
+
+    def test_slots(self) -> None:
+        obj = MockSlottedObject.from_json(self.gmi, {"id": "1"})
+        self.assertFalse(hasattr(obj, "__dict__"))
+        self.assertEqual(obj.field1, "1")
+        self.assertEqual(obj.extra, "default")
+        self.assertIs(obj.gmi, self.gmi)
+        self.assertIsNone(MockSlottedObject(self.gmi).field1)
+        with self.assertRaises(AttributeError):
+            obj.undeclared = True  # type: ignore
+
     def test_refresh_from_other(self) -> None:
         self.for_overwrite._refresh_from_other(self.mock_obj)
         self.assertEqual(self.for_overwrite.field1, "field1_data")
         self.assertEqual(self.for_overwrite.field2, 2)
         self.assertEqual(self.for_overwrite.field3, "id_data")
         self.assertEqual(self.for_overwrite.field4, "foo.bar_data")
+
+    def test_interned(self) -> None:
+        def parse() -> MockInternedObject:
+            # Every json.loads returns new string objects
+            return MockInternedObject.from_json(
+                self.gmi, json.loads('{"field1": "user_1", "field2": "user_1"}')
+            )
+
+        first, second = parse(), parse()
+        self.assertIsNot(first.field1, second.field1)
+
+        self.gmi.intern_strings = True
+        first, second = parse(), parse()
+        self.assertEqual(first.field1, "user_1")
+        self.assertIs(first.field1, second.field1)
+        self.assertIsNot(first.field2, second.field2)
+        self.assertIsNone(MockInternedObject.from_json(self.gmi, {}).field1)
+        self.assertEqual(
+            MockInternedObject.from_json(self.gmi, {"field1": 1}).field1, 1
+        )
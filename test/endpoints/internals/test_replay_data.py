@@ -2,22 +2,12 @@
 import json
 import os
 from importlib import import_module
-from typing import Any, Dict, List, Optional, Type
-from unittest import TestCase, mock
+from typing import Any, Dict, List, Type
+from unittest import TestCase
 
 from lowerpines.endpoints.object import AbstractObject
-from lowerpines.endpoints.request import JsonType
 from lowerpines.gmi import GMI
-
-
-class MockRequestsResponse:
-    def __init__(self, response_json: JsonType) -> None:
-        self.response_json = response_json
-        self.status_code = 200
-        self.content: bytes = json.dumps(response_json).encode("utf-8")
-
-    def json(self) -> JsonType:
-        return {"response": self.response_json}
+from lowerpines.transport import ReplayTransport
 
 
 class TestReplayAll(TestCase):
@@ -28,6 +18,7 @@ class TestReplayAll(TestCase):
             klass, _ = file_name.split("_")
             with open(os.path.join(test_data_dir, file_name), "r") as file_contents:
                 self.json_data[klass] = json.load(file_contents)
+        self.transport = ReplayTransport.from_directory(test_data_dir, strict=True)
 
     def test_all(self) -> None:
         for name, recorded_data in self.json_data.items():
@@ -35,41 +26,28 @@ class TestReplayAll(TestCase):
                 self.check_file(name, recorded_data)
 
     def check_file(self, name: str, recorded_data: Dict[str, Any]) -> None:
-        def mocked_requests_api_call(
-            url: str,
-            params: Dict[str, str],
-            headers: List[str],
-            data: Optional[str] = None,
-        ) -> MockRequestsResponse:
-            if data is None:
-                self.assertEqual(params, recorded_data["request"]["args"])
-            else:
-                self.assertEqual(json.loads(data), recorded_data["request"]["args"])
-            self.assertTrue(url, recorded_data["request"]["url"])
-            return MockRequestsResponse(recorded_data["response"])
-
         name_split = name.split(".")
         module, klass_name = ".".join(name_split[:-1]), name_split[-1]
         klass = getattr(import_module(module), klass_name)
-        if recorded_data["request"]["mode"] == "GET":
-            patch_func = "get"
+        gmi = GMI("test_gmi")
+        # Strict replay only answers requests whose endpoint, URL and arguments were recorded
+        gmi.client = self.transport
+        served = self.transport.served
+        instance = klass(gmi, **recorded_data["request"]["init"])
+        self.assertEqual(self.transport.served, served + 1)
+        try:
+            results = instance.result
+        except AttributeError:
+            results = None
+        if isinstance(results, list):
+            for result in results:
+                self.check_types(result)
+        elif results is None:
+            self.assertEqual(instance.parse(recorded_data["response"]), None)
+        elif type(results) in [bool]:
+            pass
         else:
-            patch_func = "post"
-        with mock.patch("requests." + patch_func, side_effect=mocked_requests_api_call):
-            instance = klass(GMI("test_gmi"), **recorded_data["request"]["init"])
-            try:
-                results = instance.result
-            except AttributeError:
-                results = None
-            if isinstance(results, list):
-                for result in results:
-                    self.check_types(result)
-            elif results is None:
-                self.assertEqual(instance.parse(recorded_data["response"]), None)
-            elif type(results) in [bool]:
-                pass
-            else:
-                self.check_types(results)
+            self.check_types(results)
 
     def check_types(self, klass: Type[AbstractObject]) -> None:
         annotations = getattr(klass, "__annotations__", None)
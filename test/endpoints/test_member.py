@@ -0,0 +1,48 @@
+# pyre-strict
+from unittest import TestCase, mock
+
+from lowerpines.endpoints.group import Group
+from lowerpines.endpoints.member import Member, MemberList
+from lowerpines.gmi import GMI
+
+GROUP_JSON = {
+    "id": "1",
+    "members": [
+        {"id": str(100 + i), "user_id": str(i), "nickname": "Member " + str(i)}
+        for i in range(5)
+    ],
+    "messages": {},
+}
+
+
+class MemberListTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("member_list_token")
+
+    def test_members_built_on_access(self) -> None:
+        with mock.patch.object(Member, "from_json", wraps=Member.from_json) as built:
+            group = Group.from_json(self.gmi, GROUP_JSON)
+            self.assertEqual(len(group.members), 5)
+            self.assertEqual(built.call_count, 0)
+
+            self.assertEqual(group.members[1].nickname, "Member 1")
+            self.assertIs(group.members[1], group.members[1])
+            self.assertEqual(group.members[-1].user_id, "4")
+            self.assertEqual(built.call_count, 2)
+
+            member = group.members.get_by_user_id("3")
+            assert member is not None
+            self.assertEqual(member.member_id, "103")
+            self.assertIsNone(group.members.get_by_user_id("missing"))
+            self.assertEqual(built.call_count, 3)
+
+        self.assertEqual([m.user_id for m in group.members], ["0", "1", "2", "3", "4"])
+        self.assertEqual([m.user_id for m in group.members[1:3]], ["1", "2"])
+        self.assertEqual(group.members[0].group_id, "1")
+        with self.assertRaises(IndexError):
+            group.members[5]
+
+    def test_new_group_has_no_members(self) -> None:
+        group = Group(self.gmi, "name")
+        self.assertEqual(len(group.members), 0)
+        self.assertEqual(list(MemberList(self.gmi, None, None)), [])
@@ -0,0 +1,43 @@
+# pyre-strict
+from unittest import TestCase, mock
+
+from lowerpines.endpoints.message import Message
+from lowerpines.gmi import GMI
+from lowerpines.message import RefAttach, parse_complex_message
+
+MESSAGE_JSON = {
+    "id": "1",
+    "group_id": "2",
+    "text": "hey @all",
+    "attachments": [{"type": "mentions", "loci": [[4, 4]], "user_ids": ["3"]}],
+}
+
+
+class MessageComplexTextTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("message_token")
+
+    def test_parsed_on_first_access(self) -> None:
+        with mock.patch(
+            "lowerpines.message.parse_complex_message",
+            wraps=parse_complex_message,
+        ) as parse:
+            message = Message.from_json(self.gmi, MESSAGE_JSON)
+            self.assertEqual(parse.call_count, 0)
+            complex_text = message.complex_text
+            self.assertIs(message.complex_text, complex_text)
+            self.assertEqual(parse.call_count, 1)
+
+        self.assertEqual(complex_text.get_text(), "hey @all")
+        self.assertIsInstance(complex_text.contents[1], RefAttach)
+
+    def test_reset_on_refresh(self) -> None:
+        message = Message.from_json(self.gmi, MESSAGE_JSON)
+        self.assertEqual(message.complex_text.get_text(), "hey @all")
+        message._refresh_from_other(
+            Message.from_json(self.gmi, dict(MESSAGE_JSON, text="new", attachments=[]))
+        )
+        self.assertEqual(message.complex_text.contents, ["new"])
+
+    def test_unsent_message(self) -> None:
+        self.assertEqual(Message(self.gmi, "2").complex_text.contents, [""])
@@ -0,0 +1,854 @@
+# pyre-strict
+# An in-memory fake of the GroupMe API for end-to-end tests and load tests. It is seeded
+# from the recordings in test_data/ and routes requests by the URL shapes built in
+# lowerpines.endpoints, so a GMI can be pointed at it with gmi.base_url:
+#
+#   python -m test.fake_server --port 8080 --groups 10 --messages 5000 --latency 0.02
+#
+#   gmi.base_url = "http://127.0.0.1:8080/v3"
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from requests import Response
+
+from lowerpines.transport import Transport, make_response
+
+JsonType = Dict[str, Any]  # pyre-ignore
+Handler = Callable[..., Tuple[int, Any]]  # pyre-ignore
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), "..", "test_data")
+API_PREFIX = "/v3"
+
+DEFAULT_USER: JsonType = {
+    "id": "30038058",
+    "user_id": "30038058",
+    "name": "Fake User",
+    "email": "fake@example.com",
+    "phone_number": "+1 5555555555",
+    "image_url": None,
+    "sms": False,
+    "created_at": 1440264614,
+    "updated_at": 1568593091,
+}
+
+
+class FakeApiError(Exception):
+    def __init__(self, code: int, error: str) -> None:
+        super().__init__(error)
+        self.code = code
+        self.error = error
+
+
+class FakeGroupMe:
+    def __init__(self, fixtures: Optional[str] = TEST_DATA, seed: int = 0) -> None:
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.clock = 1568593086
+        self.last_id = 156859308710073974
+        self.user: JsonType = dict(DEFAULT_USER)
+        self.groups: Dict[str, JsonType] = {}
+        self.former_groups: Dict[str, JsonType] = {}
+        # Messages are kept oldest first, with their ids as ints for cursor lookups
+        self.messages: Dict[str, List[JsonType]] = {}
+        self.message_ids: Dict[str, List[int]] = {}
+        self.bots: Dict[str, JsonType] = {}
+        self.chat_users: Dict[str, JsonType] = {}
+        self.direct_messages: Dict[str, List[JsonType]] = {}
+        self.member_results: Dict[str, List[JsonType]] = {}
+        self.routes: List[Tuple[str, Pattern[str], Handler]] = []
+        self._add_routes()
+        if fixtures is not None and os.path.isdir(fixtures):
+            self.load_fixtures(fixtures)
+
+    def _add_routes(self) -> None:
+        routes: List[Tuple[str, str, Handler]] = [
+            ("GET", "/groups", self.groups_index),
+            ("GET", "/groups/former", self.groups_former),
+            ("POST", "/groups", self.groups_create),
+            ("POST", "/groups/join", self.groups_rejoin),
+            ("POST", "/groups/change_owners", self.groups_change_owners),
+            ("GET", "/groups/([^/]+)", self.groups_show),
+            ("POST", "/groups/([^/]+)/update", self.groups_update),
+            ("POST", "/groups/([^/]+)/destroy", self.groups_destroy),
+            ("POST", "/groups/([^/]+)/join/([^/]+)", self.groups_join),
+            ("GET", "/groups/([^/]+)/messages", self.messages_index),
+            ("POST", "/groups/([^/]+)/messages", self.messages_create),
+            ("GET", "/groups/([^/]+)/messages/([^/]+)", self.messages_show),
+            ("POST", "/groups/([^/]+)/members/add", self.members_add),
+            ("GET", "/groups/([^/]+)/members/results/([^/]+)", self.members_results),
+            ("POST", "/groups/([^/]+)/members/([^/]+)/remove", self.members_remove),
+            ("POST", "/groups/([^/]+)/memberships/update", self.members_update),
+            ("GET", "/groups/([^/]+)/likes", self.leaderboard),
+            ("GET", "/groups/([^/]+)/likes/mine", self.leaderboard_mine),
+            ("GET", "/groups/([^/]+)/likes/for_me", self.leaderboard_for_me),
+            ("POST", "/messages/([^/]+)/([^/]+)/like", self.like),
+            ("POST", "/messages/([^/]+)/([^/]+)/unlike", self.unlike),
+            ("GET", "/bots", self.bots_index),
+            ("POST", "/bots", self.bots_create),
+            ("POST", "/bots/post", self.bots_post),
+            ("POST", "/bots/update", self.bots_update),
+            ("POST", "/bots/destroy", self.bots_destroy),
+            ("GET", "/chats", self.chats_index),
+            ("GET", "/direct_messages", self.direct_messages_index),
+            ("POST", "/direct_messages", self.direct_messages_create),
+            ("GET", "/users/me", self.users_me),
+            ("POST", "/users/update", self.users_update),
+        ]
+        for method, path, handler in routes:
+            self.routes.append((method, re.compile(path), handler))
+
+    # --- Seeding ---
+
+    def load_fixtures(self, path: str) -> None:
+        # Files are written by test.dump_json, named <module>.<RequestClass>_<hash>.json
+        recorded: Dict[str, List[Any]] = {}  # pyre-ignore
+        for file_name in sorted(os.listdir(path)):
+            if file_name.endswith(".json"):
+                endpoint = file_name.split("_")[0].split(".")[-1]
+                with open(os.path.join(path, file_name)) as f:
+                    recorded.setdefault(endpoint, []).append(json.load(f)["response"])
+
+        for user in recorded.get("UserMeRequest", []):
+            self.user = user
+        for groups in recorded.get("GroupsIndexRequest", []):
+            for group in groups:
+                self.add_group(group)
+        for group in recorded.get("GroupsShowRequest", []):
+            self.add_group(group)
+        for response in recorded.get("MessagesIndexRequest", []):
+            for message in response["messages"]:
+                self.add_message(message)
+        for bots in recorded.get("BotIndexRequest", []):
+            for bot in bots:
+                self.bots[bot["bot_id"]] = bot
+        for chats in recorded.get("DirectMessageChatsRequest", []):
+            for chat in chats:
+                other_user = chat["other_user"]
+                self.chat_users[other_user["id"]] = other_user
+                self.add_direct_message(other_user["id"], chat["last_message"])
+
+    def seed(
+        self, groups: int = 1, messages_per_group: int = 0, members_per_group: int = 5
+    ) -> List[str]:
+        # Adds synthetic groups full of messages, returns the new group ids
+        group_ids = []
+        with self.lock:
+            for _ in range(groups):
+                group = self._new_group("Group " + str(len(self.groups) + 1))
+                for i in range(members_per_group - 1):
+                    user_id = str(self.random.randrange(10**7, 10**8))
+                    group["members"].append(
+                        self._new_member(user_id, "Member " + str(i + 1))
+                    )
+                self.add_group(group)
+                members = group["members"]
+                for i in range(messages_per_group):
+                    sender = self.random.choice(members)
+                    likers = self.random.sample(
+                        members, self.random.randint(0, min(3, len(members)))
+                    )
+                    message = self._new_message(
+                        group["id"], sender, "Message " + str(i + 1)
+                    )
+                    message["favorited_by"] = [m["user_id"] for m in likers]
+                    self.add_message(message)
+                group_ids.append(group["id"])
+        return group_ids
+
+    def add_group(self, group: JsonType) -> None:
+        group_id = group["id"]
+        self.groups[group_id] = group
+        self.messages.setdefault(group_id, [])
+        self.message_ids.setdefault(group_id, [])
+
+    def add_message(self, message: JsonType) -> None:
+        group_id = message["group_id"]
+        if group_id not in self.groups:
+            return
+        messages = self.messages[group_id]
+        ids = self.message_ids[group_id]
+        message_id = int(message["id"])
+        index = bisect_left(ids, message_id)
+        if index < len(ids) and ids[index] == message_id:
+            messages[index] = message
+        else:
+            ids.insert(index, message_id)
+            messages.insert(index, message)
+        self.last_id = max(self.last_id, message_id)
+
+    def add_direct_message(self, other_user_id: str, message: JsonType) -> None:
+        messages = self.direct_messages.setdefault(other_user_id, [])
+        messages.append(message)
+        messages.sort(key=lambda m: int(m["id"]))
+        self.last_id = max(self.last_id, int(message["id"]))
+
+    def _new_id(self) -> str:
+        self.last_id += self.random.randint(1, 1000)
+        return str(self.last_id)
+
+    def _tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def _new_member(self, user_id: str, nickname: str) -> JsonType:
+        return {
+            "id": self._new_id(),
+            "user_id": user_id,
+            "nickname": nickname,
+            "name": nickname,
+            "muted": False,
+            "image_url": None,
+            "autokicked": False,
+            "roles": ["user"],
+        }
+
+    def _new_group(self, name: str) -> JsonType:
+        me = self._new_member(self.user["id"], self.user["name"])
+        me["roles"] = ["admin", "owner"]
+        created_at = self._tick()
+        group_id = str(self.random.randrange(10**7, 10**8))
+        return {
+            "id": group_id,
+            "group_id": group_id,
+            "name": name,
+            "type": "private",
+            "description": None,
+            "image_url": None,
+            "creator_user_id": self.user["id"],
+            "created_at": created_at,
+            "updated_at": created_at,
+            "office_mode": False,
+            "phone_number": None,
+            "share_url": None,
+            "share_qr_code_url": None,
+            "max_members": 500,
+            "members": [me],
+        }
+
+    def _new_message(self, group_id: str, sender: JsonType, text: str) -> JsonType:
+        return {
+            "id": self._new_id(),
+            "group_id": group_id,
+            "source_guid": uuid.uuid4().hex,
+            "created_at": self._tick(),
+            "user_id": sender["user_id"],
+            "sender_id": sender["user_id"],
+            "sender_type": "user",
+            "name": sender["nickname"],
+            "avatar_url": sender.get("image_url"),
+            "text": text,
+            "system": False,
+            "platform": "gm",
+            "favorited_by": [],
+            "attachments": [],
+        }
+
+    # --- Dispatch ---
+
+    def handle(
+        self, method: str, path: str, query: Dict[str, str], body: Optional[JsonType]
+    ) -> Tuple[int, bytes]:
+        # Returns the status and body of the response the real API would send
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX) :]
+        try:
+            for route_method, pattern, handler in self.routes:
+                if route_method != method:
+                    continue
+                match = pattern.fullmatch(path)
+                if match is not None:
+                    with self.lock:
+                        code, response = handler(query, body or {}, *match.groups())
+                        if response is None:
+                            return code, b""
+                        return code, _envelope(code, response)
+            raise FakeApiError(404, "not found")
+        except FakeApiError as e:
+            return e.code, _error_body(e.code, e.error)
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, _error_body(400, "bad request: " + repr(e))
+
+    def _group(self, group_id: str) -> JsonType:
+        group = self.groups.get(group_id)
+        if group is None:
+            raise FakeApiError(404, "group not found")
+        return group
+
+    def _group_json(self, group_id: str) -> JsonType:
+        group = dict(self._group(group_id))
+        messages = self.messages[group_id]
+        last = messages[-1] if messages else None
+        group["messages"] = {
+            "count": len(messages),
+            "last_message_id": last["id"] if last else None,
+            "last_message_created_at": last["created_at"] if last else None,
+            "preview": {
+                "nickname": last["name"] if last else None,
+                "text": last["text"] if last else None,
+                "image_url": None,
+                "attachments": [],
+            },
+        }
+        return group
+
+    def _me(self, group_id: str) -> JsonType:
+        for member in self._group(group_id)["members"]:
+            if member["user_id"] == self.user["id"]:
+                return member
+        raise FakeApiError(403, "not a member")
+
+    def _message(self, group_id: str, message_id: str) -> JsonType:
+        ids = self.message_ids.get(group_id, [])
+        index = bisect_left(ids, int(message_id))
+        if index == len(ids) or ids[index] != int(message_id):
+            raise FakeApiError(404, "message not found")
+        return self.messages[group_id][index]
+
+    # --- Groups ---
+
+    def groups_index(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        page = int(query.get("page", 1))
+        per_page = int(query.get("per_page", 10))
+        group_ids = list(self.groups)[(page - 1) * per_page : page * per_page]
+        return 200, [self._group_json(group_id) for group_id in group_ids]
+
+    def groups_former(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        return 200, list(self.former_groups.values())
+
+    def groups_show(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        return 200, self._group_json(group_id)
+
+    def groups_create(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        group = self._new_group(body["name"])
+        group["description"] = body.get("description")
+        group["image_url"] = body.get("image_url")
+        self.add_group(group)
+        return 201, self._group_json(group["id"])
+
+    def groups_update(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        group = self._group(group_id)
+        for key in ["name", "description", "image_url", "office_mode", "share"]:
+            if key in body:
+                group[key] = body[key]
+        group["updated_at"] = self._tick()
+        return 200, self._group_json(group_id)
+
+    def groups_destroy(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        self._group(group_id)
+        del self.groups[group_id]
+        del self.messages[group_id]
+        del self.message_ids[group_id]
+        return 200, None
+
+    def groups_join(
+        self, query: Dict[str, str], body: JsonType, group_id: str, share_token: str
+    ) -> Tuple[int, Any]:
+        group = self._group(group_id)
+        if all(m["user_id"] != self.user["id"] for m in group["members"]):
+            group["members"].append(
+                self._new_member(self.user["id"], self.user["name"])
+            )
+        return 200, self._group_json(group_id)
+
+    def groups_rejoin(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        group_id = body["group_id"]
+        group = self.former_groups.pop(group_id, None)
+        if group is not None:
+            self.groups[group_id] = group
+        return self.groups_join(query, body, group_id, "")
+
+    def groups_change_owners(
+        self, query: Dict[str, str], body: JsonType
+    ) -> Tuple[int, Any]:
+        results = []
+        for request in body["requests"]:
+            group = self.groups.get(request["group_id"])
+            status = "404"
+            if group is not None:
+                group["creator_user_id"] = request["owner_id"]
+                status = "200"
+            results.append(dict(request, status=status))
+        return 200, {"results": results}
+
+    # --- Messages ---
+
+    def messages_index(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        self._group(group_id)
+        messages = self.messages[group_id]
+        ids = self.message_ids[group_id]
+        limit = min(int(query.get("limit", 20)), 100)
+        if "before_id" in query:
+            # The messages just older than before_id, newest first
+            end = bisect_left(ids, int(query["before_id"]))
+            page = messages[max(0, end - limit) : end][::-1]
+        elif "since_id" in query:
+            # The newest messages after since_id, newest first
+            start = max(bisect_right(ids, int(query["since_id"])), len(ids) - limit)
+            page = messages[start:][::-1]
+        elif "after_id" in query:
+            # The messages just newer than after_id, oldest first
+            start = bisect_right(ids, int(query["after_id"]))
+            page = messages[start : start + limit]
+        else:
+            page = messages[-limit:][::-1]
+        return 200, {"count": len(messages), "messages": page}
+
+    def messages_create(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        posted = body["message"]
+        message = self._new_message(group_id, self._me(group_id), posted["text"])
+        message["source_guid"] = posted.get("source_guid") or message["source_guid"]
+        message["attachments"] = posted.get("attachments") or []
+        self.add_message(message)
+        return 201, {"message": message}
+
+    def messages_show(
+        self, query: Dict[str, str], body: JsonType, group_id: str, message_id: str
+    ) -> Tuple[int, Any]:
+        return 200, {"message": self._message(group_id, message_id)}
+
+    # --- Members ---
+
+    def members_add(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        group = self._group(group_id)
+        added = []
+        for member in body["members"]:
+            added.append(self._new_member(member["user_id"], member["nickname"]))
+        group["members"].extend(added)
+        results_id = str(uuid.uuid4())
+        self.member_results[results_id] = added
+        return 202, {"results_id": results_id}
+
+    def members_results(
+        self, query: Dict[str, str], body: JsonType, group_id: str, results_id: str
+    ) -> Tuple[int, Any]:
+        added = self.member_results.get(results_id)
+        if added is None:
+            raise FakeApiError(404, "results not found")
+        return 200, {"members": added}
+
+    def members_remove(
+        self, query: Dict[str, str], body: JsonType, group_id: str, member_id: str
+    ) -> Tuple[int, Any]:
+        group = self._group(group_id)
+        members = [m for m in group["members"] if m["id"] != member_id]
+        if len(members) == len(group["members"]):
+            raise FakeApiError(404, "member not found")
+        group["members"] = members
+        return 200, None
+
+    def members_update(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        me = self._me(group_id)
+        me["nickname"] = body["membership"]["nickname"]
+        return 200, me
+
+    # --- Likes ---
+
+    def _liked(self, conversation_id: str, message_id: str) -> List[str]:
+        if "+" in conversation_id:
+            other_user_id = [
+                user_id
+                for user_id in conversation_id.split("+")
+                if user_id != self.user["id"]
+            ][0]
+            for message in self.direct_messages.get(other_user_id, []):
+                if message["id"] == message_id:
+                    return message["favorited_by"]
+            raise FakeApiError(404, "message not found")
+        return self._message(conversation_id, message_id)["favorited_by"]
+
+    def like(
+        self,
+        query: Dict[str, str],
+        body: JsonType,
+        conversation_id: str,
+        message_id: str,
+    ) -> Tuple[int, Any]:
+        favorited_by = self._liked(conversation_id, message_id)
+        if self.user["id"] not in favorited_by:
+            favorited_by.append(self.user["id"])
+        return 200, None
+
+    def unlike(
+        self,
+        query: Dict[str, str],
+        body: JsonType,
+        conversation_id: str,
+        message_id: str,
+    ) -> Tuple[int, Any]:
+        favorited_by = self._liked(conversation_id, message_id)
+        if self.user["id"] in favorited_by:
+            favorited_by.remove(self.user["id"])
+        return 200, None
+
+    def leaderboard(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        # The period is ignored, every message in the group counts
+        self._group(group_id)
+        liked = [m for m in self.messages[group_id] if m["favorited_by"]]
+        liked.sort(key=lambda m: len(m["favorited_by"]), reverse=True)
+        return 200, {"messages": liked[:20]}
+
+    def leaderboard_mine(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        self._group(group_id)
+        user_id = self.user["id"]
+        liked = [m for m in self.messages[group_id] if user_id in m["favorited_by"]]
+        return 200, {"messages": liked[::-1]}
+
+    def leaderboard_for_me(
+        self, query: Dict[str, str], body: JsonType, group_id: str
+    ) -> Tuple[int, Any]:
+        self._group(group_id)
+        user_id = self.user["id"]
+        liked = [
+            m
+            for m in self.messages[group_id]
+            if m["user_id"] == user_id and m["favorited_by"]
+        ]
+        return 200, {"messages": liked[::-1]}
+
+    # --- Bots ---
+
+    def bots_index(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        return 200, list(self.bots.values())
+
+    def bots_create(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        bot: JsonType = dict(body["bot"])
+        bot["bot_id"] = uuid.uuid4().hex[:26]
+        bot["group_name"] = self._group(bot["group_id"])["name"]
+        for key in ["avatar_url", "callback_url"]:
+            bot.setdefault(key, None)
+        bot.setdefault("dm_notification", False)
+        self.bots[bot["bot_id"]] = bot
+        return 201, {"bot": bot}
+
+    def _bot(self, bot_id: str) -> JsonType:
+        bot = self.bots.get(bot_id)
+        if bot is None:
+            raise FakeApiError(404, "bot not found")
+        return bot
+
+    def bots_post(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        bot = self._bot(body["bot_id"])
+        sender = {"user_id": bot["bot_id"], "nickname": bot["name"]}
+        message = self._new_message(bot["group_id"], sender, body["text"])
+        message["sender_type"] = "bot"
+        message["attachments"] = body.get("attachments") or []
+        self.add_message(message)
+        return 202, None
+
+    def bots_update(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        update = body["bot"]
+        self._bot(update["bot_id"]).update(update)
+        return 200, None
+
+    def bots_destroy(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        self._bot(body["bot_id"])
+        del self.bots[body["bot_id"]]
+        return 200, None
+
+    # --- Chats ---
+
+    def chats_index(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        chats = []
+        for other_user_id, messages in self.direct_messages.items():
+            last = messages[-1]
+            chats.append(
+                {
+                    "created_at": messages[0]["created_at"],
+                    "updated_at": last["created_at"],
+                    "messages_count": len(messages),
+                    "last_message": last,
+                    "other_user": self.chat_users[other_user_id],
+                }
+            )
+        chats.sort(key=lambda c: c["updated_at"], reverse=True)
+        page = int(query.get("page", 1))
+        per_page = int(query.get("per_page", 20))
+        return 200, chats[(page - 1) * per_page : page * per_page]
+
+    def direct_messages_index(
+        self, query: Dict[str, str], body: JsonType
+    ) -> Tuple[int, Any]:
+        messages = self.direct_messages.get(query["other_user_id"], [])
+        if "before_id" in query:
+            before_id = int(query["before_id"])
+            page = [m for m in messages if int(m["id"]) < before_id][-20:]
+        elif "since_id" in query:
+            since_id = int(query["since_id"])
+            page = [m for m in messages if int(m["id"]) > since_id][-20:]
+        else:
+            page = messages[-20:]
+        return 200, {"count": len(messages), "direct_messages": page[::-1]}
+
+    def direct_messages_create(
+        self, query: Dict[str, str], body: JsonType
+    ) -> Tuple[int, Any]:
+        recipient_id = body["conversation_id"].split("+")[0]
+        other_user = self.chat_users.setdefault(
+            recipient_id, {"id": recipient_id, "name": recipient_id, "avatar_url": None}
+        )
+        message = {
+            "id": self._new_id(),
+            "conversation_id": body["conversation_id"],
+            "created_at": self._tick(),
+            "recipient_id": other_user["id"],
+            "sender_id": self.user["id"],
+            "user_id": self.user["id"],
+            "sender_type": "user",
+            "name": self.user["name"],
+            "avatar_url": self.user.get("image_url"),
+            "source_guid": uuid.uuid4().hex,
+            "text": body["message"]["text"],
+            "attachments": body["message"].get("attachments") or [],
+            "favorited_by": [],
+        }
+        self.add_direct_message(recipient_id, message)
+        return 201, {"direct_message": message}
+
+    # --- Users ---
+
+    def users_me(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        return 200, self.user
+
+    def users_update(self, query: Dict[str, str], body: JsonType) -> Tuple[int, Any]:
+        self.user.update(body)
+        self.user["updated_at"] = self._tick()
+        return 200, self.user
+
+
+def _envelope(code: int, response: Any) -> bytes:  # pyre-ignore
+    return json.dumps({"meta": {"code": code}, "response": response}).encode()
+
+
+def _error_body(code: int, error: str) -> bytes:
+    return json.dumps({"meta": {"code": code, "errors": [error]}}).encode()
+
+
+class FakeTransport(Transport):
+    # Serves a GMI's requests from the store in-process, without HTTP or sockets. Wrap it
+    # in a LatencyTransport to add network delay:
+    #
+    #   gmi.client = LatencyTransport(FakeTransport(store), latency=0.02)
+    def __init__(self, store: FakeGroupMe) -> None:
+        self.store = store
+        self.requests = 0
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,  # pyre-ignore
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        self.requests += 1
+        query = {key: str(value) for key, value in (params or {}).items()}
+        try:
+            body = json.loads(data) if data else None
+        except ValueError:
+            return make_response(400, _error_body(400, "body is not JSON"))
+        code, content = self.store.handle(method, urlsplit(url).path, query, body)
+        return make_response(code, content)
+
+
+class FakeGroupMeServer:
+    def __init__(
+        self,
+        store: Optional[FakeGroupMe] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        # Every response is delayed by latency plus up to jitter seconds. A share of
+        # requests (error_rate, rate_limit_rate) is answered with a 503 or a 429 that
+        # carries a Retry-After of retry_after seconds, before touching the store.
+        self.store: FakeGroupMe = store if store is not None else FakeGroupMe()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.injected_errors = 0
+        self.injected_rate_limits = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = FakeGroupMeHTTPServer((host, port), self)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return "http://" + str(host) + ":" + str(port) + API_PREFIX
+
+    def start(self) -> "FakeGroupMeServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeGroupMeServer":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:  # pyre-ignore
+        self.stop()
+
+    def respond(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> Tuple[int, bytes, Dict[str, str]]:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                self.injected_rate_limits += 1
+                fault: Optional[int] = 429
+            elif roll < self.rate_limit_rate + self.error_rate:
+                self.injected_errors += 1
+                fault = 503
+            else:
+                fault = None
+        if delay:
+            time.sleep(delay)
+
+        if fault == 429:
+            return (
+                429,
+                _error_body(429, "rate limited"),
+                {"Retry-After": "%g" % self.retry_after},
+            )
+        elif fault is not None:
+            return fault, _error_body(fault, "injected failure"), {}
+        if not headers.get("X-Access-Token"):
+            return 401, _error_body(401, "unauthorized"), {}
+
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        try:
+            json_body = json.loads(body) if body else None
+        except ValueError:
+            return 400, _error_body(400, "body is not JSON"), {}
+        code, response = self.store.handle(method, url.path, query, json_body)
+        return code, response, {}
+
+
+class FakeGroupMeHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address: Tuple[str, int], fake: FakeGroupMeServer) -> None:
+        super().__init__(address, FakeGroupMeHandler)
+        # Answers the requests, see FakeGroupMeHandler
+        self.fake = fake
+
+
+class FakeGroupMeHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so HttpClient's connection pool behaves as it would against the API
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._respond("GET")
+
+    def do_POST(self) -> None:
+        self._respond("POST")
+
+    def _respond(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server = self.server
+        assert isinstance(server, FakeGroupMeHTTPServer)
+        code, response, headers = server.fake.respond(
+            method, self.path, dict(self.headers.items()), body
+        )
+        self.send_response(code)
+        if response:
+            self.send_header("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    # pyre-ignore
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake GroupMe API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--groups", type=int, default=1, help="synthetic groups")
+    parser.add_argument("--messages", type=int, default=1000, help="per group")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = FakeGroupMe(seed=args.seed)
+    store.seed(args.groups, args.messages)
+    server = FakeGroupMeServer(
+        store,
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    print("Serving fake GroupMe API at " + server.base_url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
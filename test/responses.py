@@ -0,0 +1,18 @@
+# pyre-strict
+import json
+from typing import Any, Dict, Optional
+
+from requests import Response
+
+from lowerpines.transport import make_response
+
+# The smallest GroupsShowRequest response that parses
+GROUP_BODY = {"response": {"id": "1", "name": "G", "members": [], "messages": {}}}
+
+
+def json_response(  # pyre-ignore
+    status_code: int, body: Any = None, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    # A response carrying body as JSON, or nothing without a body
+    content = json.dumps(body).encode("utf-8") if body is not None else b""
+    return make_response(status_code, content, headers)
@@ -0,0 +1,119 @@
+# pyre-strict
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from unittest import IsolatedAsyncioTestCase, mock
+
+from requests import Response
+
+from lowerpines.async_gmi import AsyncGMI
+from lowerpines.client import AsyncHttpClient
+from lowerpines.endpoints.group import Group, GroupsShowRequest
+from lowerpines.exceptions import UnauthorizedException
+from lowerpines.gmi import GMI
+from test.fake_server import FakeGroupMe, FakeTransport
+from test.responses import json_response
+
+GROUP_JSON_FILE = "test_data/lowerpines.endpoints.group.GroupsShowRequest_bf21a9e8fbc5a3846fb05b4fa0859e0917b2202f.json"
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = json.dumps({"response": {"path": self.path}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # pyre-ignore
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class AsyncHttpClientTest(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:" + str(self.server.server_address[1])
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_response_conversion(self) -> None:
+        client = AsyncHttpClient()
+        response = await client.request("GET", self.url + "/groups", {"page": 2})
+        await client.close()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.encoding, "utf-8")
+        self.assertEqual(response.json(), {"response": {"path": "/groups?page=2"}})
+
+
+class AsyncGMITest(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        with open(GROUP_JSON_FILE) as f:
+            self.group_json: Dict[str, Any] = json.load(f)["response"]
+        self.calls: List[str] = []
+
+    async def fake_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None,
+    ) -> Response:
+        self.calls.append(url)
+        await asyncio.sleep(0)
+        return json_response(200, {"response": self.group_json})
+
+    async def test_request_reuses_endpoint_parsing(self) -> None:
+        async with AsyncGMI("async_token") as gmi:
+            with mock.patch.object(gmi.client, "request", self.fake_request):
+                group = await gmi.request(GroupsShowRequest, "53616101")
+        self.assertIsInstance(group, Group)
+        self.assertEqual(group.group_id, self.group_json["id"])
+        self.assertIsInstance(group.gmi, GMI)
+        self.assertEqual(self.calls, ["https://api.groupme.com/v3/groups/53616101"])
+
+    async def test_concurrent_requests(self) -> None:
+        gmi = AsyncGMI("async_token")
+        with mock.patch.object(gmi.client, "request", self.fake_request):
+            groups = await asyncio.gather(*[gmi.groups.show(str(i)) for i in range(20)])
+        self.assertEqual(len(groups), 20)
+        self.assertEqual(len(self.calls), 20)
+
+    async def test_manager_filtering(self) -> None:
+        gmi = AsyncGMI("async_token")
+
+        async def index(*args: Any, **kwargs: Any) -> Response:
+            return json_response(200, {"response": [self.group_json]})
+
+        with mock.patch.object(gmi.client, "request", index):
+            group = await gmi.groups.get(name=self.group_json["name"])
+            self.assertEqual(len(await gmi.groups.all()), 1)
+        self.assertEqual(group.group_id, self.group_json["id"])
+
+    async def test_errors_are_shared_with_sync_api(self) -> None:
+        gmi = AsyncGMI("async_token")
+
+        async def unauthorized(*args: Any, **kwargs: Any) -> Response:
+            return json_response(401, {"meta": {"errors": ["unauthorized"]}})
+
+        with mock.patch.object(gmi.client, "request", unauthorized):
+            with self.assertRaises(UnauthorizedException):
+                await gmi.groups.show("1")
+
+    async def test_gmi_transport(self) -> None:
+        # Transports set on gmi.client other than HttpClient are used as well
+        store = FakeGroupMe()
+        group_ids = store.seed(groups=3, messages_per_group=0)
+        gmi = AsyncGMI("async_token")
+        gmi.gmi.client = FakeTransport(store)
+        groups = await asyncio.gather(*[gmi.groups.show(g) for g in group_ids])
+        self.assertEqual([g.group_id for g in groups], group_ids)
+        # aiohttp was never used
+        self.assertIsNone(gmi.client._session)
@@ -0,0 +1,130 @@
+# pyre-strict
+import json
+import time
+from typing import Any, Dict, List, Optional
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from requests import Response
+
+from lowerpines.async_gmi import AsyncGMI
+from lowerpines.cache import ResponseCache
+from lowerpines.endpoints.group import GroupsShowRequest, GroupsUpdateRequest
+from lowerpines.endpoints.message import MessagesIndexRequest
+from lowerpines.gmi import GMI
+
+
+def group_body(group_id: str, name: str) -> Dict[str, Any]:  # pyre-ignore
+    return {"response": {"id": group_id, "name": name, "members": [], "messages": {}}}
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("cache_token")
+        self.cache = ResponseCache(max_entries=2)
+        self.gmi.cache = self.cache
+        self.calls: List[Dict[str, Any]] = []  # pyre-ignore
+        self.status = 200
+        self.name = "G"
+        patcher = mock.patch(
+            "lowerpines.client.HttpClient.request", side_effect=self.fake_request
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None,
+    ) -> Response:
+        self.calls.append({"url": url, "headers": dict(headers or {})})
+        response = Response()
+        response.status_code = self.status
+        response.headers["ETag"] = '"v1"'
+        if self.status == 200:
+            group_id = url.split("/")[-1]
+            if group_id in ("update", "messages"):
+                group_id = url.split("/")[-2]
+            body = group_body(group_id, self.name)
+            if url.endswith("/messages"):
+                body = {"response": {"count": 0, "messages": []}}
+            response._content = json.dumps(body).encode("utf-8")
+        else:
+            response._content = b""
+        return response
+
+    def test_fresh_hit(self) -> None:
+        first = GroupsShowRequest(self.gmi, "1").result
+        second = GroupsShowRequest(self.gmi, "1").result
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(second.name, "G")
+        # Every hit is parsed again, so callers never share objects
+        self.assertIsNot(first, second)
+        self.assertEqual(self.cache.stats.hits, 1)
+
+    def test_uncached_endpoints(self) -> None:
+        MessagesIndexRequest(self.gmi, "1")
+        MessagesIndexRequest(self.gmi, "1")
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_conditional_revalidation(self) -> None:
+        with mock.patch.object(GroupsShowRequest, "cache_ttl", 0.0):
+            GroupsShowRequest(self.gmi, "1")
+            self.status = 304
+            group = GroupsShowRequest(self.gmi, "1").result
+        self.assertEqual(group.name, "G")
+        self.assertEqual(self.calls[1]["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(self.cache.stats.revalidated, 1)
+
+    def test_lru_eviction(self) -> None:
+        for group_id in ["1", "2", "1", "3"]:
+            GroupsShowRequest(self.gmi, group_id)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(self.cache.stats.evictions, 1)
+        GroupsShowRequest(self.gmi, "1")
+        GroupsShowRequest(self.gmi, "2")
+        self.assertEqual(len(self.calls), 4)
+
+    def test_post_invalidates(self) -> None:
+        GroupsShowRequest(self.gmi, "1")
+        self.name = "Renamed"
+        GroupsUpdateRequest(self.gmi, "1", name="Renamed")
+        self.assertEqual(GroupsShowRequest(self.gmi, "1").result.name, "Renamed")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_gmi_refresh_clears(self) -> None:
+        GroupsShowRequest(self.gmi, "1")
+        self.gmi.refresh()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_expiry(self) -> None:
+        with mock.patch.object(GroupsShowRequest, "cache_ttl", 0.01):
+            GroupsShowRequest(self.gmi, "1")
+            time.sleep(0.02)
+            GroupsShowRequest(self.gmi, "1")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_invalid_size(self) -> None:
+        with self.assertRaises(ValueError):
+            ResponseCache(max_entries=0)
+
+
+class AsyncResponseCacheTest(IsolatedAsyncioTestCase):
+    async def test_shared_with_async(self) -> None:
+        gmi = AsyncGMI("async_cache_token")
+        gmi.gmi.cache = ResponseCache()
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps(group_body("1", "G")).encode("utf-8")
+
+        async def fake_request(*args: Any, **kwargs: Any) -> Response:
+            return response
+
+        with mock.patch.object(gmi.client, "request", side_effect=fake_request) as m:
+            await gmi.groups.show("1")
+            group = await gmi.groups.show("1")
+        self.assertEqual(group.name, "G")
+        self.assertEqual(m.call_count, 1)
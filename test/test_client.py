@@ -0,0 +1,62 @@
+# pyre-strict
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest import TestCase
+
+from lowerpines.client import HttpClient, PoolingAdapter
+from lowerpines.gmi import GMI
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b'{"response": {}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # pyre-ignore
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class HttpClientTest(TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:" + str(self.server.server_address[1]) + "/"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_gmi_owns_client(self) -> None:
+        self.assertIsInstance(GMI("client_test").client, HttpClient)
+
+    def test_connection_reused(self) -> None:
+        client = HttpClient()
+        for _ in range(3):
+            self.assertEqual(client.request("GET", self.url).status_code, 200)
+        self.assertEqual(client.pool_misses, 1)
+        self.assertEqual(client.pool_hits, 2)
+        client.close()
+
+    def test_idle_timeout_drops_connections(self) -> None:
+        client = HttpClient(idle_timeout=0)
+        for _ in range(3):
+            client.request("GET", self.url)
+        self.assertEqual(client.pool_misses, 3)
+        self.assertEqual(client.pool_hits, 0)
+        client.close()
+
+    def test_pool_configuration(self) -> None:
+        client = HttpClient(pool_connections=2, pool_maxsize=4)
+        adapter = client.session.get_adapter(self.url)
+        assert isinstance(adapter, PoolingAdapter)
+        self.assertEqual(adapter.poolmanager.connection_pool_kw["maxsize"], 4)
+        client.close()
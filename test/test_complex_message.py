@@ -1,5 +1,6 @@
 # pyre-strict
 
+from typing import List, Union
 from unittest import TestCase
 
 from lowerpines.message import (
@@ -12,6 +13,9 @@ from lowerpines.message import (
     EmojiAttach,
     QueuedAttach,
     LinkedImageAttach,
+    MessageBuilder,
+    MessageAttach,
+    parse_complex_message,
 )
 
 
@@ -173,3 +177,111 @@ class ImageAttachTest(TestCase):
 
         self.assertEqual(message1.get_text(), message2.get_text())
         self.assertEqual(message1.get_attachments(), message2.get_attachments())
+
+
+class ParseComplexMessageTest(TestCase):
+    def test_plain_text(self) -> None:
+        message = parse_complex_message("Hello!", [{"type": "image", "url": "u"}])
+        self.assertEqual(message.contents, ["Hello!"])
+
+    def test_round_trip(self) -> None:
+        original = (
+            RefAttach("red_id", "@red")
+            + " vs. "
+            + RefAttach("blue_id", "@blue")
+            + " "
+            + EmojiAttach(1, 2)
+            + EmojiAttach(3, 4)
+            + " done"
+        )
+        text, attachments = smart_split_complex_message(original)
+        message = parse_complex_message(text, attachments)
+        self.assertEqual(message.get_text(), text)
+        self.assertEqual(message.get_attachments(), attachments)
+        self.assertEqual(str(message), str(original))
+
+    def test_unsorted_and_overlapping_spans(self) -> None:
+        message = parse_complex_message(
+            "@a \ufffd @b",
+            [
+                {"type": "emoji", "placeholder": "\ufffd", "charmap": [[1, 2]]},
+                {
+                    "type": "mentions",
+                    "loci": [[5, 2], [0, 2], [1, 1]],
+                    "user_ids": ["b", "a", "x"],
+                },
+            ],
+        )
+        self.assertEqual(str(message), "[R:@a, ' ', E:\ufffd, ' ', R:@b]")
+        self.assertEqual(message.get_text(), "@a \ufffd @b")
+
+    def test_out_of_range_loci_ignored(self) -> None:
+        message = parse_complex_message(
+            "hi", [{"type": "mentions", "loci": [[10, 2]], "user_ids": ["a"]}]
+        )
+        self.assertEqual(message.contents, ["hi"])
+
+
+class MessageBuilderTest(TestCase):
+    def test_same_as_complex_message(self) -> None:
+        parts: List[Union[str, MessageAttach]] = [
+            "Hi ",
+            RefAttach("user1", "@one"),
+            " and ",
+            RefAttach("user2", "@two"),
+            EmojiAttach(1, 2),
+            ImageAttach("http://image.url"),
+            LocationAttach("home", 32, 83),
+            SplitAttach("token"),
+            QueuedAttach("queue", "url"),
+            LinkedImageAttach("linked_image_url"),
+            EmojiAttach(3, 4),
+        ]
+        builder = MessageBuilder()
+        for part in parts:
+            builder.add(part)
+        expected = ComplexMessage(list(parts))
+        self.assertEqual(
+            builder.smart_split(), (expected.get_text(), expected.get_attachments())
+        )
+
+    def test_chaining(self) -> None:
+        message = (
+            MessageBuilder()
+            .text("Hi ")
+            .mention("user1", "@one")
+            .text(" ")
+            .emoji(1, 2)
+            .image("http://image.url")
+            .build()
+        )
+        self.assertEqual(
+            smart_split_complex_message(message),
+            (
+                "Hi @one \ufffd",
+                [
+                    {"type": "mentions", "user_ids": ["user1"], "loci": [[3, 4]]},
+                    {"type": "emoji", "placeholder": "\ufffd", "charmap": [[1, 2]]},
+                    {"type": "image", "url": "http://image.url"},
+                ],
+            ),
+        )
+        self.assertEqual(str(message), "['Hi ', R:@one, ' ', E:\ufffd, I:]")
+
+    def test_split_cached_until_changed(self) -> None:
+        message = ComplexMessage(["Hi ", RefAttach("user1", "@one")])
+        self.assertIs(message.get_attachments(), message.get_attachments())
+
+        message += RefAttach("user2", "@two")
+        self.assertEqual(message.get_text(), "Hi @one@two")
+        message.contents.insert(0, ">")
+        self.assertEqual(
+            message.get_attachments(),
+            [
+                {
+                    "type": "mentions",
+                    "user_ids": ["user1", "user2"],
+                    "loci": [[4, 4], [8, 4]],
+                }
+            ],
+        )
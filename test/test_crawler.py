@@ -0,0 +1,158 @@
+# pyre-strict
+import os
+import tempfile
+import threading
+from typing import Any, List, Optional, Union
+
+from requests import Response
+from unittest import TestCase
+
+from lowerpines.checkpoint import Checkpoint
+from lowerpines.crawler import CrawlProgress, HistoryCrawler
+from lowerpines.endpoints.group import Group, GroupsShowRequest
+from lowerpines.endpoints.message import Message
+from lowerpines.gmi import GMI
+from lowerpines.retry import RetryPolicy
+from lowerpines.transport import LatencyTransport, Transport
+from test.fake_server import FakeGroupMe, FakeTransport
+
+
+class InFlightTransport(Transport):
+    # Records the most requests that were waiting on the inner transport at once
+    def __init__(self, inner: Transport) -> None:
+        self.inner = inner
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Any] = None,  # pyre-ignore
+        headers: Optional[Any] = None,  # pyre-ignore
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Response:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return self.inner.request(method, url, params, headers, data)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class HistoryCrawlerTest(TestCase):
+    def setUp(self) -> None:
+        self.store = FakeGroupMe()
+        self.fake = FakeTransport(self.store)
+        self.transport = InFlightTransport(LatencyTransport(self.fake, 0.005))
+        self.gmi = GMI("crawler_token")
+        self.gmi.client = self.transport
+        self.gmi.retry_policy = RetryPolicy(max_retries=0)
+        self.handled: List[str] = []
+
+    def groups(self, *sizes: int) -> List[Group]:
+        groups = []
+        for size in sizes:
+            group_id = self.store.seed(groups=1, messages_per_group=size)[0]
+            groups.append(GroupsShowRequest(self.gmi, group_id).result)
+        return groups
+
+    def handle(self, group: Group, messages: List[Message]) -> None:
+        self.handled.extend(str(m.message_id) for m in messages)
+
+    def test_crawls_every_group(self) -> None:
+        groups = self.groups(250, 0, 1000, 30, 100, 420)
+        updates: List[int] = []
+        crawler = HistoryCrawler(
+            self.gmi,
+            concurrency=3,
+            on_progress=lambda progress: updates.append(progress.messages),
+        )
+        progress = crawler.crawl(groups, self.handle)
+
+        expected = sorted(
+            str(i) for g in groups for i in self.store.message_ids[g.group_id]
+        )
+        self.assertEqual(sorted(self.handled), expected)
+        self.assertEqual(progress.groups_done, 6)
+        self.assertEqual(progress.messages, 1800)
+        self.assertEqual(progress.pages, 3 + 10 + 1 + 1 + 5)
+        self.assertEqual(updates[-1], 1800)
+        self.assertEqual(self.transport.max_in_flight, 3)
+
+    def test_small_groups_not_held_up(self) -> None:
+        big, *small = self.groups(1000, 100, 100, 100)
+        order: List[str] = []
+        HistoryCrawler(self.gmi, concurrency=2).crawl(
+            [big] + small, lambda group, messages: order.append(group.group_id)
+        )
+        self.assertEqual(order.count(big.group_id), 10)
+        big_pages = [i for i, group_id in enumerate(order) if group_id == big.group_id]
+        for group in small:
+            self.assertLess(order.index(group.group_id), big_pages[3])
+
+    def test_resume_from_checkpoint(self) -> None:
+        groups = self.groups(500, 300, 0)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "crawl.json")
+        pages = 0
+
+        def interrupted(group: Group, messages: List[Message]) -> None:
+            nonlocal pages
+            pages += 1
+            if pages == 4:
+                raise KeyboardInterrupt
+            self.handle(group, messages)
+
+        with self.assertRaises(KeyboardInterrupt):
+            HistoryCrawler(self.gmi, checkpoint=Checkpoint(path)).crawl(
+                groups, interrupted
+            )
+        first_run = list(self.handled)
+        self.assertEqual(len(first_run), 300)
+        self.assertTrue(os.path.exists(path))
+
+        self.handled = []
+        progress = HistoryCrawler(self.gmi, checkpoint=Checkpoint(path)).crawl(
+            groups, self.handle
+        )
+        self.assertEqual(set(first_run) & set(self.handled), set())
+        self.assertEqual(len(first_run) + len(self.handled), 800)
+        self.assertEqual(progress.groups_done, 3)
+
+        # The newest message of each group is recorded for incremental syncs
+        checkpoint = Checkpoint(path)
+        for group in groups[:2]:
+            state = checkpoint.get("group:" + group.group_id)
+            self.assertTrue(state["done"])
+            self.assertEqual(
+                state["last_id"], str(self.store.message_ids[group.group_id][-1])
+            )
+
+        # Finished groups are skipped
+        requests = self.fake.requests
+        self.handled = []
+        HistoryCrawler(self.gmi, checkpoint=Checkpoint(path)).crawl(groups, self.handle)
+        self.assertEqual(self.handled, [])
+        self.assertEqual(self.fake.requests, requests)
+
+    def test_failed_group_reported(self) -> None:
+        groups = self.groups(150)
+        missing = Group.from_json(
+            self.gmi, {"id": "missing", "members": [], "messages": {}}
+        )
+        progress = HistoryCrawler(self.gmi).crawl([missing] + groups, self.handle)
+        self.assertEqual(list(progress.errors), ["missing"])
+        self.assertEqual(progress.groups_done, 1)
+        self.assertEqual(len(self.handled), 150)
+        self.assertIn("groups=1/2", repr(progress))
+
+    def test_progress(self) -> None:
+        progress = CrawlProgress(4)
+        self.assertEqual(progress.messages_per_sec, 0.0)
+        with self.assertRaises(ValueError):
+            HistoryCrawler(self.gmi, concurrency=0)
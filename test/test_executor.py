@@ -0,0 +1,168 @@
+# pyre-strict
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from unittest import TestCase, mock
+
+from requests import Response
+
+from lowerpines.endpoints.group import Group, GroupsShowRequest
+from lowerpines.endpoints.message import MessagesIndexRequest
+from lowerpines.endpoints.request import deferred
+from lowerpines.exceptions import GroupMeApiException
+from lowerpines.executor import SerialExecutor, ThreadedExecutor
+from lowerpines.gmi import GMI
+from lowerpines.group import GroupManager
+
+
+class PlanTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("plan_token")
+        self.urls: List[str] = []
+        patcher = mock.patch(
+            "lowerpines.client.HttpClient.request", side_effect=self.fake_request
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None,
+    ) -> Response:
+        self.urls.append(url)
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            {"response": {"count": 0, "messages": []}}
+        ).encode("utf-8")
+        return response
+
+    def test_plan_is_not_sent(self) -> None:
+        plan = MessagesIndexRequest.plan(self.gmi, "1", before_id="5", limit=100)
+        self.assertFalse(plan.executed)
+        self.assertEqual(self.urls, [])
+        self.assertEqual(
+            plan.key(),
+            (
+                "GET",
+                "https://api.groupme.com/v3/groups/1/messages",
+                '{"before_id": "5", "limit": 100}',
+            ),
+        )
+
+    def test_deferred_block(self) -> None:
+        with deferred():
+            plan = MessagesIndexRequest(self.gmi, "1")
+        self.assertFalse(plan.executed)
+        self.assertEqual(self.urls, [])
+
+    def test_run(self) -> None:
+        plan = MessagesIndexRequest.plan(self.gmi, "1")
+        self.assertEqual(plan.run(), [])
+        self.assertEqual(plan.result, [])
+        self.assertTrue(plan.executed)
+        elapsed = plan.elapsed
+        assert elapsed is not None
+        self.assertGreaterEqual(elapsed, 0)
+
+    def test_immediate_requests_are_timed(self) -> None:
+        self.assertIsNotNone(MessagesIndexRequest(self.gmi, "1").elapsed)
+
+    def test_serial_executor(self) -> None:
+        plans = [MessagesIndexRequest.plan(self.gmi, str(i)) for i in range(3)]
+        self.assertEqual(SerialExecutor().run_all(plans), [[], [], []])
+        self.assertEqual(
+            self.urls,
+            [
+                "https://api.groupme.com/v3/groups/0/messages",
+                "https://api.groupme.com/v3/groups/1/messages",
+                "https://api.groupme.com/v3/groups/2/messages",
+            ],
+        )
+
+
+class ThreadedExecutorTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("bulk_token")
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        patcher = mock.patch(
+            "lowerpines.client.HttpClient.request", side_effect=self.fake_request
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[str] = None,
+    ) -> Response:
+        group_id = url.split("/")[-1]
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later items finish first, results must still come back in input order
+        time.sleep(0.05 / (1 + int(group_id)))
+        with self.lock:
+            self.in_flight -= 1
+        response = Response()
+        if group_id == "3":
+            response.status_code = 400
+            body: Any = {"meta": {"errors": ["not found"]}}
+        else:
+            response.status_code = 200
+            body = {
+                "response": {
+                    "id": group_id,
+                    "name": "G" + group_id,
+                    "members": [],
+                    "messages": {},
+                }
+            }
+        response._content = json.dumps(body).encode("utf-8")
+        return response
+
+    def plans(self, count: int) -> List[Any]:
+        return [GroupsShowRequest.plan(self.gmi, str(i)) for i in range(count)]
+
+    def test_results_in_input_order(self) -> None:
+        results = ThreadedExecutor(4).bulk(self.plans(6))
+        self.assertEqual(
+            [r.result.group_id for r in results if r.result is not None],
+            ["0", "1", "2", "4", "5"],
+        )
+        self.assertFalse(results[3].ok)
+        self.assertIsInstance(results[3].error, GroupMeApiException)
+        with self.assertRaises(GroupMeApiException):
+            results[3].get()
+        self.assertGreater(self.max_in_flight, 1)
+        self.assertLessEqual(self.max_in_flight, 4)
+
+    def test_run_all_raises(self) -> None:
+        with self.assertRaises(GroupMeApiException):
+            ThreadedExecutor(2).run_all(self.plans(4))
+
+    def test_invalid_concurrency(self) -> None:
+        with self.assertRaises(ValueError):
+            ThreadedExecutor(0)
+
+    def test_gmi_bulk(self) -> None:
+        results = self.gmi.bulk(self.plans(3), concurrency=3)
+        self.assertTrue(all(r.ok for r in results))
+
+    def test_refresh_all(self) -> None:
+        groups = [Group(self.gmi) for _ in range(5)]
+        for i, group in enumerate(groups):
+            group.group_id = str(i)
+        results = GroupManager(self.gmi, groups).refresh_all(concurrency=5)
+        self.assertEqual([g.name for g in groups], ["G0", "G1", "G2", None, "G4"])
+        self.assertEqual([r.ok for r in results], [True, True, True, False, True])
@@ -0,0 +1,137 @@
+# pyre-strict
+from unittest import TestCase
+
+from lowerpines.endpoints.bot import BotCreateRequest, BotIndexRequest, BotPostRequest
+from lowerpines.endpoints.chat import (
+    DirectMessageChatsRequest,
+    DirectMessageCreateRequest,
+    DirectMessageIndexRequest,
+)
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.endpoints.leaderboard import LeaderboardMyLikesRequest
+from lowerpines.endpoints.like import LikeCreateRequest
+from lowerpines.endpoints.member import MembersAddRequest, MembersResultsRequest
+from lowerpines.endpoints.message import MessagesCreateRequest, MessagesIndexRequest
+from lowerpines.endpoints.user import UserMeRequest
+from lowerpines.exceptions import (
+    RateLimitedException,
+    ServerErrorException,
+    UnauthorizedException,
+)
+from lowerpines.gmi import GMI
+from lowerpines.retry import RetryPolicy
+from test.fake_server import FakeGroupMe, FakeGroupMeServer
+
+
+class FakeServerTest(TestCase):
+    def setUp(self) -> None:
+        self.store = FakeGroupMe()
+        self.group_id = self.store.seed(groups=1, messages_per_group=250)[0]
+        self.server = FakeGroupMeServer(self.store).start()
+        self.addCleanup(self.server.stop)
+        self.gmi = GMI("fake_server_token")
+        self.gmi.base_url = self.server.base_url
+        self.gmi.retry_policy = RetryPolicy(max_retries=0)
+
+    def message_ids(self, **kwargs: str) -> list:  # pyre-ignore
+        return [
+            m.message_id
+            for m in MessagesIndexRequest(
+                self.gmi, self.group_id, limit=100, **kwargs
+            ).result
+        ]
+
+    def test_base_url_override(self) -> None:
+        request = GroupsShowRequest(self.gmi, self.group_id)
+        self.assertEqual(
+            request.url(), self.server.base_url + "/groups/" + self.group_id
+        )
+        self.assertEqual(request.result.messages.count, 250)
+        self.assertEqual(UserMeRequest(self.gmi).result.user_id, "30038058")
+
+    def test_fixtures_loaded(self) -> None:
+        group = self.gmi.groups.get(group_id="53616101")
+        self.assertEqual(group.messages.count, 3)
+        self.assertEqual(len(group.messages.all()), 3)
+
+    def test_message_cursors(self) -> None:
+        all_ids = [str(i) for i in self.store.message_ids[self.group_id]]
+        recent = self.message_ids()
+        self.assertEqual(recent, all_ids[-100:][::-1])
+        self.assertEqual(
+            self.message_ids(before_id=recent[-1]), all_ids[-200:-100][::-1]
+        )
+        self.assertEqual(self.message_ids(since_id=all_ids[10]), all_ids[-100:][::-1])
+        self.assertEqual(self.message_ids(after_id=all_ids[10]), all_ids[11:111])
+        group = GroupsShowRequest(self.gmi, self.group_id).result
+        self.assertEqual(len(group.messages.all()), 250)
+
+    def test_post_and_like(self) -> None:
+        message = MessagesCreateRequest(self.gmi, self.group_id, "guid", "hi").result
+        message_id = message.message_id
+        assert message_id is not None
+        self.assertEqual(self.message_ids()[0], message_id)
+        LikeCreateRequest(self.gmi, self.group_id, message_id)
+        liked = LeaderboardMyLikesRequest(self.gmi, self.group_id).result
+        self.assertIn(message.message_id, [m.message_id for m in liked])
+
+    def test_bots(self) -> None:
+        bot = BotCreateRequest(self.gmi, self.group_id, "Bot").result
+        self.assertIn(bot.bot_id, [b.bot_id for b in BotIndexRequest(self.gmi).result])
+        BotPostRequest(self.gmi, bot.bot_id, "from a bot")
+        latest = MessagesIndexRequest(self.gmi, self.group_id, limit=1).result[0]
+        self.assertEqual(latest.text, "from a bot")
+        self.assertEqual(latest.sender_type, "bot")
+
+    def test_members(self) -> None:
+        results_id = MembersAddRequest(self.gmi, self.group_id, "New", "123").result
+        added = MembersResultsRequest(self.gmi, self.group_id, results_id).result
+        self.assertEqual([m.user_id for m in added], ["123"])
+        group = GroupsShowRequest(self.gmi, self.group_id).result
+        self.assertIn("123", [m.user_id for m in group.members])
+
+    def test_direct_messages(self) -> None:
+        chats = DirectMessageChatsRequest(self.gmi).result
+        self.assertEqual(len(chats), len(self.store.direct_messages))
+        DirectMessageCreateRequest(self.gmi, "30038058", "51547012", "hello")
+        messages = DirectMessageIndexRequest(self.gmi, "51547012").result
+        self.assertEqual(messages[0].text, "hello")
+
+    def test_unauthorized(self) -> None:
+        self.gmi.access_token = ""
+        with self.assertRaises(UnauthorizedException):
+            UserMeRequest(self.gmi)
+
+
+class FaultInjectionTest(TestCase):
+    def start(self, error_rate: float = 0.0, rate_limit_rate: float = 0.0) -> GMI:
+        server = FakeGroupMeServer(
+            FakeGroupMe(),
+            error_rate=error_rate,
+            rate_limit_rate=rate_limit_rate,
+            retry_after=0,
+            seed=1,
+        )
+        server.start()
+        self.addCleanup(server.stop)
+        self.server = server
+        gmi = GMI("fault_token")
+        gmi.base_url = server.base_url
+        gmi.retry_policy = RetryPolicy(max_retries=0)
+        return gmi
+
+    def test_rate_limited(self) -> None:
+        gmi = self.start(rate_limit_rate=1.0)
+        with self.assertRaises(RateLimitedException):
+            UserMeRequest(gmi)
+        self.assertEqual(self.server.injected_rate_limits, 1)
+
+    def test_server_errors_retried(self) -> None:
+        gmi = self.start(error_rate=1.0)
+        with self.assertRaises(ServerErrorException):
+            UserMeRequest(gmi)
+        self.server.error_rate = 0.5
+        gmi.retry_policy = RetryPolicy(max_retries=10, backoff_base=0, jitter=False)
+        request = UserMeRequest(gmi)
+        self.assertEqual(request.result.user_id, "30038058")
+        self.assertEqual(self.server.injected_errors, 1 + request.retries)
@@ -0,0 +1,113 @@
+# pyre-strict
+from unittest import TestCase
+
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.frame import MessageFrame
+from lowerpines.gmi import GMI
+from lowerpines.retry import RetryPolicy
+from test.fake_server import FakeGroupMe, FakeGroupMeServer
+
+MESSAGES = [
+    {
+        "id": "10",
+        "created_at": 1568593088,
+        "user_id": "1",
+        "name": "One",
+        "sender_type": "user",
+        "text": "café",
+        "system": False,
+        "favorited_by": ["2", "3"],
+    },
+    {
+        "id": "9",
+        "created_at": 1568593087,
+        "user_id": "2",
+        "name": "Two",
+        "sender_type": "user",
+        "text": None,
+        "system": True,
+        "favorited_by": [],
+    },
+    {
+        "id": "8",
+        "created_at": 1568593086,
+        "user_id": "1",
+        "name": "One",
+        "sender_type": "bot",
+        "text": "third",
+        "favorited_by": ["1"],
+    },
+]
+
+
+class MessageFrameTest(TestCase):
+    def setUp(self) -> None:
+        self.frame = MessageFrame()
+        self.frame.extend(MESSAGES)
+
+    def test_columns(self) -> None:
+        frame = self.frame
+        self.assertEqual(len(frame), 3)
+        self.assertEqual(list(frame.message_id), [10, 9, 8])
+        self.assertEqual(list(frame.created_at), [1568593088, 1568593087, 1568593086])
+        self.assertEqual(list(frame.system), [0, 1, 0])
+        self.assertEqual(list(frame.user_id.codes), [0, 1, 0])
+        self.assertEqual(frame.user_id.values, ["1", "2", "3"])
+        self.assertEqual(frame.sender_type.values, ["user", "bot"])
+        self.assertEqual([frame.text(i) for i in range(3)], ["café", "", "third"])
+        self.assertEqual(
+            [frame.favorited_by(i) for i in range(3)], [["2", "3"], [], ["1"]]
+        )
+        self.assertEqual(
+            frame.row(0),
+            {
+                "id": "10",
+                "created_at": 1568593088,
+                "system": False,
+                "user_id": "1",
+                "name": "One",
+                "sender_type": "user",
+                "text": "café",
+                "favorited_by": ["2", "3"],
+            },
+        )
+
+    def test_to_numpy(self) -> None:
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy is not installed")
+        columns = self.frame.to_numpy()
+        self.assertEqual(columns["created_at"].tolist(), list(self.frame.created_at))
+        self.assertEqual(columns["system"].tolist(), [False, True, False])
+        self.assertTrue(
+            numpy.shares_memory(columns["message_id"], self.frame.message_id)
+        )
+        with self.assertRaises(BufferError):
+            self.frame.append(MESSAGES[0])
+
+    def test_to_pandas(self) -> None:
+        try:
+            import pandas  # type: ignore[import-untyped]  # noqa: F401
+        except ImportError:
+            self.skipTest("pandas is not installed")
+        data_frame = self.frame.to_pandas()
+        self.assertEqual(list(data_frame["user_id"]), ["1", "2", "1"])
+        self.assertEqual(list(data_frame["text"]), ["café", "", "third"])
+        self.assertEqual(list(data_frame["favorite_count"]), [2, 0, 1])
+
+
+class GroupMessagesFrameTest(TestCase):
+    def test_whole_history(self) -> None:
+        store = FakeGroupMe()
+        group_id = store.seed(groups=1, messages_per_group=250)[0]
+        with FakeGroupMeServer(store) as server:
+            gmi = GMI("frame_token")
+            gmi.base_url = server.base_url
+            gmi.retry_policy = RetryPolicy(max_retries=0)
+            frame = GroupsShowRequest(gmi, group_id).result.messages.frame()
+        self.assertEqual(len(frame), 250)
+        self.assertEqual(
+            [str(i) for i in reversed(frame.message_id)],
+            [str(i) for i in store.message_ids[group_id]],
+        )
@@ -0,0 +1,130 @@
+# pyre-strict
+import time
+from typing import List, Optional
+from unittest import TestCase
+
+from lowerpines.endpoints.chat import DirectMessageChatsRequest
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.endpoints.request import JsonType, deferred
+from lowerpines.exceptions import UnauthorizedException
+from lowerpines.gmi import GMI
+from lowerpines.history import MessageIterator
+from lowerpines.retry import RetryPolicy
+from test.fake_server import FakeGroupMe, FakeGroupMeServer, FakeTransport
+
+
+class HistoryIteratorTest(TestCase):
+    def setUp(self) -> None:
+        self.store = FakeGroupMe()
+        group_id = self.store.seed(groups=1, messages_per_group=250)[0]
+        self.server = FakeGroupMeServer(self.store).start()
+        self.addCleanup(self.server.stop)
+        self.gmi = GMI("history_token")
+        self.gmi.base_url = self.server.base_url
+        self.gmi.retry_policy = RetryPolicy(max_retries=0)
+        self.messages = GroupsShowRequest(self.gmi, group_id).result.messages
+        self.ids = [str(i) for i in self.store.message_ids[group_id]]
+
+    def test_iter_all(self) -> None:
+        iterator = self.messages.iter_all()
+        self.assertEqual([m.message_id for m in iterator], self.ids[::-1])
+        # 3 pages and the empty page that ends the history
+        self.assertEqual(iterator.pages, 4)
+        self.assertEqual(list(iterator), [])
+
+    def test_break_and_resume(self) -> None:
+        requests = self.server.requests
+        iterator = self.messages.iter_all()
+        for i, message in enumerate(iterator):
+            if i == 149:
+                break
+        self.assertEqual(self.server.requests - requests, 2)
+        self.assertEqual(iterator.cursor, self.ids[-150])
+
+        rest = self.messages.iter_before(iterator.cursor)
+        self.assertEqual([m.message_id for m in rest], self.ids[:-150][::-1])
+
+    def test_iter_since(self) -> None:
+        iterator = self.messages.iter_since(self.ids[9])
+        self.assertEqual([m.message_id for m in iterator], self.ids[10:])
+        self.assertEqual(iterator.cursor, self.ids[-1])
+
+    def test_deferred(self) -> None:
+        # Paging sends its own requests, deferred() only holds back the ones it creates
+        with deferred():
+            self.assertEqual(len(list(self.messages.iter_all())), 250)
+            self.assertEqual(len(self.messages.frame()), 250)
+
+
+class ChatHistoryIteratorTest(TestCase):
+    def test_iterators(self) -> None:
+        store = FakeGroupMe()
+        with FakeGroupMeServer(store) as server:
+            gmi = GMI("history_token")
+            gmi.base_url = server.base_url
+            gmi.retry_policy = RetryPolicy(max_retries=0)
+            first = store.direct_messages["51547012"][0]
+            for i in range(1, 45):
+                message = dict(first, id=str(int(first["id"]) + i), text=str(i))
+                store.add_direct_message("51547012", message)
+            chat = [
+                c
+                for c in DirectMessageChatsRequest(gmi).result
+                if c.other_user.user_id == "51547012"
+            ][0]
+            ids = [m["id"] for m in store.direct_messages["51547012"]][::-1]
+
+            self.assertEqual(
+                [m.direct_message_id for m in chat.messages.iter_all()], ids
+            )
+
+            since = [m.direct_message_id for m in chat.messages.iter_since(ids[30])]
+            self.assertEqual(since, ids[:30])
+            resumed = chat.messages.iter_since(ids[30], before_id=ids[9])
+            self.assertEqual([m.direct_message_id for m in resumed], ids[10:30])
+            with deferred():
+                self.assertEqual(len(list(chat.messages.iter_all())), len(ids))
+
+
+class PrefetchTest(TestCase):
+    def setUp(self) -> None:
+        self.store = FakeGroupMe()
+        group_id = self.store.seed(groups=1, messages_per_group=1000)[0]
+        self.transport = FakeTransport(self.store)
+        self.gmi = GMI("history_token")
+        self.gmi.client = self.transport
+        self.gmi.retry_policy = RetryPolicy(max_retries=0)
+        self.messages = GroupsShowRequest(self.gmi, group_id).result.messages
+        self.ids = [str(i) for i in self.store.message_ids[group_id]]
+
+    def test_same_messages(self) -> None:
+        for prefetch in [1, 3]:
+            iterator = self.messages.iter_all(prefetch=prefetch)
+            self.assertEqual([m.message_id for m in iterator], self.ids[::-1])
+            self.assertEqual(iterator.pages, 11)
+        since = self.messages.iter_since(self.ids[99], prefetch=2)
+        self.assertEqual([m.message_id for m in since], self.ids[100:])
+
+    def test_close_stops_prefetching(self) -> None:
+        requests = self.transport.requests
+        with self.messages.iter_all(prefetch=2) as iterator:
+            next(iterator)
+            time.sleep(0.2)
+        time.sleep(0.2)
+        # The page being consumed, 2 waiting pages and one blocked on the full queue
+        self.assertEqual(self.transport.requests - requests, 4)
+
+    def test_errors_raised_in_order(self) -> None:
+        def fetch_page(cursor: Optional[str]) -> List[JsonType]:
+            start = 0 if cursor is None else int(cursor) + 1
+            if start >= 20:
+                raise UnauthorizedException()
+            return [{"id": str(i)} for i in range(start, start + 10)]
+
+        iterator = MessageIterator(fetch_page, lambda j: j["id"], prefetch=2)
+        # Pages fetched before the error are still delivered
+        self.assertEqual(next(iterator), "0")
+        time.sleep(0.1)
+        self.assertEqual(len([next(iterator) for _ in range(19)]), 19)
+        with self.assertRaises(UnauthorizedException):
+            next(iterator)
@@ -0,0 +1,71 @@
+# pyre-strict
+import gc
+from unittest import TestCase
+
+from lowerpines.endpoints.bot import Bot
+from lowerpines.endpoints.group import Group
+from lowerpines.endpoints.member import Member
+from lowerpines.endpoints.message import Message
+from lowerpines.gmi import GMI
+from lowerpines.endpoints.request import JsonType
+from lowerpines.identity import IdentityMap
+
+
+def group_json(group_id: str, name: str = "group") -> JsonType:
+    return {"id": group_id, "name": name, "members": [], "messages": {}}
+
+
+class IdentityMapTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("identity_token")
+        self.identity_map = IdentityMap()
+        self.gmi.identity_map = self.identity_map
+
+    def test_same_object_updated_in_place(self) -> None:
+        group = Group.from_json(self.gmi, group_json("1", "old"))
+        again = Group.from_json(self.gmi, group_json("1", "new"))
+        self.assertIs(group, again)
+        self.assertEqual(group.name, "new")
+        self.assertEqual(self.identity_map.hits, 1)
+
+        other = Group.from_json(self.gmi, group_json("2", "other"))
+        self.assertIsNot(other, group)
+        self.assertEqual(len(self.identity_map), 2)
+
+    def test_keyed_by_class(self) -> None:
+        message = Message.from_json(self.gmi, {"id": "1", "text": "old"})
+        bot = Bot.from_json(self.gmi, {"bot_id": "1"})
+        member = Member.from_json(self.gmi, {"id": "1"}, "group_id")
+        self.assertEqual(len({id(message), id(bot), id(member)}), 3)
+
+        self.assertEqual(message.complex_text.get_text(), "old")
+        message_again = Message.from_json(self.gmi, {"id": "1", "text": "new"})
+        self.assertIs(message_again, message)
+        self.assertEqual(message.complex_text.get_text(), "new")
+        bot_again = Bot.from_json(self.gmi, {"bot_id": "1"})
+        self.assertIs(bot_again, bot)
+        member_again = Member.from_json(self.gmi, {"id": "1"}, "group_id")
+        self.assertIs(member_again, member)
+
+    def test_weak_references(self) -> None:
+        Group.from_json(self.gmi, group_json("1", "dropped"))
+        gc.collect()
+        self.assertEqual(len(self.identity_map), 0)
+
+    def test_objects_without_id(self) -> None:
+        first = Message.from_json(self.gmi, {"text": "no id"})
+        second = Message.from_json(self.gmi, {"text": "no id"})
+        self.assertIsNot(second, first)
+        self.assertEqual(len(self.identity_map), 0)
+
+    def test_disabled_by_default(self) -> None:
+        gmi = GMI("identity_token")
+        first = Group.from_json(gmi, group_json("1"))
+        second = Group.from_json(gmi, group_json("1"))
+        self.assertIsNot(first, second)
+
+    def test_cleared_on_refresh(self) -> None:
+        group = Group.from_json(self.gmi, group_json("1"))
+        self.gmi.refresh()
+        fresh = Group.from_json(self.gmi, group_json("1"))
+        self.assertIsNot(fresh, group)
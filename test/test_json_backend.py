@@ -0,0 +1,46 @@
+# pyre-strict
+from unittest import TestCase
+
+from requests import Response
+
+from lowerpines import json_backend
+from lowerpines.endpoints.bot import BotIndexRequest
+from lowerpines.gmi import GMI
+
+
+class JsonBackendTest(TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(json_backend.set_backend, json_backend.get_backend())
+
+    def test_backends_agree(self) -> None:
+        payload = (
+            b'{"response": {"id": "1", "count": 2, "text": "\\u00e9", "ok": true}}'
+        )
+        expected = {"response": {"id": "1", "count": 2, "text": "é", "ok": True}}
+        for name in json_backend.PREFERRED_BACKENDS:
+            with self.subTest(backend=name):
+                try:
+                    json_backend.set_backend(name)
+                except ImportError:
+                    self.skipTest(name + " is not installed")
+                self.assertEqual(json_backend.get_backend(), name)
+                self.assertEqual(json_backend.loads(payload), expected)
+                with self.assertRaises(ValueError):
+                    json_backend.loads(b"<html>")
+
+    def test_unknown_backend(self) -> None:
+        with self.assertRaises(ValueError):
+            json_backend.set_backend("pickle")
+
+    def test_auto_select(self) -> None:
+        self.assertIn(json_backend.set_backend(), json_backend.PREFERRED_BACKENDS)
+
+
+class ResponseDecodeTest(TestCase):
+    def test_blank_body(self) -> None:
+        request = BotIndexRequest.plan(GMI("decode_token"))
+        for body in [b"", b" \n"]:
+            response = Response()
+            response.status_code = 200
+            response._content = body
+            self.assertIsNone(request.handle_response(response))
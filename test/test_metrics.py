@@ -0,0 +1,110 @@
+# pyre-strict
+from typing import Any, List
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from requests import Response
+
+from lowerpines.async_gmi import AsyncGMI
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.exceptions import GroupMeApiException
+from lowerpines.gmi import GMI
+from lowerpines.metrics import Histogram, MetricsRegistry, RequestEvent
+from lowerpines.retry import RetryPolicy
+from test.responses import GROUP_BODY, json_response
+
+
+class HistogramTest(TestCase):
+    def test_cumulative(self) -> None:
+        histogram = Histogram([1, 0.5])
+        for value in [0.1, 0.7, 3]:
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [("0.5", 1), ("1", 2), ("+Inf", 3)])
+        self.assertAlmostEqual(histogram.sum, 3.8)
+
+
+class HooksTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("metrics_token")
+        self.gmi.retry_policy = RetryPolicy(backoff_base=0, jitter=False)
+        self.events: List[RequestEvent] = []
+        self.registry = MetricsRegistry()
+        self.gmi.hooks.extend([self.events.append, self.registry])
+
+    def test_success_event(self) -> None:
+        responses = [json_response(503, {}), json_response(200, GROUP_BODY)]
+        with mock.patch("lowerpines.client.HttpClient.request", side_effect=responses):
+            GroupsShowRequest(self.gmi, "1")
+        event = self.events[0]
+        self.assertEqual(event.endpoint, "GroupsShowRequest")
+        self.assertEqual(event.mode, "GET")
+        self.assertEqual(event.status, 200)
+        self.assertEqual(event.retries, 1)
+        self.assertIsNone(event.error)
+        self.assertGreater(event.response_bytes, 0)
+        self.assertGreaterEqual(
+            event.elapsed, event.network + event.decode + event.parse
+        )
+
+    def test_error_event(self) -> None:
+        response = json_response(400, {"meta": {"errors": ["bad"]}})
+        with mock.patch("lowerpines.client.HttpClient.request", return_value=response):
+            with self.assertRaises(GroupMeApiException):
+                GroupsShowRequest(self.gmi, "1")
+        self.assertIsInstance(self.events[0].error, GroupMeApiException)
+        self.assertEqual(self.events[0].status, 400)
+
+    def test_hook_errors_not_raised(self) -> None:
+        def broken(event: RequestEvent) -> None:
+            raise RuntimeError("broken hook")
+
+        self.gmi.hooks.insert(0, broken)
+        ok = json_response(200, GROUP_BODY)
+        with mock.patch("lowerpines.client.HttpClient.request", return_value=ok):
+            with self.assertLogs("lowerpines.endpoints.request", "ERROR") as logs:
+                self.assertEqual(GroupsShowRequest(self.gmi, "1").result.name, "G")
+        self.assertIn("broken hook", logs.output[0])
+        # The hooks after the broken one still run
+        self.assertEqual(len(self.events), 1)
+
+        error = json_response(400, {"meta": {"errors": ["bad"]}})
+        with mock.patch("lowerpines.client.HttpClient.request", return_value=error):
+            with self.assertLogs("lowerpines.endpoints.request", "ERROR"):
+                with self.assertRaises(GroupMeApiException):
+                    GroupsShowRequest(self.gmi, "1")
+
+    def test_prometheus_export(self) -> None:
+        ok = json_response(200, GROUP_BODY)
+        with mock.patch("lowerpines.client.HttpClient.request", return_value=ok):
+            GroupsShowRequest(self.gmi, "1")
+            GroupsShowRequest(self.gmi, "2")
+        text = self.registry.export_prometheus()
+        self.assertIn("# TYPE lowerpines_request_duration_seconds histogram", text)
+        self.assertIn(
+            'lowerpines_requests_total{endpoint="GroupsShowRequest",mode="GET",status="200"} 2',
+            text,
+        )
+        self.assertIn(
+            'lowerpines_request_duration_seconds_count{endpoint="GroupsShowRequest",phase="network"} 2',
+            text,
+        )
+        self.assertIn(
+            'lowerpines_response_bytes_bucket{endpoint="GroupsShowRequest",le="+Inf"} 2',
+            text,
+        )
+        self.registry.clear()
+        self.assertNotIn("GroupsShowRequest", self.registry.export_prometheus())
+
+
+class AsyncHooksTest(IsolatedAsyncioTestCase):
+    async def test_async_event(self) -> None:
+        gmi = AsyncGMI("async_metrics_token")
+        events: List[RequestEvent] = []
+        gmi.gmi.hooks.append(events.append)
+
+        async def fake_request(*args: Any, **kwargs: Any) -> Response:
+            return json_response(200, GROUP_BODY)
+
+        with mock.patch.object(gmi.client, "request", side_effect=fake_request):
+            await gmi.groups.show("1")
+        self.assertEqual([e.endpoint for e in events], ["GroupsShowRequest"])
+        self.assertEqual(events[0].status, 200)
@@ -0,0 +1,106 @@
+# pyre-strict
+import json
+import threading
+import time
+from typing import Any, List
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from requests import Response
+
+from lowerpines.endpoints.bot import BotIndexRequest, BotPostRequest
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.endpoints.message import MessagesIndexRequest
+from lowerpines.endpoints.request import Request
+from lowerpines.gmi import GMI
+from lowerpines.ratelimit import Priority, RateLimiter, TokenBucket
+
+
+class TokenBucketTest(TestCase):
+    def test_burst_then_wait(self) -> None:
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.take(), 0)
+        self.assertEqual(bucket.take(), 0)
+        self.assertAlmostEqual(bucket.take(), 0.1, delta=0.01)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0, burst=1)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+
+class RateLimiterTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("ratelimit_token")
+
+    def test_default_priorities(self) -> None:
+        limiter = RateLimiter(rate=1)
+        self.assertEqual(
+            limiter.priority_for(BotPostRequest.plan(self.gmi, "b", "t")),
+            Priority.HIGH,
+        )
+        self.assertEqual(
+            limiter.priority_for(MessagesIndexRequest.plan(self.gmi, "1")),
+            Priority.LOW,
+        )
+        self.assertEqual(
+            limiter.priority_for(GroupsShowRequest.plan(self.gmi, "1")),
+            Priority.NORMAL,
+        )
+
+    def test_configured_priorities(self) -> None:
+        limiter = RateLimiter(
+            rate=1, priorities={Request: Priority.LOW, BotIndexRequest: Priority.HIGH}
+        )
+        self.assertEqual(
+            limiter.priority_for(BotIndexRequest.plan(self.gmi)), Priority.HIGH
+        )
+        self.assertEqual(
+            limiter.priority_for(BotPostRequest.plan(self.gmi, "b", "t")),
+            Priority.LOW,
+        )
+
+    def test_high_priority_goes_first(self) -> None:
+        limiter = RateLimiter(rate=20)
+        limiter.bucket.tokens = 0
+        order: List[str] = []
+
+        def acquire(request: Request[Any], label: str) -> None:
+            limiter.acquire(request)
+            order.append(label)
+
+        threads = []
+        for i in range(3):
+            crawl = MessagesIndexRequest.plan(self.gmi, str(i))
+            threads.append(threading.Thread(target=acquire, args=(crawl, "crawl")))
+        reply = BotPostRequest.plan(self.gmi, "b", "t")
+        threads.append(threading.Thread(target=acquire, args=(reply, "reply")))
+        for thread in threads:
+            thread.start()
+            time.sleep(0.005)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ["reply", "crawl", "crawl", "crawl"])
+        self.assertEqual(limiter.waiting, 0)
+
+    def test_applied_to_requests(self) -> None:
+        limiter = RateLimiter(rate=1000, burst=5)
+        self.gmi.rate_limiter = limiter
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps({"response": []}).encode("utf-8")
+        with mock.patch("lowerpines.client.HttpClient.request", return_value=response):
+            for _ in range(3):
+                BotIndexRequest(self.gmi)
+        self.assertLess(limiter.bucket.tokens, 3)
+
+
+class AsyncRateLimiterTest(IsolatedAsyncioTestCase):
+    async def test_acquire_async(self) -> None:
+        limiter = RateLimiter(rate=50)
+        limiter.bucket.tokens = 0
+        request = GroupsShowRequest.plan(GMI("async_ratelimit_token"), "1")
+        start = time.monotonic()
+        await limiter.acquire_async(request)
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+        self.assertEqual(limiter.waiting, 0)
@@ -0,0 +1,203 @@
+# pyre-strict
+from typing import Any, List
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+import requests
+from requests import Response
+
+from lowerpines.async_gmi import AsyncGMI
+from lowerpines.endpoints.bot import BotPostRequest
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.endpoints.message import MessagesCreateRequest, SOURCE_GUID_WINDOW
+from lowerpines.exceptions import (
+    GroupMeApiException,
+    RateLimitedException,
+    ServerErrorException,
+)
+from lowerpines.gmi import GMI
+from lowerpines.retry import RetryPolicy, parse_retry_after
+from test.responses import GROUP_BODY, json_response
+
+
+class RetryPolicyTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("retry_policy_token")
+        self.get = GroupsShowRequest.plan(self.gmi, "1")
+        self.post = BotPostRequest.plan(self.gmi, "bot", "hi")
+
+    def test_backoff_is_capped(self) -> None:
+        policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=False)
+        self.assertEqual([policy.backoff(i) for i in range(5)], [1, 2, 4, 5, 5])
+
+    def test_jitter_within_ceiling(self) -> None:
+        policy = RetryPolicy(backoff_base=1)
+        for attempt in range(5):
+            self.assertLessEqual(policy.backoff(attempt), 2**attempt)
+
+    def test_idempotency(self) -> None:
+        policy = RetryPolicy()
+        server_error = json_response(503)
+        self.assertTrue(policy.is_retryable(self.get, server_error))
+        self.assertFalse(policy.is_retryable(self.post, server_error))
+        self.assertTrue(policy.is_retryable(self.post, json_response(429)))
+        self.assertFalse(policy.is_retryable(self.get, json_response(404)))
+        reset = requests.ConnectionError()
+        self.assertTrue(policy.is_retryable(self.get, error=reset))
+        self.assertFalse(policy.is_retryable(self.post, error=reset))
+        self.assertTrue(policy.is_retryable(self.post, error=requests.ConnectTimeout()))
+        create = MessagesCreateRequest.plan(self.gmi, "1", "guid", "hi")
+        self.assertTrue(policy.is_retryable(create, server_error))
+        # GroupMe can only tell a retry is a duplicate by its source_guid
+        unguarded = MessagesCreateRequest.plan(self.gmi, "1", "", "hi")
+        self.assertFalse(policy.is_retryable(unguarded, server_error))
+
+    def test_retry_window(self) -> None:
+        policy = RetryPolicy(backoff_base=1, jitter=False)
+        create = MessagesCreateRequest.plan(self.gmi, "1", "guid", "hi")
+        server_error = json_response(503)
+        self.assertEqual(policy.next_delay(create, 0, 0, server_error, elapsed=1), 1)
+        # A retry after the window could post the message a second time
+        self.assertIsNone(
+            policy.next_delay(
+                create, 0, 0, server_error, elapsed=SOURCE_GUID_WINDOW - 0.5
+            )
+        )
+        # Other requests have no window
+        self.assertEqual(
+            policy.next_delay(self.get, 0, 0, server_error, elapsed=3600), 1
+        )
+
+    def test_retry_after(self) -> None:
+        self.assertEqual(
+            parse_retry_after(json_response(429, headers={"Retry-After": "7"})), 7
+        )
+        self.assertIsNone(parse_retry_after(json_response(429)))
+        self.assertIsNone(
+            parse_retry_after(json_response(429, headers={"Retry-After": "soon"}))
+        )
+        past = json_response(
+            429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+        self.assertEqual(parse_retry_after(past), 0)
+        policy = RetryPolicy(backoff_base=1, jitter=False)
+        delay = policy.next_delay(
+            self.get, 0, 0, response=json_response(429, headers={"Retry-After": "3"})
+        )
+        self.assertEqual(delay, 3)
+
+    def test_total_delay_budget(self) -> None:
+        policy = RetryPolicy(
+            max_retries=10, backoff_base=4, jitter=False, max_total_delay=10
+        )
+        self.assertEqual(policy.next_delay(self.get, 0, 0, json_response(503)), 4)
+        self.assertIsNone(policy.next_delay(self.get, 1, 4, json_response(503)))
+        self.assertEqual(policy.stats.retries, {"GroupsShowRequest": 1})
+        self.assertEqual(policy.stats.exhausted, {"GroupsShowRequest": 1})
+
+
+class RetryExecuteTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("retry_token")
+        self.gmi.retry_policy = RetryPolicy(
+            max_retries=2, backoff_base=0.5, jitter=False
+        )
+        self.responses: List[Any] = []  # pyre-ignore
+        patcher = mock.patch(
+            "lowerpines.client.HttpClient.request", side_effect=self.fake_request
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sleep_patcher = mock.patch("lowerpines.endpoints.request.time.sleep")
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def fake_request(self, *args: Any, **kwargs: Any) -> Response:
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def test_recovers_from_transient_errors(self) -> None:
+        self.responses = [
+            requests.ConnectionError(),
+            json_response(502),
+            json_response(200, GROUP_BODY),
+        ]
+        request = GroupsShowRequest(self.gmi, "1")
+        self.assertEqual(request.result.name, "G")
+        self.assertEqual(request.retries, 2)
+        self.assertEqual(self.sleep.call_args_list, [mock.call(0.5), mock.call(1.0)])
+        self.assertEqual(self.gmi.retry_policy.stats.total_retries, 2)
+
+    def test_gives_up(self) -> None:
+        self.responses = [json_response(429)] * 3
+        with self.assertRaises(RateLimitedException):
+            GroupsShowRequest(self.gmi, "1")
+        self.assertEqual(self.responses, [])
+
+    def test_duplicate_after_lost_response(self) -> None:
+        # The first attempt was posted, but the connection dropped before the response
+        posted = {"id": "5", "source_guid": "guid", "text": "hi", "attachments": []}
+        other = dict(posted, id="4", source_guid="other")
+        duplicate = {"meta": {"code": 409, "errors": ["duplicate source_guid"]}}
+        self.responses = [
+            requests.ConnectionError(),
+            json_response(409, duplicate),
+            json_response(200, {"response": {"count": 2, "messages": [posted, other]}}),
+        ]
+        request = MessagesCreateRequest(self.gmi, "1", "guid", "hi")
+        self.assertEqual(request.result.message_id, "5")
+        self.assertEqual(request.retries, 1)
+
+        # Without a retry a 409 is a real error
+        self.responses = [json_response(409, duplicate)]
+        with self.assertRaises(GroupMeApiException):
+            MessagesCreateRequest(self.gmi, "1", "guid", "hi")
+
+    def test_unsafe_post_not_retried(self) -> None:
+        self.responses = [json_response(500)]
+        with self.assertRaises(ServerErrorException):
+            BotPostRequest(self.gmi, "bot", "hi")
+        self.sleep.assert_not_called()
+
+    def test_unsafe_post_connection_error(self) -> None:
+        self.responses = [requests.ConnectionError()]
+        with self.assertRaises(requests.ConnectionError):
+            BotPostRequest(self.gmi, "bot", "hi")
+
+
+class AsyncRetryTest(IsolatedAsyncioTestCase):
+    async def test_retries_without_blocking(self) -> None:
+        gmi = AsyncGMI("async_retry_token")
+        gmi.gmi.retry_policy = RetryPolicy(backoff_base=0, jitter=False)
+        responses = [json_response(503), json_response(200, GROUP_BODY)]
+
+        async def fake_request(*args: Any, **kwargs: Any) -> Response:
+            return responses.pop(0)
+
+        with mock.patch.object(gmi.client, "request", side_effect=fake_request):
+            group = await gmi.groups.show("1")
+        self.assertEqual(group.name, "G")
+        self.assertEqual(gmi.gmi.retry_policy.stats.retries, {"GroupsShowRequest": 1})
+
+    async def test_duplicate_after_lost_response(self) -> None:
+        # The posted message is looked up through the AsyncGMI as well
+        gmi = AsyncGMI("async_retry_token")
+        gmi.gmi.retry_policy = RetryPolicy(backoff_base=0, jitter=False)
+        posted = {"id": "5", "source_guid": "guid", "text": "hi", "attachments": []}
+        responses: List[Any] = [  # pyre-ignore
+            requests.ConnectionError(),
+            json_response(409, {"meta": {"code": 409, "errors": ["duplicate"]}}),
+            json_response(200, {"response": {"count": 1, "messages": [posted]}}),
+        ]
+
+        async def fake_request(*args: Any, **kwargs: Any) -> Response:
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        with mock.patch.object(gmi.client, "request", side_effect=fake_request):
+            message = await gmi.request(MessagesCreateRequest, "1", "guid", "hi")
+        self.assertEqual(message.message_id, "5")
+        self.assertEqual(responses, [])
@@ -0,0 +1,168 @@
+# pyre-strict
+import asyncio
+import json
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, List
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from requests import Response
+
+from lowerpines.async_gmi import AsyncGMI
+from lowerpines.endpoints.chat import (
+    DirectMessage,
+    DirectMessageIndexJsonRequest,
+    DirectMessageIndexRequest,
+)
+from lowerpines.endpoints.group import Group, GroupsShowRequest
+from lowerpines.endpoints.message import (
+    Message,
+    MessagesIndexJsonRequest,
+    MessagesIndexRequest,
+)
+from lowerpines.exceptions import GroupMeApiException
+from lowerpines.gmi import GMI
+from lowerpines.metrics import MetricsRegistry
+from lowerpines.singleflight import SingleFlight
+
+
+def group_response(url: str) -> Response:
+    group_id = url.split("/")[-1]
+    response = Response()
+    body: Any  # pyre-ignore
+    if group_id == "messages":
+        response.status_code = 200
+        message = {"id": "10", "text": "hi", "attachments": []}
+        body = {"response": {"count": 1, "messages": [message]}}
+    elif group_id == "direct_messages":
+        response.status_code = 200
+        message = {"id": "10", "text": "hi", "attachments": []}
+        body = {"response": {"count": 1, "direct_messages": [message]}}
+    elif group_id == "missing":
+        response.status_code = 400
+        body = {"meta": {"errors": ["not found"]}}
+    else:
+        response.status_code = 200
+        body = {"response": {"id": group_id, "members": [], "messages": {}}}
+    response._content = json.dumps(body).encode("utf-8")
+    return response
+
+
+class SingleFlightTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("singleflight_token")
+        self.singleflight = SingleFlight()
+        self.gmi.singleflight = self.singleflight
+        self.registry = MetricsRegistry()
+        self.gmi.hooks.append(self.registry)
+        self.urls: List[str] = []
+        patcher = mock.patch(
+            "lowerpines.client.HttpClient.request", side_effect=self.fake_request
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_request(self, method: str, url: str, **kwargs: Any) -> Response:
+        self.urls.append(url)
+        time.sleep(0.05)
+        return group_response(url)
+
+    def fetch_concurrently(self, group_ids: List[str]) -> List[Any]:
+        return self.run_concurrently(
+            [partial(self.fetch_group, group_id) for group_id in group_ids]
+        )
+
+    def fetch_group(self, group_id: str) -> Group:
+        return GroupsShowRequest(self.gmi, group_id).result
+
+    def run_concurrently(self, funcs: List[Callable[[], Any]]) -> List[Any]:
+        barrier = threading.Barrier(len(funcs))
+        results: List[Any] = [None] * len(funcs)
+
+        def fetch(i: int) -> None:
+            barrier.wait()
+            try:
+                results[i] = funcs[i]()
+            except GroupMeApiException as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(len(funcs))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_requests_coalesced(self) -> None:
+        groups = self.fetch_concurrently(["1"] * 8)
+        self.assertEqual(len(self.urls), 1)
+        self.assertTrue(all(group is groups[0] for group in groups))
+        self.assertIsInstance(groups[0], Group)
+        self.assertEqual(self.singleflight.shared, 7)
+        self.assertEqual(self.singleflight.in_flight, 0)
+        self.assertIn(
+            'lowerpines_request_coalesced_total{endpoint="GroupsShowRequest"} 7',
+            self.registry.export_prometheus(),
+        )
+
+    def test_distinct_requests_not_coalesced(self) -> None:
+        self.fetch_concurrently(["1", "2", "1", "2"])
+        self.assertEqual(
+            sorted(self.urls),
+            [
+                "https://api.groupme.com/v3/groups/1",
+                "https://api.groupme.com/v3/groups/2",
+            ],
+        )
+
+    def test_error_shared(self) -> None:
+        results = self.fetch_concurrently(["missing"] * 4)
+        self.assertEqual(len(self.urls), 1)
+        self.assertTrue(all(isinstance(r, GroupMeApiException) for r in results))
+
+    def test_parsed_differently_not_coalesced(self) -> None:
+        # Same URL and arguments, but one returns Messages and the other the JSON
+        messages, messages_json = self.run_concurrently(
+            [
+                lambda: MessagesIndexRequest(self.gmi, "1", limit=100).result,
+                lambda: MessagesIndexJsonRequest(self.gmi, "1", limit=100).result,
+            ]
+        )
+        self.assertEqual(len(self.urls), 2)
+        self.assertIsInstance(messages[0], Message)
+        self.assertEqual(messages_json[0]["id"], "10")
+
+    def test_direct_messages_parsed_differently_not_coalesced(self) -> None:
+        messages, messages_json = self.run_concurrently(
+            [
+                lambda: DirectMessageIndexRequest(self.gmi, "2").result,
+                lambda: DirectMessageIndexJsonRequest(self.gmi, "2").result,
+            ]
+        )
+        self.assertEqual(len(self.urls), 2)
+        self.assertIsInstance(messages[0], DirectMessage)
+        self.assertEqual(messages_json[0]["id"], "10")
+
+    def test_disabled_per_endpoint(self) -> None:
+        with mock.patch.object(GroupsShowRequest, "coalesce", False):
+            self.fetch_concurrently(["1"] * 3)
+        self.assertEqual(len(self.urls), 3)
+
+
+class AsyncSingleFlightTest(IsolatedAsyncioTestCase):
+    async def test_gather_coalesced(self) -> None:
+        gmi = AsyncGMI("async_singleflight_token")
+        gmi.gmi.singleflight = SingleFlight()
+        calls: List[str] = []
+
+        async def fake_request(method: str, url: str, **kwargs: Any) -> Response:
+            calls.append(url)
+            await asyncio.sleep(0.02)
+            return group_response(url)
+
+        with mock.patch.object(gmi.client, "request", side_effect=fake_request):
+            groups = await asyncio.gather(*[gmi.groups.show("1") for _ in range(5)])
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(group is groups[0] for group in groups))
+        self.assertEqual(gmi.gmi.singleflight.in_flight, 0)
@@ -0,0 +1,185 @@
+# pyre-strict
+import os
+import tempfile
+from typing import Dict, List, Optional
+from unittest import TestCase
+
+from lowerpines.checkpoint import Checkpoint
+from lowerpines.crawler import HistoryCrawler
+from lowerpines.endpoints.chat import Chat, DirectMessage
+from lowerpines.endpoints.group import Group, GroupsShowRequest
+from lowerpines.endpoints.message import Message
+from lowerpines.gmi import GMI
+from lowerpines.retry import RetryPolicy
+from lowerpines.sync import SyncEngine
+from test.fake_server import FakeGroupMe, FakeTransport
+
+
+class SyncEngineTest(TestCase):
+    def setUp(self) -> None:
+        self.store = FakeGroupMe()
+        self.group_ids = self.store.seed(groups=5, messages_per_group=120)
+        self.transport = FakeTransport(self.store)
+        self.gmi = GMI("sync_token")
+        self.gmi.client = self.transport
+        self.gmi.retry_policy = RetryPolicy(max_retries=0)
+        self.handled: Dict[str, List[Optional[str]]] = {}
+
+    def with_messages(self) -> List[str]:
+        return [g for g in self.store.groups if self.store.message_ids.get(g)]
+
+    def post(self, group_id: str, count: int) -> List[str]:
+        sender = self.store.groups[group_id]["members"][0]
+        ids = []
+        for i in range(count):
+            message = self.store._new_message(group_id, sender, "New " + str(i))
+            self.store.add_message(message)
+            ids.append(message["id"])
+        return ids
+
+    def send_direct(self, other_user_id: str, count: int) -> List[str]:
+        self.store.chat_users.setdefault(
+            other_user_id,
+            {"id": other_user_id, "name": other_user_id, "avatar_url": None},
+        )
+        ids = []
+        for i in range(count):
+            message_id = self.store._new_id()
+            self.store.add_direct_message(
+                other_user_id,
+                {
+                    "id": message_id,
+                    "conversation_id": other_user_id + "+1",
+                    "created_at": self.store._tick(),
+                    "recipient_id": "1",
+                    "sender_id": other_user_id,
+                    "user_id": other_user_id,
+                    "sender_type": "user",
+                    "name": other_user_id,
+                    "avatar_url": None,
+                    "source_guid": "guid-" + message_id,
+                    "text": "Direct " + str(i),
+                    "attachments": [],
+                    "favorited_by": [],
+                },
+            )
+            ids.append(message_id)
+        return ids
+
+    def handle_group(self, group: Group, messages: List[Message]) -> None:
+        self.handled.setdefault(group.group_id, []).extend(
+            m.message_id for m in messages
+        )
+
+    def handle_chat(self, chat: Chat, messages: List[DirectMessage]) -> None:
+        self.handled.setdefault(chat.other_user.user_id, []).extend(
+            m.direct_message_id for m in messages
+        )
+
+    def test_only_new_messages_fetched(self) -> None:
+        engine = SyncEngine(self.gmi)
+        result = engine.sync(self.handle_group)
+        # The store also holds the recorded groups from test_data, the empty ones have
+        # nothing to sync
+        self.assertEqual(result.groups, len(self.store.groups))
+        self.assertEqual(result.new, len(self.with_messages()))
+        self.assertEqual(self.handled, {})
+
+        few = self.post(self.group_ids[1], 3)
+        many = self.post(self.group_ids[3], 150)
+        requests = self.transport.requests
+        result = engine.sync(self.handle_group)
+        self.assertEqual(
+            self.handled, {self.group_ids[1]: few, self.group_ids[3]: many}
+        )
+        self.assertEqual((result.changed, result.messages), (2, 153))
+        # The groups index, one page for 3 messages and two for 150
+        index_pages = len(self.store.groups) // 100 + 1
+        self.assertEqual(self.transport.requests - requests, index_pages + 3)
+
+        self.handled = {}
+        requests = self.transport.requests
+        result = engine.sync(self.handle_group)
+        self.assertEqual(self.handled, {})
+        self.assertEqual(result.changed, 0)
+        self.assertEqual(self.transport.requests - requests, index_pages)
+
+    def test_handled_page_by_page(self) -> None:
+        engine = SyncEngine(self.gmi)
+        engine.sync(self.handle_group)
+        new = self.post(self.group_ids[0], 250)
+        pages: List[int] = []
+
+        def fail_second_page(group: Group, messages: List[Message]) -> None:
+            if pages:
+                raise RuntimeError("storage is down")
+            pages.append(len(messages))
+            self.handle_group(group, messages)
+
+        with self.assertRaises(RuntimeError):
+            engine.sync(fail_second_page)
+        # The first page was handled and checkpointed before the second was fetched
+        self.assertEqual(pages, [100])
+        self.assertEqual(self.handled, {self.group_ids[0]: new[:100]})
+
+        def handle_page(group: Group, messages: List[Message]) -> None:
+            pages.append(len(messages))
+            self.handle_group(group, messages)
+
+        engine.sync(handle_page)
+        self.assertEqual(pages, [100, 100, 50])
+        self.assertEqual(self.handled, {self.group_ids[0]: new})
+
+    def test_chats(self) -> None:
+        self.send_direct("100", 5)
+        self.send_direct("200", 5)
+        engine = SyncEngine(self.gmi)
+        chats = len(self.store.direct_messages)
+        self.assertEqual(engine.sync(handle_chat=self.handle_chat).new, chats)
+
+        new = self.send_direct("200", 45)
+        result = engine.sync(handle_chat=self.handle_chat)
+        self.assertEqual(self.handled, {"200": new})
+        self.assertEqual((result.chats, result.changed), (chats, 1))
+        self.assertIn("messages=45", repr(result))
+
+    def test_checkpoint_persisted(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "sync.json")
+        SyncEngine(self.gmi, Checkpoint(path)).sync(self.handle_group)
+
+        first = self.post(self.group_ids[0], 10)
+        second = self.post(self.group_ids[4], 10)
+
+        def failing(group: Group, messages: List[Message]) -> None:
+            if group.group_id == self.group_ids[4]:
+                raise RuntimeError("storage is down")
+            self.handle_group(group, messages)
+
+        with self.assertRaises(RuntimeError):
+            SyncEngine(self.gmi, Checkpoint(path)).sync(failing)
+        self.assertEqual(self.handled, {self.group_ids[0]: first})
+
+        # The failed group is delivered again, the handled one isn't
+        self.handled = {}
+        SyncEngine(self.gmi, Checkpoint(path)).sync(self.handle_group)
+        self.assertEqual(self.handled, {self.group_ids[4]: second})
+
+    def test_continues_after_backfill(self) -> None:
+        checkpoint = Checkpoint()
+        groups = [GroupsShowRequest(self.gmi, g).result for g in self.group_ids]
+        backfilled: List[Message] = []
+        HistoryCrawler(self.gmi, checkpoint=checkpoint).crawl(
+            groups, lambda group, messages: backfilled.extend(messages)
+        )
+        self.assertEqual(len(backfilled), 600)
+
+        new = self.post(self.group_ids[2], 5)
+        result = SyncEngine(self.gmi, checkpoint).sync(self.handle_group)
+        self.assertEqual(result.new, len(self.with_messages()) - 5)
+        self.assertEqual(self.handled, {self.group_ids[2]: new})
+
+    def test_concurrency_checked(self) -> None:
+        with self.assertRaises(ValueError):
+            SyncEngine(self.gmi, concurrency=0)
@@ -0,0 +1,84 @@
+# pyre-strict
+import time
+from unittest import TestCase
+
+from lowerpines.endpoints.group import GroupsShowRequest
+from lowerpines.endpoints.message import MessagesIndexRequest
+from lowerpines.exceptions import GroupMeApiException
+from lowerpines.gmi import GMI
+from lowerpines.transport import LatencyTransport, Recording, ReplayTransport
+
+GROUP = {"id": "1", "name": "Replayed", "members": [], "messages": {}}
+
+
+class ReplayTransportTest(TestCase):
+    def setUp(self) -> None:
+        self.gmi = GMI("transport_token")
+
+    def test_from_directory(self) -> None:
+        transport = ReplayTransport.from_directory("test_data")
+        self.assertIn("MessagesIndexRequest", transport.endpoints)
+        self.gmi.client = transport
+        before = MessagesIndexRequest(
+            self.gmi, "53616101", before_id="156859308846257387", limit=100
+        ).result
+        latest = MessagesIndexRequest(self.gmi, "53616101", limit=100).result
+        self.assertNotEqual(
+            [m.message_id for m in before], [m.message_id for m in latest]
+        )
+        self.assertEqual(transport.served, 2)
+
+    def test_fallback_to_any_recording(self) -> None:
+        transport = ReplayTransport(
+            [Recording("GroupsShowRequest", "GET", "https://x/groups/1", {}, GROUP)]
+        )
+        self.gmi.client = transport
+        # Different group id (and so URL), served from the same endpoint's recording
+        self.assertEqual(GroupsShowRequest(self.gmi, "2").result.name, "Replayed")
+
+    def test_strict_miss(self) -> None:
+        transport = ReplayTransport(
+            [Recording("GroupsShowRequest", "GET", "https://x/groups/1", {}, GROUP)],
+            strict=True,
+        )
+        self.gmi.client = transport
+        with self.assertRaises(GroupMeApiException):
+            GroupsShowRequest(self.gmi, "2")
+        self.assertEqual(transport.missed, 1)
+
+    def test_same_endpoint_different_urls(self) -> None:
+        base_url = "https://api.groupme.com/v3/groups/"
+        recordings = [
+            Recording(
+                "GroupsShowRequest",
+                "GET",
+                base_url + group_id,
+                {},
+                dict(GROUP, id=group_id, name="Group " + group_id),
+            )
+            for group_id in ["1", "2"]
+        ]
+        for strict in [True, False]:
+            self.gmi.client = ReplayTransport(recordings, strict=strict)
+            self.assertEqual(GroupsShowRequest(self.gmi, "1").result.name, "Group 1")
+            self.assertEqual(GroupsShowRequest(self.gmi, "2").result.name, "Group 2")
+
+    def test_request_by_url(self) -> None:
+        transport = ReplayTransport(
+            [Recording("GroupsShowRequest", "GET", "https://x/groups/1", {}, GROUP)]
+        )
+        self.assertEqual(
+            transport.request("GET", "https://x/groups/1").status_code, 200
+        )
+        self.assertEqual(transport.request("GET", "https://x/nope").status_code, 404)
+
+
+class LatencyTransportTest(TestCase):
+    def test_adds_latency(self) -> None:
+        gmi = GMI("latency_token")
+        gmi.client = LatencyTransport(
+            ReplayTransport.from_directory("test_data"), latency=0.02, jitter=0.01
+        )
+        start = time.perf_counter()
+        GroupsShowRequest(gmi, "53616101")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.02)